@@ -1,8 +1,8 @@
-from typing import Protocol
+from typing import Collection, Protocol
 
 import inject
 
-from app.addressing.models import ZalSearchResponseEntry
+from app.addressing.models import ZalSearchRequestEntry, ZalSearchResponseEntry
 
 
 class AddressingAdapter(Protocol):
@@ -16,6 +16,14 @@ class AddressingAdapter(Protocol):
 
     def search_by_kvk(arg, kvk: str) -> ZalSearchResponseEntry | None: ...
 
+    def search_many(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]: ...
+
+    async def search_many_async(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]: ...
+
 
 class AddressingService:
     @inject.autoparams()
@@ -36,3 +44,19 @@ class AddressingService:
 
     def search_by_kvk(self, kvk: str) -> ZalSearchResponseEntry | None:
         return self.adapter.search_by_kvk(kvk)
+
+    def search_many(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]:
+        """
+        Looks up all requested identifiers at once. Identifiers without a match are left out of the result.
+        """
+        return self.adapter.search_many(requests)
+
+    async def search_many_async(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]:
+        """
+        Same as search_many, for callers on the event loop
+        """
+        return await self.adapter.search_many_async(requests)
@@ -3,3 +3,6 @@ JWE_KEY_MANAGEMENT_ALG: str = "RSA-OAEP-256"
 JWE_CONTENT_ENC: str = "A256GCM"
 URL_CLAIM_NAME: str = "url"
 ENDPOINT_JWE_EXPIRATION_SECONDS: int = 365 * 24 * 60 * 60
+# Cached endpoint JWEs are regenerated long before they expire, so a wrapped URL always has most of its lifetime left
+ENDPOINT_JWE_REFRESH_SECONDS: int = 30 * 24 * 60 * 60
+ENDPOINT_JWE_CACHE_MAX_ENTRIES: int = 100_000
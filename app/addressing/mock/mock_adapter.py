@@ -1,8 +1,9 @@
 from pathlib import Path
+from typing import Collection
 
 import inject
 
-from app.addressing.models import IdentificationType, ZalSearchResponseEntry
+from app.addressing.models import IdentificationType, ZalSearchRequestEntry, ZalSearchResponseEntry
 from app.addressing.services import EndpointJWEWrapper
 
 
@@ -29,6 +30,16 @@ class AddressingMockAdapter:
     def search_by_kvk(self, kvk: str) -> ZalSearchResponseEntry | None:
         return self.__search(kvk, IdentificationType.kvk)
 
+    def search_many(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]:
+        return {request: self.__search(request.id_value, request.id_type) for request in requests}
+
+    async def search_many_async(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]:
+        return self.search_many(requests)
+
     def __search(self, value: str, id_type: IdentificationType) -> ZalSearchResponseEntry:
         json = self.__read_json("response.json")
 
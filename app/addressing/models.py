@@ -34,6 +34,6 @@ class IdentificationType(str, Enum):
     kvk = "kvk"
 
 
-class ZalSearchRequestEntry(BaseModel):
+class ZalSearchRequestEntry(BaseModel, frozen=True):
     id_type: IdentificationType
     id_value: str
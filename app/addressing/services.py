@@ -1,7 +1,16 @@
+import time
+from typing import Callable
+
 import inject
+from jwcrypto import jwk
 
-from app.addressing.constants import ENDPOINT_JWE_EXPIRATION_SECONDS
+from app.addressing.constants import (
+    ENDPOINT_JWE_CACHE_MAX_ENTRIES,
+    ENDPOINT_JWE_EXPIRATION_SECONDS,
+    ENDPOINT_JWE_REFRESH_SECONDS,
+)
 from app.addressing.repositories import KeyStoreRepository
+from app.cache.ttl_cache import CacheStats, TTLCache
 
 from .factories import EndpointJWEFactory, EndpointJWTFactory
 
@@ -13,15 +22,55 @@ class EndpointJWEWrapper:
         jwt_factory: EndpointJWTFactory,
         jwe_factory: EndpointJWEFactory,
         key_repository: KeyStoreRepository,
+        clock: Callable[[], float] = time.monotonic,
     ) -> None:
         self.__jwt_factory = jwt_factory
         self.__jwe_factory = jwe_factory
         self.__key_repository = key_repository
+        # Signing and encrypting is expensive, so the JWE of an endpoint is reused until it is due for a refresh
+        self.__tokens: TTLCache[tuple[str, str, str], str] = TTLCache(
+            max_entries=ENDPOINT_JWE_CACHE_MAX_ENTRIES,
+            ttl_seconds=ENDPOINT_JWE_REFRESH_SECONDS,
+            clock=clock,
+        )
+        self.__key_ids: dict[int, tuple[jwk.JWK, str]] = {}
 
     def wrap(self, endpoint: str) -> str:
         jwt_key = self.__key_repository.get_first_key_from_store(EndpointJWTFactory.JWT_KEY_LABEL)
         jwe_key = self.__key_repository.get_first_key_from_store(EndpointJWEFactory.JWE_KEY_LABEL)
 
+        cache_key = (endpoint, self.__get_key_id(jwt_key), self.__get_key_id(jwe_key))
+        jwe_string = self.__tokens.get(cache_key)
+
+        if jwe_string is None:
+            jwe_string = self.__create_jwe(endpoint, jwt_key, jwe_key)
+            self.__tokens.set(cache_key, jwe_string)
+
+        return jwe_string
+
+    def wrap_fresh(self, endpoint: str) -> str:
+        """
+        Creates a new JWE for the endpoint, without using or filling the cache, for callers that record when the
+        token was issued. A cached token may have been issued up to ENDPOINT_JWE_REFRESH_SECONDS earlier.
+        """
+        jwt_key = self.__key_repository.get_first_key_from_store(EndpointJWTFactory.JWT_KEY_LABEL)
+        jwe_key = self.__key_repository.get_first_key_from_store(EndpointJWEFactory.JWE_KEY_LABEL)
+
+        return self.__create_jwe(endpoint, jwt_key, jwe_key)
+
+    def get_key_id(self) -> str:
+        """
+        Returns an identifier for the current signing and encryption keys, which changes when either key is rotated.
+        """
+        jwt_key = self.__key_repository.get_first_key_from_store(EndpointJWTFactory.JWT_KEY_LABEL)
+        jwe_key = self.__key_repository.get_first_key_from_store(EndpointJWEFactory.JWE_KEY_LABEL)
+
+        return f"{self.__get_key_id(jwt_key)}:{self.__get_key_id(jwe_key)}"
+
+    def cache_stats(self) -> CacheStats:
+        return self.__tokens.stats()
+
+    def __create_jwe(self, endpoint: str, jwt_key: jwk.JWK, jwe_key: jwk.JWK) -> str:
         jwt = self.__jwt_factory.build(
             endpoint=endpoint, signing_key=jwt_key, expiration_seconds=ENDPOINT_JWE_EXPIRATION_SECONDS
         )
@@ -31,3 +80,14 @@ class EndpointJWEWrapper:
         jwe_string: str = jwe.serialize(compact=True)
 
         return jwe_string
+
+    def __get_key_id(self, key: jwk.JWK) -> str:
+        # Keys are looked up by identity, the key is kept in the dict so its id cannot be reused
+        cached = self.__key_ids.get(id(key))
+        if cached is not None:
+            return cached[1]
+
+        key_id = str(key.get("kid") or key.thumbprint())
+        self.__key_ids[id(key)] = (key, key_id)
+
+        return key_id
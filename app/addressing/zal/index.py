@@ -0,0 +1,183 @@
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from logging import Logger
+from typing import NamedTuple
+
+import inject
+from starlette.concurrency import run_in_threadpool
+
+from app.db.models import DataService, Organisation
+from app.db.repositories import ReadDataServiceRepository, ReadOrganisationRepository
+from app.zal_importer.enums import IdentifyingFeatureType
+
+
+class ZalRoleTemplate(NamedTuple):
+    code: str
+    resource_endpoint: str
+
+
+class ZalDataServiceTemplate(NamedTuple):
+    id: str
+    name: str
+    interface_versions: tuple[str, ...]
+    auth_endpoint: str
+    token_endpoint: str
+    roles: tuple[ZalRoleTemplate, ...]
+
+
+class ZalEntryTemplate(NamedTuple):
+    """
+    The fields of the response entry of an organisation, without the requested identifier and with its endpoints
+    not yet wrapped in a JWE. Tuples rather than response models, as those take several times the memory.
+    """
+
+    medmij_id: str
+    organization_type: str
+    dataservices: tuple[ZalDataServiceTemplate, ...]
+
+
+def create_entry_template(organisation: Organisation, data_services: list[DataService]) -> ZalEntryTemplate:
+    # Codes, names and endpoints recur across organisations, so interning them shares a single copy
+    return ZalEntryTemplate(
+        medmij_id=organisation.name,
+        organization_type=organisation.type,
+        dataservices=tuple(
+            ZalDataServiceTemplate(
+                id=sys.intern(data_service.external_id),
+                name=sys.intern(data_service.name) if data_service.name is not None else data_service.name,
+                interface_versions=_interface_versions(data_service),
+                auth_endpoint=sys.intern(data_service.auth_endpoint.url),
+                token_endpoint=sys.intern(data_service.token_endpoint.url),
+                roles=tuple(
+                    ZalRoleTemplate(
+                        code=sys.intern(system_role.code),
+                        resource_endpoint=sys.intern(system_role.resource_endpoint.url),
+                    )
+                    for system_role in data_service.roles
+                ),
+            )
+            for data_service in data_services
+        ),
+    )
+
+
+def _interface_versions(data_service: DataService) -> tuple[str, ...]:
+    if not data_service.interface_versions:
+        return ()
+
+    return tuple(sys.intern(version) for version in json.loads(data_service.interface_versions))
+
+
+@dataclass(frozen=True, slots=True)
+class ZalIndexSnapshot:
+    import_ref: str | None
+    by_name: dict[str, ZalEntryTemplate]
+    by_identifying_feature: dict[tuple[IdentifyingFeatureType, str], ZalEntryTemplate]
+
+    def find_by_name(self, name: str) -> ZalEntryTemplate | None:
+        return self.by_name.get(name)
+
+    def find_by_identifying_feature(
+        self, identifying_feature_type: IdentifyingFeatureType, identifying_feature_value: str
+    ) -> ZalEntryTemplate | None:
+        return self.by_identifying_feature.get((identifying_feature_type, identifying_feature_value))
+
+
+class ZalAddressingIndex:
+    """
+    In-memory index of the organisations of the current ZAL import, from MedMij name and from identifying feature
+    to the entry template of the organisation. Organisations found under several keys share a single template.
+
+    The index is built and kept up to date in the background by run(), which checks the current import once per
+    refresh interval and builds a new snapshot when another import has become current. A new snapshot replaces the
+    previous one in a single assignment, so lookups never query the database or wait for a build. Until the first
+    snapshot is built, snapshot() returns None and lookups go to the database.
+    """
+
+    @inject.autoparams("organisation_repository", "data_service_repository", "logger")
+    def __init__(
+        self,
+        organisation_repository: ReadOrganisationRepository,
+        data_service_repository: ReadDataServiceRepository,
+        logger: Logger,
+        refresh_seconds: float,
+        batch_size: int = 1000,
+    ) -> None:
+        self.__organisation_repository = organisation_repository
+        self.__data_service_repository = data_service_repository
+        self.__logger = logger
+        self.__refresh_seconds = refresh_seconds
+        self.__batch_size = batch_size
+        self.__snapshot: ZalIndexSnapshot | None = None
+
+    def snapshot(self) -> ZalIndexSnapshot | None:
+        """
+        :return: The index of the current import, or None while the first snapshot is being built
+        """
+        return self.__snapshot
+
+    def refresh(self) -> None:
+        """
+        Builds and swaps in a new snapshot when another import has become current since the previous snapshot
+        """
+        import_ref = self.__organisation_repository.find_latest_import_ref()
+
+        snapshot = self.__snapshot
+        if snapshot is None or snapshot.import_ref != import_ref:
+            self.__snapshot = self.__build(import_ref)
+
+    async def run(self) -> None:
+        """
+        Refreshes the index every refresh interval until cancelled. The refreshes run in the threadpool, so a
+        build does not block the event loop.
+        """
+        while True:
+            try:
+                await run_in_threadpool(self.refresh)
+            except Exception as e:
+                # The previous snapshot, or the database until there is one, keeps serving the lookups
+                self.__logger.error("Failed to refresh the ZAL addressing index: %s", e)
+
+            await asyncio.sleep(self.__refresh_seconds)
+
+    def __build(self, import_ref: str | None) -> ZalIndexSnapshot:
+        start = time.perf_counter()
+        by_id: dict[int, ZalEntryTemplate] = {}
+        by_name: dict[str, ZalEntryTemplate] = {}
+        by_identifying_feature: dict[tuple[IdentifyingFeatureType, str], ZalEntryTemplate] = {}
+
+        if import_ref is not None:
+            organisations = self.__organisation_repository.find_all_by_import_ref(import_ref)
+
+            for offset in range(0, len(organisations), self.__batch_size):
+                batch = organisations[offset : offset + self.__batch_size]
+                data_services: dict[int, list[DataService]] = defaultdict(list)
+                for data_service in self.__data_service_repository.find_all_by_organisations(
+                    [organisation.id for organisation in batch]
+                ):
+                    data_services[data_service.organisation_id].append(data_service)
+
+                for organisation in batch:
+                    template = create_entry_template(organisation, data_services[organisation.id])
+                    by_id[organisation.id] = template
+                    # In order of id, so for duplicates the same organisation wins as in the search_many queries
+                    by_name.setdefault(organisation.name, template)
+
+            for type, value, organisation_id in self.__organisation_repository.find_identifying_features_by_import_ref(
+                import_ref
+            ):
+                by_identifying_feature.setdefault((type, value), by_id[organisation_id])
+
+        self.__logger.info(
+            "Built the ZAL addressing index of import %s with %d organisations and %d identifying features in %.2fs",
+            import_ref,
+            len(by_id),
+            len(by_identifying_feature),
+            time.perf_counter() - start,
+        )
+
+        return ZalIndexSnapshot(import_ref=import_ref, by_name=by_name, by_identifying_feature=by_identifying_feature)
@@ -1,4 +1,5 @@
-import json
+from collections import defaultdict
+from typing import Collection
 
 import inject
 
@@ -6,45 +7,100 @@ from app.addressing.models import (
     IdentificationType,
     ZalDataServiceResponse,
     ZalDataServiceRoleResponse,
+    ZalSearchRequestEntry,
     ZalSearchResponseEntry,
 )
 from app.addressing.services import EndpointJWEWrapper
-from app.db.models import Organisation
-from app.db.repositories import DataServiceRepository, OrganisationRepository
+from app.addressing.zal.index import ZalAddressingIndex, ZalEntryTemplate, ZalIndexSnapshot, create_entry_template
+from app.db.models import DataService, Organisation
+from app.db.repositories import ReadDataServiceRepository, ReadOrganisationRepository
 from app.zal_importer.enums import IdentifyingFeatureType
 
 
 class AddressingZalAdapter:
+    IDENTIFYING_FEATURE_TYPES: dict[IdentificationType, IdentifyingFeatureType] = {
+        IdentificationType.agbz: IdentifyingFeatureType.AGB,
+        IdentificationType.ura: IdentifyingFeatureType.URA,
+        IdentificationType.hrn: IdentifyingFeatureType.HRN,
+        IdentificationType.kvk: IdentifyingFeatureType.KVK,
+    }
+
     @inject.autoparams()
     def __init__(
         self,
-        organisation_repository: OrganisationRepository,
-        data_service_repository: DataServiceRepository,
+        organisation_repository: ReadOrganisationRepository,
+        data_service_repository: ReadDataServiceRepository,
         endpoint_jwe_wrapper: EndpointJWEWrapper,
+        index: ZalAddressingIndex | None = None,
     ) -> None:
         self.organisation_repository = organisation_repository
         self.data_service_repository = data_service_repository
         self.__endpoint_jwe_wrapper = endpoint_jwe_wrapper
+        self.__index = index
 
     def search_by_medmij_name(self, name: str) -> ZalSearchResponseEntry | None:
+        snapshot = self.__index_snapshot()
+        if snapshot is not None:
+            return self.__create_response_from_template(IdentificationType.medmij, name, snapshot.find_by_name(name))
+
         entry = self.organisation_repository.find_one_by_name(name)
         return self._convert_to_response(IdentificationType.medmij, name, entry)
 
     def search_by_ura(self, ura: str) -> ZalSearchResponseEntry | None:
-        entry = self.organisation_repository.find_one_by_identifying_feature(IdentifyingFeatureType.URA, ura)
-        return self._convert_to_response(IdentificationType.ura, ura, entry)
+        return self.__search_by_identifying_feature(IdentificationType.ura, ura)
 
     def search_by_agb(self, agb: str) -> ZalSearchResponseEntry | None:
-        entry = self.organisation_repository.find_one_by_identifying_feature(IdentifyingFeatureType.AGB, agb)
-        return self._convert_to_response(IdentificationType.agbz, agb, entry)
+        return self.__search_by_identifying_feature(IdentificationType.agbz, agb)
 
     def search_by_hrn(self, hrn: str) -> ZalSearchResponseEntry | None:
-        entry = self.organisation_repository.find_one_by_identifying_feature(IdentifyingFeatureType.HRN, hrn)
-        return self._convert_to_response(IdentificationType.hrn, hrn, entry)
+        return self.__search_by_identifying_feature(IdentificationType.hrn, hrn)
 
     def search_by_kvk(self, kvk: str) -> ZalSearchResponseEntry | None:
-        entry = self.organisation_repository.find_one_by_identifying_feature(IdentifyingFeatureType.KVK, kvk)
-        return self._convert_to_response(IdentificationType.kvk, kvk, entry)
+        return self.__search_by_identifying_feature(IdentificationType.kvk, kvk)
+
+    def search_many(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]:
+        """
+        Resolves all requests with one query for the organisations per identification kind (MedMij name or
+        identifying feature) and a single query for the data services of all matched organisations, or from the
+        in-memory index once it is built.
+        """
+        snapshot = self.__index_snapshot()
+        if snapshot is not None:
+            return self.__search_many_in_index(snapshot, requests)
+
+        names, identifying_features = self.__split_requests(requests)
+        organisations = self.__match_organisations(
+            self.organisation_repository.find_all_by_names(names),
+            self.organisation_repository.find_all_by_identifying_features(identifying_features),
+        )
+        data_services = self.data_service_repository.find_all_by_organisations(
+            {organisation.id for organisation in organisations.values()}
+        )
+
+        return self.__create_responses(organisations, data_services)
+
+    async def search_many_async(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]:
+        """
+        Same as search_many, with the queries on the async read engine so they do not occupy a worker thread
+        """
+        snapshot = self.__index_snapshot()
+        if snapshot is not None:
+            return self.__search_many_in_index(snapshot, requests)
+
+        names, identifying_features = self.__split_requests(requests)
+        organisations = self.__match_organisations(
+            await self.organisation_repository.find_all_by_names_async(names),
+            await self.organisation_repository.find_all_by_identifying_features_async(identifying_features),
+        )
+        data_services = await self.data_service_repository.find_all_by_organisations_async(
+            {organisation.id for organisation in organisations.values()}
+        )
+
+        return self.__create_responses(organisations, data_services)
 
     def _convert_to_response(
         self,
@@ -55,29 +111,144 @@ class AddressingZalAdapter:
         if organisation is None:
             return None
 
+        return self.__create_response(
+            id_type,
+            id_value,
+            organisation,
+            self.data_service_repository.find_all_by_organisation(organisation.id),
+        )
+
+    def __search_by_identifying_feature(
+        self, id_type: IdentificationType, id_value: str
+    ) -> ZalSearchResponseEntry | None:
+        identifying_feature_type = self.IDENTIFYING_FEATURE_TYPES[id_type]
+
+        snapshot = self.__index_snapshot()
+        if snapshot is not None:
+            return self.__create_response_from_template(
+                id_type, id_value, snapshot.find_by_identifying_feature(identifying_feature_type, id_value)
+            )
+
+        entry = self.organisation_repository.find_one_by_identifying_feature(identifying_feature_type, id_value)
+        return self._convert_to_response(id_type, id_value, entry)
+
+    def __index_snapshot(self) -> ZalIndexSnapshot | None:
+        # None without an index and while its first snapshot is built, then the lookups go to the database
+        return self.__index.snapshot() if self.__index is not None else None
+
+    def __search_many_in_index(
+        self, snapshot: ZalIndexSnapshot, requests: Collection[ZalSearchRequestEntry]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]:
+        responses: dict[ZalSearchRequestEntry, ZalSearchResponseEntry] = {}
+
+        for request in requests:
+            if request.id_type == IdentificationType.medmij:
+                template = snapshot.find_by_name(request.id_value)
+            elif request.id_type in self.IDENTIFYING_FEATURE_TYPES:
+                template = snapshot.find_by_identifying_feature(
+                    self.IDENTIFYING_FEATURE_TYPES[request.id_type], request.id_value
+                )
+            else:
+                template = None
+
+            response = self.__create_response_from_template(request.id_type, request.id_value, template)
+            if response is not None:
+                responses[request] = response
+
+        return responses
+
+    def __split_requests(
+        self, requests: Collection[ZalSearchRequestEntry]
+    ) -> tuple[list[str], list[tuple[IdentifyingFeatureType, str]]]:
+        names = [request.id_value for request in requests if request.id_type == IdentificationType.medmij]
+        identifying_features = [
+            (self.IDENTIFYING_FEATURE_TYPES[request.id_type], request.id_value)
+            for request in requests
+            if request.id_type in self.IDENTIFYING_FEATURE_TYPES
+        ]
+        return names, identifying_features
+
+    def __match_organisations(
+        self,
+        organisations_by_name: list[Organisation],
+        organisations_by_identifying_feature: list[tuple[IdentifyingFeatureType, str, Organisation]],
+    ) -> dict[ZalSearchRequestEntry, Organisation]:
+        identification_types = {value: key for key, value in self.IDENTIFYING_FEATURE_TYPES.items()}
+
+        organisations: dict[ZalSearchRequestEntry, Organisation] = {}
+        for organisation in organisations_by_name:
+            request = ZalSearchRequestEntry(id_type=IdentificationType.medmij, id_value=organisation.name)
+            organisations.setdefault(request, organisation)
+
+        for type, value, organisation in organisations_by_identifying_feature:
+            request = ZalSearchRequestEntry(id_type=identification_types[type], id_value=value)
+            organisations.setdefault(request, organisation)
+
+        return organisations
+
+    def __create_responses(
+        self,
+        organisations: dict[ZalSearchRequestEntry, Organisation],
+        data_services: list[DataService],
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry]:
+        data_services_by_organisation: dict[int, list[DataService]] = defaultdict(list)
+        for data_service in data_services:
+            data_services_by_organisation[data_service.organisation_id].append(data_service)
+
+        return {
+            request: self.__create_response(
+                request.id_type, request.id_value, organisation, data_services_by_organisation[organisation.id]
+            )
+            for request, organisation in organisations.items()
+        }
+
+    def __create_response(
+        self,
+        id_type: IdentificationType,
+        id_value: str,
+        organisation: Organisation,
+        data_services: list[DataService],
+    ) -> ZalSearchResponseEntry:
+        return self.__wrap_template(id_type, id_value, create_entry_template(organisation, data_services))
+
+    def __create_response_from_template(
+        self,
+        id_type: IdentificationType,
+        id_value: str,
+        template: ZalEntryTemplate | None,
+    ) -> ZalSearchResponseEntry | None:
+        if template is None:
+            return None
+
+        return self.__wrap_template(id_type, id_value, template)
+
+    def __wrap_template(
+        self,
+        id_type: IdentificationType,
+        id_value: str,
+        template: ZalEntryTemplate,
+    ) -> ZalSearchResponseEntry:
         dataservices = [
             ZalDataServiceResponse(
-                id=data_service.external_id,
+                id=data_service.id,
                 name=data_service.name,
-                interface_versions=(
-                    json.loads(data_service.interface_versions) if data_service.interface_versions else []
-                ),
-                auth_endpoint=self.__endpoint_jwe_wrapper.wrap(data_service.auth_endpoint.url),
-                token_endpoint=self.__endpoint_jwe_wrapper.wrap(data_service.token_endpoint.url),
+                interface_versions=list(data_service.interface_versions),
+                auth_endpoint=self.__endpoint_jwe_wrapper.wrap(data_service.auth_endpoint),
+                token_endpoint=self.__endpoint_jwe_wrapper.wrap(data_service.token_endpoint),
                 roles=[
                     ZalDataServiceRoleResponse(
-                        code=system_role.code,
-                        resource_endpoint=self.__endpoint_jwe_wrapper.wrap(system_role.resource_endpoint.url),
+                        code=role.code,
+                        resource_endpoint=self.__endpoint_jwe_wrapper.wrap(role.resource_endpoint),
                     )
-                    for system_role in data_service.roles
+                    for role in data_service.roles
                 ],
             )
-            for data_service in self.data_service_repository.find_all_by_organisation(organisation.id)
+            for data_service in template.dataservices
         ]
 
         return ZalSearchResponseEntry(
-            medmij_id=organisation.name,
-            organization_type=organisation.type,
+            medmij_id=template.medmij_id,
+            organization_type=template.organization_type,
             id_type=id_type,
             id_value=id_value,
             dataservices=dataservices,
@@ -0,0 +1,132 @@
+"""
+Micro-benchmark of the per-bundle parse time of ZorgAB search responses, comparing the lean orjson parser with
+the strict fhir.resources validation.
+
+Run with: python -m app.benchmark.fhir_parsing [--organizations 50] [--iterations 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import orjson
+from fhir.resources.STU3.bundle import Bundle, BundleEntry
+from fhir.resources.STU3.organization import Organization as FhirOrganization
+
+from app.healthcarefinder.zorgab.records import OrganizationRecord
+from app.healthcarefinder.zorgab.zorgab import parse_bundle_entries, parse_fhir_data
+
+ORGANIZATION_TEMPLATE: dict[str, Any] = {  # type: ignore[explicit-any]
+    "resourceType": "Organization",
+    "id": "organization-0",
+    "meta": {"lastUpdated": "2025-10-29T12:01:25.586", "versionId": "1"},
+    "active": True,
+    "name": "Huisartsenpraktijk De Linde",
+    "identifier": [
+        {"system": "http://fhir.nl/fhir/NamingSystem/agb-z", "value": "01234567"},
+        {"system": "http://fhir.nl/fhir/NamingSystem/ura", "value": "87654321"},
+    ],
+    "type": [
+        {
+            "coding": [
+                {
+                    "system": "http://nictiz.nl/fhir/NamingSystem/organization-type",
+                    "code": "Z3",
+                    "display": "Huisartspraktijk (zelfstandig of groepspraktijk)",
+                }
+            ]
+        }
+    ],
+    "telecom": [{"system": "phone", "value": "030-1234567", "use": "work"}],
+    "address": [
+        {
+            "use": "work",
+            "type": "physical",
+            "text": "Lindelaan 1, 3500 AA Utrecht",
+            "line": ["Lindelaan 1"],
+            "city": "Utrecht",
+            "postalCode": "3500 AA",
+            "country": "NL",
+            "period": {"start": "2020-11-03T12:49:40.265"},
+            "extension": [
+                {
+                    "url": "http://hl7.org/fhir/StructureDefinition/geolocation",
+                    "extension": [
+                        {"url": "latitude", "valueDecimal": 52.0907},
+                        {"url": "longitude", "valueDecimal": 5.1214},
+                    ],
+                }
+            ],
+        }
+    ],
+}
+
+
+@dataclass(frozen=True)
+class ParseBenchmarkResult:
+    organizations: int
+    iterations: int
+    strict_seconds_per_bundle: float
+    lean_seconds_per_bundle: float
+
+
+def build_search_bundle(organizations: int) -> bytes:
+    entries = []
+    for index in range(organizations):
+        resource = copy.deepcopy(ORGANIZATION_TEMPLATE)
+        resource["id"] = f"organization-{index}"
+        resource["identifier"][0]["value"] = f"{index:08d}"
+        entries.append({"fullUrl": f"https://example.org/fhir/Organization/{index}", "resource": resource})
+
+    return orjson.dumps({"resourceType": "Bundle", "type": "searchset", "total": organizations, "entry": entries})
+
+
+def parse_strict(content: bytes) -> list[OrganizationRecord]:
+    bundle = parse_fhir_data(orjson.loads(content), Bundle)
+    return [
+        OrganizationRecord.from_fhir(FhirOrganization.model_validate(BundleEntry.model_validate(entry).resource))
+        for entry in bundle.entry or []
+    ]
+
+
+def parse_lean(content: bytes) -> list[OrganizationRecord]:
+    return [OrganizationRecord.from_json(entry.get("resource")) for entry in parse_bundle_entries(content)]
+
+
+def run_parse_benchmark(content: bytes, iterations: int) -> ParseBenchmarkResult:
+    if parse_strict(content) != parse_lean(content):
+        raise ValueError("Lean and strict parsing produced different records")
+
+    return ParseBenchmarkResult(
+        organizations=len(parse_bundle_entries(content)),
+        iterations=iterations,
+        strict_seconds_per_bundle=_time_per_call(parse_strict, content, iterations),
+        lean_seconds_per_bundle=_time_per_call(parse_lean, content, iterations),
+    )
+
+
+def _time_per_call(parse: Callable[[bytes], list[OrganizationRecord]], content: bytes, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse(content)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare strict and lean parsing of ZorgAB search responses")
+    parser.add_argument("--organizations", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    result = run_parse_benchmark(build_search_bundle(args.organizations), args.iterations)
+    print(f"Bundle with {result.organizations} organizations, {result.iterations} iterations")
+    print(f"strict: {result.strict_seconds_per_bundle * 1000:.3f} ms/bundle")
+    print(f"lean:   {result.lean_seconds_per_bundle * 1000:.3f} ms/bundle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark of TimestampPatcher over a recorded ZorgAB search bundle, comparing it with the previous
+recursive implementation that ran the timestamp regex on every string value.
+
+Run with: python -m app.benchmark.timestamp_patching [--bundle path] [--iterations 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import orjson
+
+from app.healthcarefinder.zorgab.patch import TimestampPatcher
+
+DEFAULT_BUNDLE_PATH = "resources/benchmark/zorgab/search_bundle.json"
+
+RECURSIVE_TIMESTAMP_REGEX = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?$")
+
+
+@dataclass(frozen=True)
+class PatchBenchmarkResult:
+    iterations: int
+    recursive_seconds_per_bundle: float
+    patcher_seconds_per_bundle: float
+
+
+def recursive_patch(data: Any) -> Any:  # type: ignore[explicit-any]
+    """The previous TimestampPatcher.patch, kept as the baseline of the benchmark"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            data[key] = recursive_patch(value)
+    elif isinstance(data, list):
+        for i, item in enumerate(data):
+            data[i] = recursive_patch(item)
+    elif isinstance(data, str) and RECURSIVE_TIMESTAMP_REGEX.fullmatch(data):
+        return data + "Z"
+    return data
+
+
+def run_patch_benchmark(content: bytes, iterations: int) -> PatchBenchmarkResult:
+    if recursive_patch(orjson.loads(content)) != TimestampPatcher.patch(orjson.loads(content)):
+        raise ValueError("TimestampPatcher and the recursive baseline patched the bundle differently")
+
+    return PatchBenchmarkResult(
+        iterations=iterations,
+        recursive_seconds_per_bundle=_time_per_call(recursive_patch, content, iterations),
+        patcher_seconds_per_bundle=_time_per_call(TimestampPatcher.patch, content, iterations),
+    )
+
+
+def _time_per_call(patch: Callable[[Any], Any], content: bytes, iterations: int) -> float:  # type: ignore[explicit-any]
+    # Decode the bundles up front, so only the patching itself is timed
+    bundles = [orjson.loads(content) for _ in range(iterations)]
+
+    start = time.perf_counter()
+    for bundle in bundles:
+        patch(bundle)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark TimestampPatcher against the recursive implementation")
+    parser.add_argument("--bundle", default=DEFAULT_BUNDLE_PATH)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.bundle, "rb") as file:
+        content = file.read()
+
+    result = run_patch_benchmark(content, args.iterations)
+    print(f"{args.bundle}, {result.iterations} iterations")
+    print(f"recursive: {result.recursive_seconds_per_bundle * 1000:.3f} ms/bundle")
+    print(f"patcher:   {result.patcher_seconds_per_bundle * 1000:.3f} ms/bundle")
+
+
+if __name__ == "__main__":
+    main()
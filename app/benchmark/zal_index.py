@@ -0,0 +1,220 @@
+"""
+Benchmark of the in-memory ZAL addressing index over a synthetic ZAL imported in an in-memory SQLite database:
+the time to build the index, the memory it keeps, and the time of a lookup compared with the database lookup.
+
+Run with: python -m app.benchmark.zal_index [--organisations 50000] [--lookups 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from defusedxml.ElementTree import fromstring
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.addressing.zal.index import ZalAddressingIndex, ZalEntryTemplate, create_entry_template
+from app.benchmark.zal_traversal import build_zal
+from app.db.models import Base
+from app.db.repositories import (
+    CurrentImportRepository,
+    DataServiceRepository,
+    DbEndpointRepository,
+    IdentifyingFeatureRepository,
+    OrganisationRepository,
+    ReadDataServiceRepository,
+    ReadOrganisationRepository,
+    SystemRoleRepository,
+)
+from app.xml.services import ElementTraverser
+from app.zal_importer.enums import IdentifyingFeatureType
+from app.zal_importer.extraction import extract_organisation
+
+IMPORT_REF = "1700000000000001"
+
+
+@dataclass(frozen=True)
+class IndexBenchmarkResult:
+    organisations: int
+    lookups: int
+    build_seconds: float
+    memory_bytes: int
+    index_lookup_seconds: float
+    database_lookup_seconds: float
+
+    @property
+    def memory_bytes_per_organisation(self) -> float:
+        return self.memory_bytes / self.organisations if self.organisations else 0.0
+
+
+def import_zal(session: Session, content: bytes) -> int:
+    """
+    Writes the organisations of the ZAL like the importer does, with a data service name and interface versions
+    (which come from the ZKL) and an AGB and URA code per organisation
+    """
+    traverser = ElementTraverser(fromstring(content), single_namespace=True)
+    organisations = [
+        extract_organisation(traverser, element)
+        for element in traverser.get_nested_elements("Zorgaanbieders/Zorgaanbieder")
+    ]
+
+    endpoint_ids = DbEndpointRepository(session).create_many(
+        list(dict.fromkeys(url for organisation in organisations for url in organisation.endpoint_urls()))
+    )
+    organisation_ids = OrganisationRepository(session).create_many(
+        [
+            {"import_ref": IMPORT_REF, "name": organisation.name, "type": organisation.type}
+            for organisation in organisations
+        ]
+    )
+    IdentifyingFeatureRepository(session).create_many(
+        [
+            {"organisation_id": organisation_id, "type": type, "value": f"{index:08d}", "import_ref": IMPORT_REF}
+            for index, organisation_id in enumerate(organisation_ids)
+            for type in (IdentifyingFeatureType.AGB, IdentifyingFeatureType.URA)
+        ]
+    )
+
+    data_services = [
+        (organisation_id, data_service)
+        for organisation_id, organisation in zip(organisation_ids, organisations, strict=True)
+        for data_service in organisation.data_services
+    ]
+    data_service_ids = DataServiceRepository(session).create_many(
+        [
+            {
+                "organisation_id": organisation_id,
+                "external_id": data_service.external_id,
+                "name": f"Gegevensdienst {data_service.external_id}",
+                "interface_versions": json.dumps(["1.0.0"]),
+                "auth_endpoint_id": endpoint_ids[data_service.auth_endpoint_url],
+                "token_endpoint_id": endpoint_ids[data_service.token_endpoint_url],
+            }
+            for organisation_id, data_service in data_services
+        ]
+    )
+    SystemRoleRepository(session).create_many(
+        [
+            {
+                "data_service_id": data_service_id,
+                "code": system_role.code,
+                "resource_endpoint_id": endpoint_ids[system_role.resource_endpoint_url],
+            }
+            for data_service_id, (_, data_service) in zip(data_service_ids, data_services, strict=True)
+            for system_role in data_service.system_roles
+        ]
+    )
+    CurrentImportRepository(session).advance(IMPORT_REF, persist=True)
+
+    return len(organisations)
+
+
+def find_in_index(index: ZalAddressingIndex, names: list[str]) -> list[ZalEntryTemplate | None]:
+    """
+    Looks up the organisations by name like AddressingZalAdapter does with an index
+    """
+    snapshot = index.snapshot()
+    if snapshot is None:
+        raise RuntimeError("The index has not been built")
+
+    return [snapshot.find_by_name(name) for name in names]
+
+
+def find_in_database(session: Session, names: list[str]) -> list[ZalEntryTemplate | None]:
+    """
+    Looks up the organisations by name, and their data services, like AddressingZalAdapter does without an index
+    """
+    organisation_repository = ReadOrganisationRepository(session, async_sessions=None)
+    data_service_repository = ReadDataServiceRepository(session, async_sessions=None)
+
+    entries: list[ZalEntryTemplate | None] = []
+    for name in names:
+        organisation = organisation_repository.find_one_by_name(name)
+        entries.append(
+            create_entry_template(organisation, data_service_repository.find_all_by_organisation(organisation.id))
+            if organisation is not None
+            else None
+        )
+    return entries
+
+
+def run_index_benchmark(session: Session, organisations: int, lookups: int) -> IndexBenchmarkResult:
+    organisation_repository = ReadOrganisationRepository(session, async_sessions=None)
+    index = ZalAddressingIndex(
+        organisation_repository=organisation_repository,
+        data_service_repository=ReadDataServiceRepository(session, async_sessions=None),
+        logger=logging.getLogger(__name__),
+        refresh_seconds=float("inf"),
+    )
+    names = [f"za{number % organisations}@medmij" for number in range(lookups)]
+
+    # The statements the index is built with are compiled and cached before memory is traced
+    organisation_repository.find_latest_import_ref()
+    organisation_repository.find_identifying_features_by_import_ref("")
+    for organisation in organisation_repository.find_all_by_import_ref(IMPORT_REF)[:1]:
+        ReadDataServiceRepository(session, async_sessions=None).find_all_by_organisations([organisation.id])
+    session.expunge_all()
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    index.refresh()
+    build_seconds = time.perf_counter() - start
+    # Only what the index keeps: the rows and ORM objects it was built from are released by now
+    session.expunge_all()
+    gc.collect()
+    memory_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    index_entries = find_in_index(index, names)
+    index_lookup_seconds = (time.perf_counter() - start) / lookups
+
+    start = time.perf_counter()
+    database_entries = find_in_database(session, names)
+    database_lookup_seconds = (time.perf_counter() - start) / lookups
+
+    if index_entries != database_entries:
+        raise ValueError("The index and the database found different organisations")
+
+    return IndexBenchmarkResult(
+        organisations=organisations,
+        lookups=lookups,
+        build_seconds=build_seconds,
+        memory_bytes=memory_bytes,
+        index_lookup_seconds=index_lookup_seconds,
+        database_lookup_seconds=database_lookup_seconds,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory ZAL addressing index")
+    parser.add_argument("--organisations", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        organisations = import_zal(session, build_zal(args.organisations))
+        result = run_index_benchmark(session, organisations, args.lookups)
+
+    print(f"ZAL with {result.organisations} organisations, {result.lookups} lookups")
+    print(f"build:           {result.build_seconds:.2f} s")
+    print(
+        f"memory:          {result.memory_bytes / 1024 / 1024:.1f} MiB "
+        f"({result.memory_bytes_per_organisation:.0f} bytes/organisation)"
+    )
+    print(f"index lookup:    {result.index_lookup_seconds * 1e6:.1f} us")
+    print(f"database lookup: {result.database_lookup_seconds * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
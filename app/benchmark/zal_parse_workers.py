@@ -0,0 +1,102 @@
+"""
+Benchmark of the extraction of a synthetic ZAL by the importer: streamed and extracted in the importing process,
+against split into raw chunks that worker processes parse and extract. The writes are left out, they are the same
+for both.
+
+Run with: python -m app.benchmark.zal_parse_workers [--organisations 50000] [--workers 4] [--batch-size 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+
+from app.benchmark.zal_traversal import build_zal
+from app.xml.services import StreamingElementTraverser
+from app.zal_importer.extraction import (
+    ExtractedOrganisation,
+    extract_organisation,
+    extract_organisation_chunk,
+    split_organisation_chunks,
+)
+from app.zal_importer.importers import OrganisationImporter
+
+
+@dataclass(frozen=True)
+class ParseWorkersBenchmarkResult:
+    organisations: int
+    workers: int
+    streaming_seconds: float
+    workers_seconds: float
+
+
+def extract_streaming(path: str) -> list[ExtractedOrganisation]:
+    """
+    Extracts the organisations like the importer without parse workers
+    """
+    with StreamingElementTraverser.open(path, OrganisationImporter.ORGANISATIONS_PATH, single_namespace=True) as (
+        traverser
+    ):
+        return [
+            extract_organisation(traverser, element)
+            for element in traverser.iterate_nested_elements(OrganisationImporter.ORGANISATIONS_PATH)
+        ]
+
+
+def extract_in_workers(path: str, workers: int, batch_size: int) -> list[ExtractedOrganisation]:
+    """
+    Extracts the organisations like the importer with parse workers, with the pool started up front
+    """
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as executor:
+        # Started before the file is split, so the start of the workers is not measured by the caller
+        executor.submit(int).result()
+
+        with open(path, "rb") as source:
+            batches = executor.map(extract_organisation_chunk, split_organisation_chunks(source, batch_size))
+            return [organisation for batch in batches for organisation in batch]
+
+
+def run_parse_workers_benchmark(path: str, workers: int, batch_size: int) -> ParseWorkersBenchmarkResult:
+    start = time.perf_counter()
+    streamed = extract_streaming(path)
+    streaming_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extracted = extract_in_workers(path, workers, batch_size)
+    workers_seconds = time.perf_counter() - start
+
+    if extracted != streamed:
+        raise ValueError("The streaming and worker extraction extracted different organisations")
+
+    return ParseWorkersBenchmarkResult(
+        organisations=len(streamed),
+        workers=workers,
+        streaming_seconds=streaming_seconds,
+        workers_seconds=workers_seconds,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the parse workers of the ZAL importer")
+    parser.add_argument("--organisations", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".xml") as file:
+        file.write(build_zal(args.organisations))
+        file.flush()
+        result = run_parse_workers_benchmark(file.name, args.workers, args.batch_size)
+
+    print(f"ZAL with {result.organisations} organisations, {result.workers} workers, {os.cpu_count()} CPUs")
+    print(f"streaming: {result.streaming_seconds:.2f} s")
+    print(f"workers:   {result.workers_seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
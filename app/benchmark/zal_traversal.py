@@ -0,0 +1,143 @@
+"""
+Micro-benchmark of the ElementTraverser lookups done by the ZAL importer over a synthetic ZAL, comparing the default
+traverser with the single namespace mode that compiles and caches its paths.
+
+Run with: python -m app.benchmark.zal_traversal [--organisations 50000] [--iterations 3] [--output path]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from xml.etree.ElementTree import Element
+
+from defusedxml.ElementTree import fromstring
+
+from app.xml.services import ElementTraverser
+
+ZAL_NAMESPACE = "xmlns://afsprakenstelsel.medmij.nl/zorgaanbiederslijst/release3/"
+
+ExtractedOrganisation = tuple[str, str, list[tuple[str, str, str, list[tuple[str, str]]]]]
+
+
+@dataclass(frozen=True)
+class TraversalBenchmarkResult:
+    organisations: int
+    iterations: int
+    default_seconds_per_list: float
+    single_namespace_seconds_per_list: float
+
+
+def build_zal(organisations: int) -> bytes:
+    """
+    Builds a ZAL with the given number of organisations, each with two data services with one or two system roles
+    """
+    parts = [
+        f'<?xml version="1.0" encoding="UTF-8"?><Zorgaanbiederslijst xmlns="{ZAL_NAMESPACE}">',
+        "<Tijdstempel>2021-05-04T18:13:51.0+01:00</Tijdstempel><Volgnummer>9</Volgnummer><Zorgaanbieders>",
+    ]
+    for index in range(organisations):
+        host = f"https://za{index}.example.org"
+        parts.append(
+            f"<Zorgaanbieder><Zorgaanbiedernaam>za{index}@medmij</Zorgaanbiedernaam><Aanbiedertype>ZA</Aanbiedertype>"
+            "<Interfaceversies><Interfaceversie><InterfaceversieId>1.4.0</InterfaceversieId><Gegevensdiensten>"
+        )
+        for data_service_id, roles in (("4", ["LAB-1.1-LRB-FHIR"]), ("6", ["MM-1.2-PLB-FHIR", "MM-1.2-PDB-FHIR"])):
+            parts.append(
+                f"<Gegevensdienst><GegevensdienstId>{data_service_id}</GegevensdienstId>"
+                f"<AuthorizationEndpoint><AuthorizationEndpointuri>{host}/oauth/authorize</AuthorizationEndpointuri>"
+                "</AuthorizationEndpoint>"
+                f"<TokenEndpoint><TokenEndpointuri>{host}/oauth/token</TokenEndpointuri></TokenEndpoint><Systeemrollen>"
+            )
+            for role in roles:
+                parts.append(
+                    f"<Systeemrol><Systeemrolcode>{role}</Systeemrolcode><ResourceEndpoint>"
+                    f"<ResourceEndpointuri>{host}/fhir/{data_service_id}</ResourceEndpointuri></ResourceEndpoint>"
+                    "</Systeemrol>"
+                )
+            parts.append("</Systeemrollen></Gegevensdienst>")
+        parts.append("</Gegevensdiensten></Interfaceversie></Interfaceversies></Zorgaanbieder>")
+    parts.append("</Zorgaanbieders></Zorgaanbiederslijst>")
+
+    return "".join(parts).encode()
+
+
+def extract_organisations(traverser: ElementTraverser) -> list[ExtractedOrganisation]:
+    """
+    Does the same lookups as OrganisationListImporter, without writing anything
+    """
+    return [
+        (
+            traverser.get_nested_text("Zorgaanbiedernaam", organisation),
+            traverser.get_nested_text("Aanbiedertype", organisation),
+            [
+                _extract_data_service(traverser, data_service)
+                for data_service in traverser.get_nested_elements(
+                    "Interfaceversies/Interfaceversie/Gegevensdiensten/Gegevensdienst", organisation
+                )
+            ],
+        )
+        for organisation in traverser.get_nested_elements("Zorgaanbieders/Zorgaanbieder")
+    ]
+
+
+def _extract_data_service(
+    traverser: ElementTraverser, data_service: Element
+) -> tuple[str, str, str, list[tuple[str, str]]]:
+    return (
+        traverser.get_nested_text("GegevensdienstId", data_service),
+        traverser.get_nested_text("AuthorizationEndpoint/AuthorizationEndpointuri", data_service),
+        traverser.get_nested_text("TokenEndpoint/TokenEndpointuri", data_service),
+        [
+            (
+                traverser.get_nested_text("Systeemrolcode", system_role),
+                traverser.get_nested_text("ResourceEndpoint/ResourceEndpointuri", system_role),
+            )
+            for system_role in traverser.get_nested_elements("Systeemrollen/Systeemrol", data_service)
+        ],
+    )
+
+
+def run_traversal_benchmark(content: bytes, iterations: int) -> TraversalBenchmarkResult:
+    root = fromstring(content)
+    organisations = extract_organisations(ElementTraverser(root))
+    if organisations != extract_organisations(ElementTraverser(root, single_namespace=True)):
+        raise ValueError("The default and single namespace traversers extracted different organisations")
+
+    return TraversalBenchmarkResult(
+        organisations=len(organisations),
+        iterations=iterations,
+        default_seconds_per_list=_time_per_list(root, iterations, single_namespace=False),
+        single_namespace_seconds_per_list=_time_per_list(root, iterations, single_namespace=True),
+    )
+
+
+def _time_per_list(root: Element, iterations: int, single_namespace: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        # A traverser per iteration, so compiling the paths is part of the measured time
+        extract_organisations(ElementTraverser(root, single_namespace=single_namespace))
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ElementTraverser lookups of the ZAL importer")
+    parser.add_argument("--organisations", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--output", help="Also write the synthetic ZAL to this path")
+    args = parser.parse_args()
+
+    content = build_zal(args.organisations)
+    if args.output:
+        with open(args.output, "wb") as file:
+            file.write(content)
+
+    result = run_traversal_benchmark(content, args.iterations)
+    print(f"ZAL with {result.organisations} organisations, {result.iterations} iterations")
+    print(f"default:          {result.default_seconds_per_list:.3f} s/list")
+    print(f"single namespace: {result.single_namespace_seconds_per_list:.3f} s/list")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,15 +12,24 @@ from app.benchmark.zorgab.benchmark import (
     FileLoader,
     JsonFileOutputWriter,
 )
-from app.db.repositories import DbEndpointRepository, EndpointRepository
+from app.db.repositories import (
+    DbEndpointRepository,
+    EndpointRepository,
+    ReadDataServiceRepository,
+    ReadOrganisationRepository,
+)
 from app.search_indexation.constants import (
+    ENCRYPTED_ENDPOINTS_MANIFEST_FILENAME,
     ENCRYPTED_ENDPOINTS_OUTPUT_FILENAME,
     SEARCH_INDEX_OUTPUT_DIR,
     SEARCH_INDEX_OUTPUT_FILENAME,
+    SEARCH_INDEX_STATE_DIR,
     SEARCH_INDEX_TEMP_DIR,
 )
 from app.search_indexation.repositories import (
     EncryptedEndpointsFileRepository,
+    EncryptedEndpointsManifestFileRepository,
+    EncryptedEndpointsManifestRepository,
     EncryptedEndpointsRepository,
     MockEndpointsRepository,
     MockOrganizationsFileRepo,
@@ -28,6 +37,7 @@ from app.search_indexation.repositories import (
     SearchIndexRepository,
 )
 from app.search_indexation.services import MockOrganizationsMerger
+from app.search_indexation.writer import AtomicFileWriter
 from app.zorgab_scraper.config import IdentifierSource, ZorgABScraperConfig
 from app.zorgab_scraper.services import (
     AgbCsvIdentifierRepository,
@@ -38,14 +48,17 @@ from app.zorgab_scraper.services import (
 from .addressing.addressing_service import AddressingAdapter
 from .addressing.mock.mock_adapter import AddressingMockAdapter
 from .addressing.repositories import FilesystemJWKStoreRepository, KeyStoreRepository
+from .addressing.zal.index import ZalAddressingIndex
 from .addressing.zal.zal_adapter import AddressingZalAdapter
-from .config.models import AddressingAdapterType, Config, HealthcareAdapterType
-from .db.db import Database
+from .config.models import AddressingAdapterType, Config, HealthcareAdapterType, ZalImportConfig
+from .db.db import AsyncReadSessionFactory, Database, ReadSession
 from .exceptions.config_exception import ConfigException
+from .healthcarefinder.cache import SearchResponseCache
 from .healthcarefinder.factory import HealthcareFinderAdapterFactory
 from .healthcarefinder.healthcarefinder import HealthcareFinder
-from .healthcarefinder.interface import HealthcareFinderAdapter
+from .healthcarefinder.interface import AsyncHealthcareFinderAdapter, HealthcareFinderAdapter
 from .healthcarefinder.mock.adapter import MockHealthcareFinderAdapter
+from .healthcarefinder.zorgab.cache import PartOfOrganizationCache, ZorgABSearchSingleFlight
 from .healthcarefinder.zorgab_mock.zorgab_mock import ZorgABMockHydrationAdapter
 from .logger.factory import create_logger
 from .normalization.services import DutchGridTransformerFactory, GeoCoordinateService
@@ -62,10 +75,16 @@ def configure_bindings(binder: Binder, config: Config) -> None:
 
     __bind_logger(binder, config)
     __bind_zorgab_scraper_config(binder, config)
+    __bind_zal_import_config(binder, config)
     __bind_db(binder, config)
+    __bind_zal_addressing_index(binder, config)
     __bind_addressing_finder_adapter(binder, config)
+    __bind_search_response_cache(binder, config)
     __bind_healthcare_finder(binder, config)
+    __bind_partof_organization_cache(binder, config)
+    __bind_zorgab_search_single_flight(binder)
     __bind_healthcare_finder_adapter(binder, config)
+    __bind_async_healthcare_finder_adapter(binder, config)
     __bind_mock_healthcare_finder_adapter(binder, config)
     __bind_zorgab_mock_hydration_adapter(binder, config)
     __bind_geo_coordinate_service(binder)
@@ -87,7 +106,7 @@ def __bind_logger(binder: Binder, config: Config) -> logging.Logger:
 
 
 def __bind_db(binder: Binder, app_config: Config) -> None:
-    database = Database(dsn=app_config.database.dsn, logger=create_logger(app_config))
+    database = Database(config=app_config.database, logger=create_logger(app_config))
     binder.bind(Database, database)
 
     session_factory = sessionmaker(bind=database.engine)
@@ -95,6 +114,24 @@ def __bind_db(binder: Binder, app_config: Config) -> None:
     scoped_session_factory = scoped_session(session_factory)
 
     binder.bind(Session, scoped_session_factory)
+    binder.bind(ReadSession, scoped_session(sessionmaker(bind=database.read_engine, class_=ReadSession)))
+    binder.bind(AsyncReadSessionFactory, database.create_async_read_session_factory())
+
+
+def __bind_zal_addressing_index(binder: Binder, config: Config) -> None:
+    if not config.addressing.zal_index:
+        binder.bind(ZalAddressingIndex, None)
+        return
+
+    binder.bind_to_constructor(
+        ZalAddressingIndex,
+        lambda: ZalAddressingIndex(
+            organisation_repository=inject.instance(ReadOrganisationRepository),
+            data_service_repository=inject.instance(ReadDataServiceRepository),
+            logger=inject.instance(logging.Logger),
+            refresh_seconds=config.addressing.zal_index_refresh_seconds,
+        ),
+    )
 
 
 def __bind_addressing_finder_adapter(binder: Binder, config: Config) -> None:
@@ -117,10 +154,39 @@ def __bind_addressing_finder_adapter(binder: Binder, config: Config) -> None:
 def __bind_healthcare_finder(binder: Binder, config: Config) -> None:
     binder.bind_to_provider(
         HealthcareFinder,
-        lambda: HealthcareFinder(allow_search_bypass=config.healthcarefinder.allow_search_bypass),
+        lambda: HealthcareFinder(
+            allow_search_bypass=config.healthcarefinder.allow_search_bypass,
+            response_cache=inject.instance(SearchResponseCache),
+        ),
     )
 
 
+def __bind_search_response_cache(binder: Binder, config: Config) -> None:
+    binder.bind_to_constructor(
+        SearchResponseCache,
+        lambda: SearchResponseCache(
+            max_entries=config.healthcarefinder.search_cache_max_entries,
+            ttl_seconds=config.healthcarefinder.search_cache_ttl_seconds,
+            stale_seconds=config.healthcarefinder.search_cache_stale_seconds,
+        ),
+    )
+
+
+def __bind_partof_organization_cache(binder: Binder, config: Config) -> None:
+    binder.bind_to_constructor(
+        PartOfOrganizationCache,
+        lambda: PartOfOrganizationCache(
+            max_entries=config.zorgab.partof_cache_max_entries,
+            ttl_seconds=config.zorgab.partof_cache_ttl_seconds,
+        ),
+    )
+
+
+def __bind_zorgab_search_single_flight(binder: Binder) -> None:
+    # Shared by the sync and async adapters, so the metrics endpoint can report on it
+    binder.bind_to_constructor(ZorgABSearchSingleFlight, ZorgABSearchSingleFlight)
+
+
 def __bind_healthcare_finder_adapter(binder: Binder, config: Config) -> None:
     binder.bind_to_provider(
         HealthcareFinderAdapter,
@@ -128,6 +194,14 @@ def __bind_healthcare_finder_adapter(binder: Binder, config: Config) -> None:
     )
 
 
+def __bind_async_healthcare_finder_adapter(binder: Binder, config: Config) -> None:
+    # Bound as a singleton so that all requests share the connection pool of the adapter
+    binder.bind_to_constructor(
+        AsyncHealthcareFinderAdapter,
+        lambda: HealthcareFinderAdapterFactory().create_async(healthcare_adapter=config.app.healthcare_adapter),
+    )
+
+
 def __bind_mock_healthcare_finder_adapter(binder: Binder, config: Config) -> None:
     binder.bind_to_provider(
         MockHealthcareFinderAdapter,
@@ -179,6 +253,13 @@ def __bind_zorgab_scraper_config(binder: Binder, config: Config) -> None:
     )
 
 
+def __bind_zal_import_config(binder: Binder, config: Config) -> None:
+    binder.bind_to_constructor(
+        ZalImportConfig,
+        lambda: config.zal_import,
+    )
+
+
 def __bind_identifier_provider(binder: Binder) -> None:
     binder.bind_to_constructor(
         IdentifierProvider,
@@ -208,6 +289,15 @@ def __bind_search_index_repositories(binder: Binder, config: Config) -> None:
         ),
     )
 
+    binder.bind_to_constructor(
+        EncryptedEndpointsManifestRepository,
+        lambda: EncryptedEndpointsManifestFileRepository(
+            output_path=SEARCH_INDEX_STATE_DIR / ENCRYPTED_ENDPOINTS_MANIFEST_FILENAME,
+            temp_path=SEARCH_INDEX_TEMP_DIR,
+            file_writer=AtomicFileWriter(),
+        ),
+    )
+
 
 def __bind_endpoint_repository(binder: Binder, config: Config) -> None:
     def provide_endpoint_repository() -> EndpointRepository:
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True, slots=True)
+class SingleFlightStats:
+    calls: int
+    coalesced: int
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Deduplicates concurrent calls with the same key: while a call for a key is in flight, other callers with
+    that key wait for it and share its result (or exception) instead of making the call themselves. Nothing
+    is kept once the call has completed, so this is not a cache.
+
+    `do` is meant for threads and `do_async` for coroutines on a single event loop. Calls made through one
+    are not shared with callers of the other.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__in_flight: dict[K, Future[V]] = {}
+        self.__in_flight_async: dict[K, asyncio.Task[V]] = {}
+        self.__calls = 0
+        self.__coalesced = 0
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        with self.__lock:
+            in_flight = self.__in_flight.get(key)
+
+            if in_flight is None:
+                future: Future[V] = Future()
+                self.__in_flight[key] = future
+                self.__calls += 1
+            else:
+                self.__coalesced += 1
+
+        if in_flight is not None:
+            return in_flight.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            with self.__lock:
+                del self.__in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self.__lock:
+            del self.__in_flight[key]
+
+        future.set_result(value)
+        return value
+
+    async def do_async(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        task = self.__in_flight_async.get(key)
+
+        with self.__lock:
+            if task is None:
+                self.__calls += 1
+            else:
+                self.__coalesced += 1
+
+        if task is None:
+            task = asyncio.ensure_future(self.__run_async(key, fn))
+            self.__in_flight_async[key] = task
+
+        # Shielded, so a cancelled caller does not cancel the call other callers are waiting for
+        return await asyncio.shield(task)
+
+    def stats(self) -> SingleFlightStats:
+        with self.__lock:
+            return SingleFlightStats(calls=self.__calls, coalesced=self.__coalesced)
+
+    async def __run_async(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        try:
+            return await fn()
+        finally:
+            del self.__in_flight_async[key]
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+    size: int
+    stale_hits: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self.hits + self.stale_hits
+        lookups = hits + self.misses
+        return hits / lookups if lookups else 0.0
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache where every entry expires after a fixed time-to-live.
+
+    `get_or_load` deduplicates concurrent loads: when several threads ask for the same missing
+    key, only the first one calls the loader and the others wait for its result. Loaders that
+    return None are not cached, so failed lookups are retried on the next call.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+
+        self.__max_entries = max_entries
+        self.__ttl_seconds = ttl_seconds
+        self.__clock = clock
+        self.__entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.__in_flight: dict[K, Future[V | None]] = {}
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__coalesced = 0
+        self.__evictions = 0
+
+    def get(self, key: K) -> V | None:
+        with self.__lock:
+            value = self.__lookup(key)
+
+            if value is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        with self.__lock:
+            self.__store(key, value)
+
+    def get_or_load(self, key: K, loader: Callable[[], V | None]) -> V | None:
+        with self.__lock:
+            value = self.__lookup(key)
+
+            if value is not None:
+                self.__hits += 1
+                return value
+
+            self.__misses += 1
+            in_flight = self.__in_flight.get(key)
+
+            if in_flight is None:
+                future: Future[V | None] = Future()
+                self.__in_flight[key] = future
+            else:
+                self.__coalesced += 1
+
+        if in_flight is not None:
+            return in_flight.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self.__lock:
+                del self.__in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self.__lock:
+            if value is not None:
+                self.__store(key, value)
+            del self.__in_flight[key]
+
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self.__lock:
+            return CacheStats(
+                hits=self.__hits,
+                misses=self.__misses,
+                coalesced=self.__coalesced,
+                evictions=self.__evictions,
+                size=len(self.__entries),
+            )
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__entries)
+
+    def __lookup(self, key: K) -> V | None:
+        entry = self.__entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self.__clock():
+            del self.__entries[key]
+            return None
+
+        self.__entries.move_to_end(key)
+        return value
+
+    def __store(self, key: K, value: V) -> None:
+        self.__entries[key] = (self.__clock() + self.__ttl_seconds, value)
+        self.__entries.move_to_end(key)
+
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
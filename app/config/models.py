@@ -46,6 +46,13 @@ class ConfigApp(BaseModel):
 
 class ConfigDatabase(BaseModel):
     dsn: str
+    read_dsn: str | None = Field(default=None)
+    pool_size: int = Field(default=5, ge=1)
+    max_overflow: int = Field(default=10, ge=0)
+    pool_timeout: float = Field(default=30.0, gt=0)
+    pool_recycle: int = Field(default=-1, ge=-1)
+    pool_pre_ping: bool = Field(default=False)
+    prepare_threshold: int | None = Field(default=None, ge=0)
 
 
 class ConfigZorgab(BaseModel):
@@ -54,6 +61,16 @@ class ConfigZorgab(BaseModel):
     mtls_key_file: str | None
     mtls_chain_file: str | None
     proxy: str | None
+    http2: bool = Field(default=True)
+    max_connections: int = Field(default=100, gt=0)
+    max_keepalive_connections: int = Field(default=20, ge=0)
+    keepalive_expiry: float = Field(default=30.0, ge=0)
+    timeout: float = Field(default=10.0, gt=0)
+    partof_fetch_workers: int = Field(default=8, gt=0)
+    partof_cache_max_entries: int = Field(default=10000, gt=0)
+    partof_cache_ttl_seconds: float = Field(default=3600, gt=0)
+    strict_fhir_validation: bool = Field(default=False)
+    stream_hydration_concurrency: int = Field(default=8, gt=0)
 
 
 class ConfigUvicorn(BaseModel):
@@ -74,6 +91,14 @@ class JWEConfig(BaseModel):
 class HealthcareFinderConfig(BaseModel):
     allow_search_bypass: bool = Field(default=False)
     suppress_hydration_errors: bool = Field(default=False)
+    search_cache_max_entries: int = Field(default=1000, ge=0)
+    search_cache_ttl_seconds: float = Field(default=60, gt=0)
+    search_cache_stale_seconds: float = Field(default=300, ge=0)
+
+
+class AddressingConfig(BaseModel):
+    zal_index: bool = Field(default=False)
+    zal_index_refresh_seconds: float = Field(default=30, gt=0)
 
 
 class LoggingConfig(BaseModel):
@@ -99,6 +124,12 @@ class SearchIndexationConfig(BaseModel):
     mock_addressing_path: Path = Field(default=Path("resources/search_index/mock-endpoints.json"))
 
 
+class ZalImportConfig(BaseModel):
+    bulk_insert: bool = Field(default=True)
+    batch_size: int = Field(default=1000, gt=0)
+    parse_workers: int = Field(default=0, ge=0)
+
+
 class Config(BaseModel):
     app: ConfigApp
 
@@ -108,7 +139,9 @@ class Config(BaseModel):
     database: ConfigDatabase
     jwe: JWEConfig
     healthcarefinder: HealthcareFinderConfig = HealthcareFinderConfig()
+    addressing: AddressingConfig = AddressingConfig()
     zorgab_scraper: ZorgABScraperConfig = ZorgABScraperConfig()
     normalization: NormalizationConfig = NormalizationConfig()
     benchmark: BenchmarkConfig = BenchmarkConfig()
     search_indexation: SearchIndexationConfig = SearchIndexationConfig()
+    zal_import: ZalImportConfig = ZalImportConfig()
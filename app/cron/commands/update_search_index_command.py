@@ -9,9 +9,14 @@ from app.cron.utils import SubParsers
 from app.normalization.bundle import BundleNormalizer
 from app.normalization.models import NormalizedOrganization
 from app.search_indexation.models import SearchIndex
-from app.search_indexation.repositories import EncryptedEndpointsRepository, SearchIndexRepository
+from app.search_indexation.repositories import (
+    EncryptedEndpointsManifestRepository,
+    EncryptedEndpointsRepository,
+    SearchIndexRepository,
+)
 from app.search_indexation.services import (
     EncryptedEndpointProvider,
+    EncryptedEndpointsExport,
     MockOrganizationsMerger,
 )
 from app.zorgab_scraper.config import IdentifierSource
@@ -29,6 +34,7 @@ class UpdateSearchIndexCommand:
         "search_index_repository",
         "encrypted_endpoint_provider",
         "encrypted_endpoints_repository",
+        "encrypted_endpoints_manifest_repository",
         "mock_organizations_merger",
     )
     def __init__(
@@ -38,6 +44,7 @@ class UpdateSearchIndexCommand:
         search_index_repository: SearchIndexRepository,
         encrypted_endpoint_provider: EncryptedEndpointProvider,
         encrypted_endpoints_repository: EncryptedEndpointsRepository,
+        encrypted_endpoints_manifest_repository: EncryptedEndpointsManifestRepository,
         mock_organizations_merger: MockOrganizationsMerger,
     ) -> None:
         """
@@ -50,6 +57,7 @@ class UpdateSearchIndexCommand:
         self.__search_index_repository = search_index_repository
         self.__encrypted_endpoint_provider = encrypted_endpoint_provider
         self.__encrypted_endpoints_repository = encrypted_endpoints_repository
+        self.__encrypted_endpoints_manifest_repository = encrypted_endpoints_manifest_repository
         self.__mock_organizations_merger = mock_organizations_merger
 
     @staticmethod
@@ -72,6 +80,19 @@ class UpdateSearchIndexCommand:
             default=4,
             help="Number of concurrent workers to use for scraping; set to 1 for sequential processing",
         )
+        parser.add_argument(
+            "--encrypt-workers",
+            "-e",
+            type=int,
+            default=1,
+            help="Number of processes to use for encrypting endpoints; set to 1 to encrypt in the current process",
+        )
+        parser.add_argument(
+            "--full-encryption",
+            action="store_true",
+            default=False,
+            help="Encrypt all endpoints again instead of reusing the unchanged endpoints of the previous export",
+        )
         parser.add_argument(
             "--scrape-sources",
             "-s",
@@ -102,9 +123,7 @@ class UpdateSearchIndexCommand:
                 len(merged_organizations),
             )
 
-            logger.info("Exporting encrypted endpoints for search index")
-            encrypted_endpoints = self.__encrypted_endpoint_provider.get_all()
-            logger.info("Encrypted endpoints export completed successfully")
+            encrypted_endpoints = self.__export_encrypted_endpoints(args.encrypt_workers, args.full_encryption)
 
             self.__save_search_index(SearchIndex(entries=merged_organizations))
             self.__save_encrypted_endpoints(encrypted_endpoints)
@@ -157,6 +176,21 @@ class UpdateSearchIndexCommand:
         )
         return normalized_organizations
 
+    def __export_encrypted_endpoints(self, workers: int, full_encryption: bool) -> EncryptedEndpointsExport:
+        logger.info("Exporting encrypted endpoints for search index (full=%s)", full_encryption)
+
+        if full_encryption:
+            encrypted_endpoints = self.__encrypted_endpoint_provider.get_all(workers=workers)
+        else:
+            encrypted_endpoints = self.__encrypted_endpoint_provider.get_all_incremental(
+                self.__encrypted_endpoints_repository.load(),
+                self.__encrypted_endpoints_manifest_repository.load(),
+                workers=workers,
+            )
+
+        logger.info("Encrypted endpoints export completed successfully")
+        return encrypted_endpoints
+
     def __save_search_index(self, search_index: SearchIndex) -> None:
         logger.info("Saving search index")
 
@@ -168,11 +202,13 @@ class UpdateSearchIndexCommand:
 
         logger.info("Search index saved successfully")
 
-    def __save_encrypted_endpoints(self, encrypted_endpoints: dict[int, str]) -> None:
+    def __save_encrypted_endpoints(self, encrypted_endpoints: EncryptedEndpointsExport) -> None:
         logger.info("Saving encrypted endpoints")
 
         try:
-            self.__encrypted_endpoints_repository.save(encrypted_endpoints)
+            # The manifest goes last, so it never describes tokens that were not written
+            self.__encrypted_endpoints_repository.save(encrypted_endpoints.endpoints)
+            self.__encrypted_endpoints_manifest_repository.save(encrypted_endpoints.manifest)
         except Exception:
             logger.exception("Saving encrypted endpoints failed")
             raise
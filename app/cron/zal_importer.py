@@ -4,9 +4,10 @@ import inject
 from defusedxml.ElementTree import fromstring
 
 from app.cron.utils import SubParsers
-from app.xml.services import ElementTraverser
+from app.xml.services import ElementTraverser, StreamingElementTraverser
 from app.zal_importer.enums import ImportType
 from app.zal_importer.factories import OrganisationImporterFactory
+from app.zal_importer.importers import OrganisationImporter
 
 
 class OrganisationImportCommand:
@@ -20,16 +21,29 @@ class OrganisationImportCommand:
     def init_arguments(subparser: SubParsers) -> None:
         parser = subparser.add_parser(OrganisationImportCommand.NAME, help="imports XML files from MedMij")
         parser.add_argument("path", type=str, help="Path to the XML file to import")
+        parser.add_argument(
+            "--stream",
+            action=argparse.BooleanOptionalAction,
+            default=True,
+            help="Parse the organisations one at a time instead of loading the whole file into memory",
+        )
 
     @inject.autoparams()
     def run(self, args: argparse.Namespace, factory: OrganisationImporterFactory) -> int:
-        with open(args.path, "r") as f:
-            data = f.read()
+        if args.stream:
+            with StreamingElementTraverser.open(
+                args.path, OrganisationImporter.ORGANISATIONS_PATH, single_namespace=True
+            ) as traverser:
+                self.__import(factory, traverser)
+        else:
+            with open(args.path, "r") as f:
+                data = f.read()
 
-        xml = fromstring(data)
-        traverser = ElementTraverser(xml)
+            self.__import(factory, ElementTraverser(fromstring(data), single_namespace=True))
 
+        return 0
+
+    @staticmethod
+    def __import(factory: OrganisationImporterFactory, traverser: ElementTraverser) -> None:
         importer = factory.create_importer(importer_type=ImportType(traverser.get_root_element_name()))
         importer.process_xml(traverser)
-
-        return 0
@@ -1,19 +1,45 @@
 from logging import Logger
+from typing import Any
 
 import inject
-from sqlalchemy import create_engine, text
+from sqlalchemy import URL, create_engine, make_url, text
+from sqlalchemy.engine import Dialect
+from sqlalchemy.engine.default import DefaultDialect
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
 
+from app.config.models import ConfigDatabase
 from app.db.models import Base
+from app.db.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, PoolStats
+
+
+class ReadSession(Session):
+    """
+    Session on the read replica of the database, or on the primary when no replica is configured. Only for
+    lookups that can be served from data that is slightly behind, never for writes.
+    """
+
+
+class AsyncReadSessionFactory(async_sessionmaker[AsyncSession]):
+    """
+    Creates sessions on the async engine of the read replica, or of the primary when no replica is configured
+    """
 
 
 class Database:
     @inject.autoparams("logger")
-    def __init__(self, dsn: str, logger: Logger):
+    def __init__(self, config: ConfigDatabase, logger: Logger):
         self.__logger = logger
 
         try:
-            self.engine = create_engine(dsn, echo=False)
+            self.engine = create_engine(config.dsn, echo=False, **self.__engine_options(config.dsn, config))
+            self.read_engine = (
+                create_engine(config.read_dsn, echo=False, **self.__engine_options(config.read_dsn, config))
+                if config.read_dsn
+                else self.engine
+            )
+            self.async_read_engine = self.__create_async_engine(config.read_dsn or config.dsn, config)
         except BaseException as e:
             self.__logger.error("Error while connecting to database: %s", e)
             raise e
@@ -26,6 +52,33 @@ class Database:
         self.__logger.info("Dropping tables...")
         Base.metadata.drop_all(self.engine)
 
+    def create_async_read_session_factory(self) -> AsyncReadSessionFactory | None:
+        """
+        :return: Factory for sessions on the async read engine, or None when the database driver is not async
+        """
+        if self.async_read_engine is None:
+            return None
+
+        # Objects are read in short-lived sessions, and must stay readable after their session has closed
+        return AsyncReadSessionFactory(self.async_read_engine, expire_on_commit=False)
+
+    def pool_stats(self) -> dict[str, PoolStats]:
+        """
+        :return: Statistics of the connection pool of each engine, by "primary", "read" and "async_read". Engines
+            without a sized pool are left out, as is the read engine when it is the primary engine.
+        """
+        engines = {"primary": self.engine, "read": self.read_engine}
+        if self.async_read_engine is not None:
+            engines["async_read"] = self.async_read_engine.sync_engine
+        if self.read_engine is self.engine:
+            del engines["read"]
+
+        return {
+            name: engine.pool.stats()
+            for name, engine in engines.items()
+            if isinstance(engine.pool, InstrumentedQueuePool)
+        }
+
     def is_healthy(self) -> bool:
         """
         Check if the database is healthy
@@ -36,11 +89,51 @@ class Database:
         self.__logger.info("Checking database health")
 
         try:
-            with Session(self.engine) as session:
-                session.execute(text("SELECT 1"))
+            for engine in dict.fromkeys([self.engine, self.read_engine]):
+                with Session(engine) as session:
+                    session.execute(text("SELECT 1"))
 
             self.__logger.info("Database is healthy")
             return True
         except Exception as e:
             self.__logger.info("Database is not healthy: %s", e)
             return False
+
+    def __create_async_engine(self, dsn: str, config: ConfigDatabase) -> AsyncEngine | None:
+        if not self.__dialect(make_url(dsn), is_async=True).is_async:
+            self.__logger.info("The database driver does not support asyncio, async reads use the threadpool")
+            return None
+
+        return create_async_engine(dsn, echo=False, **self.__engine_options(dsn, config, is_async=True))
+
+    @staticmethod
+    def __engine_options(  # type: ignore[explicit-any]
+        dsn: str, config: ConfigDatabase, is_async: bool = False
+    ) -> dict[str, Any]:
+        url = make_url(dsn)
+        options: dict[str, Any] = {  # type: ignore[explicit-any]
+            "pool_recycle": config.pool_recycle,
+            "pool_pre_ping": config.pool_pre_ping,
+        }
+
+        # In-memory SQLite databases use a pool without size or timeout
+        dialect = Database.__dialect(url, is_async)
+        if issubclass(dialect, DefaultDialect) and issubclass(dialect.get_pool_class(url), QueuePool):
+            options.update(
+                pool_size=config.pool_size,
+                max_overflow=config.max_overflow,
+                pool_timeout=config.pool_timeout,
+            )
+            # Async engines need a pool with an asyncio-compatible queue
+            options["poolclass"] = InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool
+
+        if config.prepare_threshold is not None and url.get_driver_name() == "psycopg":
+            options["connect_args"] = {"prepare_threshold": config.prepare_threshold}
+
+        return options
+
+    @staticmethod
+    def __dialect(url: URL, is_async: bool) -> type[Dialect]:
+        # Drivers like psycopg have a separate dialect for async engines, which create_async_engine picks as well
+        dialect = url.get_dialect()
+        return dialect.get_async_dialect_cls(url) if is_async else dialect
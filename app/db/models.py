@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import List
 
 from pydantic import BaseModel
-from sqlalchemy import JSON, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Enum, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from app.zal_importer.enums import IdentifyingFeatureType, OrganisationType
@@ -36,6 +36,10 @@ class CityResponse(BaseModel):
 
 class Organisation(Base):
     __tablename__ = "organisations"
+    __table_args__ = (
+        # Lookups by name within an import, and finding the newest import_ref, are index-only probes
+        Index("ix_organisations_import_ref_name", "import_ref", "name"),
+    )
 
     id: Mapped[int] = mapped_column("id", Integer, primary_key=True)
     name: Mapped[str] = mapped_column("name", String(255), nullable=False)
@@ -46,8 +50,29 @@ class Organisation(Base):
         return f"<Organisation(id={self.id}, name={self.name}, type={self.type}, import_ref={self.import_ref})>"
 
 
+class CurrentImport(Base):
+    """
+    Single row pointing at the import_ref of the newest committed ZAL import, so organisation lookups do not
+    have to search the organisations table for it.
+    """
+
+    __tablename__ = "current_import"
+
+    ID = 1
+
+    id: Mapped[int] = mapped_column("id", Integer, primary_key=True)
+    import_ref: Mapped[str] = mapped_column("import_ref", String(24), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<CurrentImport(import_ref={self.import_ref})>"
+
+
 class IdentifyingFeature(Base):
     __tablename__ = "identifying_features"
+    __table_args__ = (
+        Index("ix_identifying_features_type_value", "type", "value", "organisation_id"),
+        Index("ix_identifying_features_import_ref", "import_ref"),
+    )
 
     id: Mapped[int] = mapped_column("id", Integer, primary_key=True)
     organisation_id: Mapped[int] = mapped_column(ForeignKey("organisations.id", ondelete="CASCADE"))
@@ -68,6 +93,7 @@ class IdentifyingFeature(Base):
 
 class DataService(Base):
     __tablename__ = "data_services"
+    __table_args__ = (Index("ix_data_services_organisation_id", "organisation_id"),)
 
     id: Mapped[int] = mapped_column("id", Integer, primary_key=True)
     organisation_id: Mapped[int] = mapped_column(ForeignKey("organisations.id", ondelete="CASCADE"))
@@ -96,6 +122,7 @@ class DataService(Base):
 
 class SystemRole(Base):
     __tablename__ = "system_roles"
+    __table_args__ = (Index("ix_system_roles_data_service_id", "data_service_id"),)
 
     PROVIDING_ROLE_SUFFIX = "B-FHIR"
 
@@ -123,6 +150,11 @@ class SystemRole(Base):
 
 class Endpoint(Base):
     __tablename__ = "endpoints"
+    __table_args__ = (
+        # Endpoints are shared by all imports, so concurrent imports must not create the same url twice. The url
+        # itself can be too long for a btree index, hence the hash.
+        Index("ux_endpoints_url_md5", func.md5(text("url")), unique=True).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column("id", Integer, primary_key=True)
     url: Mapped[str] = mapped_column("url", Text, nullable=False)
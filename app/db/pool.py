@@ -0,0 +1,70 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds: float
+
+    @property
+    def average_wait_seconds(self) -> float:
+        return self.wait_seconds / self.checkouts if self.checkouts else 0.0
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that keeps track of how many connections were checked out, and how long checkouts waited for
+    a connection. The wait includes opening new connections and pre-pings.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[explicit-any]
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        self.__checkouts = 0
+        self.__timeouts = 0
+        self.__wait_seconds = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+
+        try:
+            connection = super().connect()
+        except TimeoutError:
+            with self.__lock:
+                self.__timeouts += 1
+                self.__wait_seconds += time.perf_counter() - start
+            raise
+
+        with self.__lock:
+            self.__checkouts += 1
+            self.__wait_seconds += time.perf_counter() - start
+
+        return connection
+
+    def stats(self) -> PoolStats:
+        with self.__lock:
+            return PoolStats(
+                size=self.size(),
+                checked_out=self.checkedout(),
+                # Negative while fewer connections than the pool size have been opened
+                overflow=max(self.overflow(), 0),
+                checkouts=self.__checkouts,
+                timeouts=self.__timeouts,
+                wait_seconds=self.__wait_seconds,
+            )
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    InstrumentedQueuePool for async engines, which need the asyncio-compatible queue of AsyncAdaptedQueuePool
+    """
@@ -1,14 +1,18 @@
 import json
+import re
 from abc import abstractmethod
-from typing import List, Protocol
+from collections import defaultdict
+from typing import Any, Collection, Iterable, List, Mapping, Protocol, Sequence
 
 import inject
-from sqlalchemy import ScalarSelect
-from sqlalchemy.orm import Session
+from sqlalchemy import ScalarSelect, String, and_, func, insert, literal, or_, select, text, update
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from starlette.concurrency import run_in_threadpool
 
 from app.zal_importer.enums import IdentifyingFeatureType, OrganisationType
 
-from .models import DataService, Endpoint, IdentifyingFeature, Organisation, SystemRole
+from .db import AsyncReadSessionFactory, ReadSession
+from .models import Base, CurrentImport, DataService, Endpoint, IdentifyingFeature, Organisation, SystemRole
 
 
 class BaseRepository:
@@ -16,6 +20,18 @@ class BaseRepository:
     def __init__(self, session: Session):
         self._session = session
 
+    def _insert_many(self, model: type[Base], rows: Sequence[Mapping[str, object]]) -> List[int]:
+        """
+        Inserts all rows with a single batched INSERT and returns the generated ids in the order of the rows.
+        The rows bypass the session, so no ORM objects are created for them.
+        """
+        if not rows:
+            return []
+
+        primary_key = model.__table__.c.id
+        result = self._session.execute(insert(model).returning(primary_key, sort_by_parameter_order=True), rows)
+        return list(result.scalars())
+
 
 class OrganisationRepository(BaseRepository):
     def create(
@@ -40,31 +56,71 @@ class OrganisationRepository(BaseRepository):
 
         return organisation
 
+    def create_many(self, rows: Sequence[Mapping[str, object]]) -> List[int]:
+        return self._insert_many(Organisation, rows)
+
     def find_one_by_name(self, name: str) -> Organisation | None:
-        return (
-            self._session.query(Organisation)
-            .filter_by(
-                name=name,
-                import_ref=self.__latest_import_ref_subquery(),
-            )
-            .first()
-        )
+        return self._query_by_name(name).first()
 
     def find_one_by_identifying_feature(
         self,
         identifying_feature_type: IdentifyingFeatureType,
         identifying_feature_value: str,
     ) -> Organisation | None:
-        return (
-            self._session.query(Organisation)
-            .filter_by(import_ref=self.__latest_import_ref_subquery())
-            .join(IdentifyingFeature)
-            .filter(
-                IdentifyingFeature.type == identifying_feature_type,
-                IdentifyingFeature.value == identifying_feature_value,
-            )
-            .first()
+        return self._query_by_identifying_feature(identifying_feature_type, identifying_feature_value).first()
+
+    def find_ids_by_name(self) -> dict[str, int]:
+        """
+        Returns the ids of all organisations of the latest import by name
+        """
+        rows = (
+            self._session.query(Organisation.name, Organisation.id)
+            .filter(Organisation.import_ref == self.__latest_import_ref_subquery())
+            .order_by(Organisation.id.desc())
+        )
+        # In descending order, so for duplicate names the organisation with the lowest id wins, as in find_one_by_name
+        return {name: id for name, id in rows}
+
+    def find_all_by_names(self, names: Collection[str]) -> List[Organisation]:
+        if not names:
+            return []
+
+        return self._query_all_by_names(names).all()
+
+    def find_all_by_identifying_features(
+        self,
+        identifying_features: Iterable[tuple[IdentifyingFeatureType, str]],
+    ) -> List[tuple[IdentifyingFeatureType, str, Organisation]]:
+        """
+        Finds the organisations of the latest import for all given (type, value) pairs in a single query.
+        Returns the matched type and value together with each organisation.
+        """
+        query = self._query_all_by_identifying_features(identifying_features)
+        if query is None:
+            return []
+
+        return [(type, value, organisation) for type, value, organisation in query.all()]
+
+    def find_latest_import_ref(self) -> str | None:
+        """
+        Returns the import_ref that the lookups read the organisations of
+        """
+        return self._session.scalar(select(self.__latest_import_ref_subquery()))
+
+    def find_all_by_import_ref(self, import_ref: str) -> List[Organisation]:
+        return self._session.query(Organisation).filter_by(import_ref=import_ref).order_by(Organisation.id).all()
+
+    def find_identifying_features_by_import_ref(self, import_ref: str) -> List[tuple[IdentifyingFeatureType, str, int]]:
+        """
+        Returns the type, value and organisation id of the identifying features of the organisations of an import
+        """
+        rows = (
+            self._session.query(IdentifyingFeature.type, IdentifyingFeature.value, IdentifyingFeature.organisation_id)
+            .join(Organisation, IdentifyingFeature.organisation_id == Organisation.id)
+            .filter(Organisation.import_ref == import_ref)
+            .order_by(Organisation.id)
         )
+        return [(type, value, organisation_id) for type, value, organisation_id in rows]
 
     def has_one_by_import_ref(
         self,
@@ -87,14 +143,249 @@ class OrganisationRepository(BaseRepository):
         )
         self._session.commit()
 
-    def __latest_import_ref_subquery(self) -> ScalarSelect[str]:
+    def _query_by_name(self, name: str) -> Query[Organisation]:
         return (
-            self._session.query(Organisation.import_ref)
-            .order_by(Organisation.import_ref.desc())
-            .limit(1)
-            .scalar_subquery()
+            self._session.query(Organisation)
+            .filter_by(
+                name=name,
+                import_ref=self.__latest_import_ref_subquery(),
+            )
+            .order_by(Organisation.id)
+        )
+
+    def _query_by_identifying_feature(
+        self,
+        identifying_feature_type: IdentifyingFeatureType,
+        identifying_feature_value: str,
+    ) -> Query[Organisation]:
+        return (
+            self._session.query(Organisation)
+            .filter_by(import_ref=self.__latest_import_ref_subquery())
+            .join(IdentifyingFeature)
+            .filter(
+                IdentifyingFeature.type == identifying_feature_type,
+                IdentifyingFeature.value == identifying_feature_value,
+            )
+            .order_by(Organisation.id)
+        )
+
+    def _query_all_by_names(self, names: Collection[str]) -> Query[Organisation]:
+        return (
+            self._session.query(Organisation)
+            .filter(
+                Organisation.name.in_(names),
+                Organisation.import_ref == self.__latest_import_ref_subquery(),
+            )
+            .order_by(Organisation.id)
+        )
+
+    def _query_all_by_identifying_features(  # type: ignore[explicit-any]
+        self,
+        identifying_features: Iterable[tuple[IdentifyingFeatureType, str]],
+    ) -> Query[Any] | None:
+        """
+        :return: The query for (type, value, organisation) rows, or None when there are no identifying features
+        """
+        values_by_type: dict[IdentifyingFeatureType, set[str]] = defaultdict(set)
+        for identifying_feature_type, identifying_feature_value in identifying_features:
+            values_by_type[identifying_feature_type].add(identifying_feature_value)
+
+        if not values_by_type:
+            return None
+
+        return (
+            self._session.query(IdentifyingFeature.type, IdentifyingFeature.value, Organisation)
+            .join(Organisation, IdentifyingFeature.organisation_id == Organisation.id)
+            .filter(
+                Organisation.import_ref == self.__latest_import_ref_subquery(),
+                or_(
+                    *(
+                        and_(IdentifyingFeature.type == type, IdentifyingFeature.value.in_(values))
+                        for type, values in values_by_type.items()
+                    )
+                ),
+            )
+            .order_by(Organisation.id)
+        )
+
+    def __latest_import_ref_subquery(self) -> ScalarSelect[str]:
+        # Falls back to the newest import_ref for databases in which no import has set the current import yet
+        return self._session.query(
+            func.coalesce(
+                self._session.query(CurrentImport.import_ref).filter_by(id=CurrentImport.ID).scalar_subquery(),
+                self._session.query(func.max(Organisation.import_ref)).scalar_subquery(),
+            )
+        ).scalar_subquery()
+
+
+class ReadOrganisationRepository(OrganisationRepository):
+    """
+    OrganisationRepository on the read session, for the lookups of the addressing endpoints. The async variants
+    of the lookups run on the async read engine, or in the threadpool when the database driver is not async.
+    """
+
+    @inject.params(session=ReadSession, async_sessions=AsyncReadSessionFactory)
+    def __init__(self, session: Session, async_sessions: AsyncReadSessionFactory | None = None) -> None:
+        super().__init__(session)
+        self.__async_sessions = async_sessions
+
+    async def find_one_by_name_async(self, name: str) -> Organisation | None:
+        if self.__async_sessions is None:
+            return await run_in_threadpool(self.find_one_by_name, name)
+
+        async with self.__async_sessions() as session:
+            return (await session.scalars(self._query_by_name(name).limit(1).statement)).first()
+
+    async def find_one_by_identifying_feature_async(
+        self,
+        identifying_feature_type: IdentifyingFeatureType,
+        identifying_feature_value: str,
+    ) -> Organisation | None:
+        if self.__async_sessions is None:
+            return await run_in_threadpool(
+                self.find_one_by_identifying_feature, identifying_feature_type, identifying_feature_value
+            )
+
+        query = self._query_by_identifying_feature(identifying_feature_type, identifying_feature_value)
+        async with self.__async_sessions() as session:
+            return (await session.scalars(query.limit(1).statement)).first()
+
+    async def find_all_by_names_async(self, names: Collection[str]) -> List[Organisation]:
+        if self.__async_sessions is None:
+            return await run_in_threadpool(self.find_all_by_names, names)
+
+        if not names:
+            return []
+
+        async with self.__async_sessions() as session:
+            return list((await session.scalars(self._query_all_by_names(names).statement)).all())
+
+    async def find_all_by_identifying_features_async(
+        self,
+        identifying_features: Iterable[tuple[IdentifyingFeatureType, str]],
+    ) -> List[tuple[IdentifyingFeatureType, str, Organisation]]:
+        if self.__async_sessions is None:
+            return await run_in_threadpool(self.find_all_by_identifying_features, identifying_features)
+
+        query = self._query_all_by_identifying_features(identifying_features)
+        if query is None:
+            return []
+
+        async with self.__async_sessions() as session:
+            rows = await session.execute(query.statement)
+            return [(type, value, organisation) for type, value, organisation in rows]
+
+
+class CurrentImportRepository(BaseRepository):
+    def find_import_ref(self) -> str | None:
+        current_import = self._session.get(CurrentImport, CurrentImport.ID)
+        return current_import.import_ref if current_import is not None else None
+
+    def advance(self, import_ref: str, persist: bool = False) -> None:
+        """
+        Points the current import at the given import_ref, unless a newer import is current already
+        """
+        current_import = self._session.get(CurrentImport, CurrentImport.ID, with_for_update=True)
+
+        if current_import is None:
+            self._session.add(CurrentImport(id=CurrentImport.ID, import_ref=import_ref))
+        elif current_import.import_ref < import_ref:
+            current_import.import_ref = import_ref
+
+        if persist:
+            self._session.commit()
+        else:
+            self._session.flush()
+
+
+class ImportPartitionRepository(BaseRepository):
+    """
+    Manages the partitions of databases in which the ZAL tables are list-partitioned by the import_ref of their
+    organisation (see sql/partitioning). Each import has a partition per table, so expiring it is a DROP instead
+    of a cascading DELETE.
+    """
+
+    # Referenced tables come first, so partitions are dropped in reverse order
+    TABLES = ("organisations", "data_services", "system_roles", "identifying_features")
+    IMPORT_REF_REGEX = re.compile(r"[0-9A-Za-z_]{1,24}")
+
+    def is_partitioned(self) -> bool:
+        if self._session.get_bind().dialect.name != "postgresql":
+            return False
+
+        query = text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'organisations'::regclass)")
+        return bool(self._session.execute(query).scalar())
+
+    def create_partitions(self, import_ref: str) -> None:
+        """
+        Creates and commits the empty partitions of an import, then sets the import_ref that rows inserted in the
+        rest of the import transaction default to.
+
+        Each partition is created as a table of its own and then attached. Attaching locks the parent table with
+        SHARE UPDATE EXCLUSIVE, where CREATE TABLE ... PARTITION OF would take an ACCESS EXCLUSIVE lock that blocks
+        every lookup on the parent until the import commits. Being committed before the import is written, even
+        those locks are only held for a moment.
+        """
+        self.__validate(import_ref)
+        bound = self.__quote_literal(import_ref)
+
+        for table in self.TABLES:
+            parent = self.__quote_identifier(table)
+            partition = self.__quote_identifier(f"{table}_{import_ref}")
+            self._session.execute(text(f"CREATE TABLE {partition} (LIKE {parent} INCLUDING ALL)"))
+            self._session.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {partition} FOR VALUES IN ({bound})"))
+        self._session.commit()
+
+        self._session.execute(
+            text("SELECT set_config('zal.import_ref', :import_ref, true)"), {"import_ref": import_ref}
         )
 
+    def drop_partitions(self, import_refs: Iterable[str]) -> None:
+        """
+        Detaches and drops the partitions of the imports.
+
+        The partitions are detached concurrently, which locks the parent table with SHARE UPDATE EXCLUSIVE, where
+        a plain detach takes an ACCESS EXCLUSIVE lock that blocks every lookup on it. A concurrent detach cannot
+        run in a transaction, so the statements run on a connection of their own in autocommit mode. As they are
+        committed one by one, a detach that was interrupted is finalized and partitions that are gone already are
+        skipped, so a drop that failed halfway can be repeated.
+        """
+        import_refs = list(import_refs)
+        for import_ref in import_refs:
+            self.__validate(import_ref)
+
+        # A concurrent detach waits for every transaction that uses the parent table, including this session's
+        self._session.commit()
+
+        with self._session.get_bind().engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for import_ref in import_refs:
+                # Dropped right after its detach, as a detached partition still has the foreign keys of its parent,
+                # so the partition it references could not be detached while it exists
+                for table in reversed(self.TABLES):
+                    parent = self.__quote_identifier(table)
+                    partition = self.__quote_identifier(f"{table}_{import_ref}")
+                    detach_pending = connection.execute(
+                        text("SELECT inhdetachpending FROM pg_inherits WHERE inhrelid = to_regclass(:partition)"),
+                        {"partition": partition},
+                    ).scalar()
+                    if detach_pending is not None:
+                        mode = "FINALIZE" if detach_pending else "CONCURRENTLY"
+                        connection.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {partition} {mode}"))
+                    connection.execute(text(f"DROP TABLE IF EXISTS {partition}"))
+
+    def __validate(self, import_ref: str) -> None:
+        # Partition names and bounds cannot be bound parameters, so only plain references are accepted, and they
+        # are quoted all the same
+        if not self.IMPORT_REF_REGEX.fullmatch(import_ref):
+            raise ValueError(f"Invalid import reference for a partition: {import_ref!r}")
+
+    def __quote_identifier(self, name: str) -> str:
+        return self._session.get_bind().dialect.identifier_preparer.quote(name)
+
+    def __quote_literal(self, value: str) -> str:
+        dialect = self._session.get_bind().dialect
+        return str(literal(value, String).compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
 
 class DataServiceRepository(BaseRepository):
     def create(
@@ -129,13 +420,95 @@ class DataServiceRepository(BaseRepository):
 
         return data_service
 
+    def create_many(self, rows: Sequence[Mapping[str, object]]) -> List[int]:
+        return self._insert_many(DataService, rows)
+
     def find_one_by_organisation_and_external_id(self, organisation_id: int, external_id: str) -> DataService | None:
         return (
             self._session.query(DataService).filter_by(organisation_id=organisation_id, external_id=external_id).first()
         )
 
+    def find_ids_by_organisation_and_external_id(self, organisation_ids: Collection[int]) -> dict[tuple[int, str], int]:
+        """
+        Returns the ids of the data services of the given organisations by (organisation id, external id)
+        """
+        if not organisation_ids:
+            return {}
+
+        rows = (
+            self._session.query(DataService.organisation_id, DataService.external_id, DataService.id)
+            .filter(DataService.organisation_id.in_(organisation_ids))
+            .order_by(DataService.id.desc())
+        )
+        return {(organisation_id, external_id): id for organisation_id, external_id, id in rows}
+
+    def update_many(self, rows: Sequence[Mapping[str, object]]) -> None:
+        """
+        Updates the data services with a single batched UPDATE. Each row holds the id of the data service and the
+        values to set.
+        """
+        if rows:
+            self._session.execute(update(DataService), rows)
+
     def find_all_by_organisation(self, organisation_id: int) -> List[DataService]:
-        return self._session.query(DataService).filter_by(organisation_id=organisation_id).all()
+        return self._query_by_organisation(organisation_id).all()
+
+    def find_all_by_organisations(self, organisation_ids: Collection[int]) -> List[DataService]:
+        if not organisation_ids:
+            return []
+
+        return self._query_all_by_organisations(organisation_ids).all()
+
+    def _query_by_organisation(self, organisation_id: int) -> Query[DataService]:
+        return self.__query_with_endpoints().filter_by(organisation_id=organisation_id)
+
+    def _query_all_by_organisations(self, organisation_ids: Collection[int]) -> Query[DataService]:
+        return (
+            self.__query_with_endpoints()
+            .filter(DataService.organisation_id.in_(organisation_ids))
+            .order_by(DataService.id)
+        )
+
+    def __query_with_endpoints(self) -> Query[DataService]:
+        """
+        Loads data services together with their auth and token endpoints, and their roles with resource
+        endpoints in a second query, so the number of queries does not grow with the number of data services.
+        """
+        return self._session.query(DataService).options(
+            joinedload(DataService.auth_endpoint),
+            joinedload(DataService.token_endpoint),
+            selectinload(DataService.roles).joinedload(SystemRole.resource_endpoint),
+        )
+
+
+class ReadDataServiceRepository(DataServiceRepository):
+    """
+    DataServiceRepository on the read session, for the lookups of the addressing endpoints. The async variants
+    of the lookups run on the async read engine, or in the threadpool when the database driver is not async.
+    """
+
+    @inject.params(session=ReadSession, async_sessions=AsyncReadSessionFactory)
+    def __init__(self, session: Session, async_sessions: AsyncReadSessionFactory | None = None) -> None:
+        super().__init__(session)
+        self.__async_sessions = async_sessions
+
+    async def find_all_by_organisation_async(self, organisation_id: int) -> List[DataService]:
+        if self.__async_sessions is None:
+            return await run_in_threadpool(self.find_all_by_organisation, organisation_id)
+
+        async with self.__async_sessions() as session:
+            return list((await session.scalars(self._query_by_organisation(organisation_id).statement)).all())
+
+    async def find_all_by_organisations_async(self, organisation_ids: Collection[int]) -> List[DataService]:
+        if self.__async_sessions is None:
+            return await run_in_threadpool(self.find_all_by_organisations, organisation_ids)
+
+        if not organisation_ids:
+            return []
+
+        async with self.__async_sessions() as session:
+            query = self._query_all_by_organisations(organisation_ids)
+            return list((await session.scalars(query.statement)).all())
 
 
 class SystemRoleRepository(BaseRepository):
@@ -161,6 +534,9 @@ class SystemRoleRepository(BaseRepository):
 
         return system_role
 
+    def create_many(self, rows: Sequence[Mapping[str, object]]) -> List[int]:
+        return self._insert_many(SystemRole, rows)
+
 
 class IdentifyingFeatureRepository(BaseRepository):
     def create(
@@ -187,6 +563,9 @@ class IdentifyingFeatureRepository(BaseRepository):
 
         return identifying_feature
 
+    def create_many(self, rows: Sequence[Mapping[str, object]]) -> List[int]:
+        return self._insert_many(IdentifyingFeature, rows)
+
     def has_one_by_import_ref(self, import_ref: str) -> bool:
         return self._session.query(IdentifyingFeature).filter_by(import_ref=import_ref).first() is not None
 
@@ -211,8 +590,17 @@ class DbEndpointRepository(BaseRepository, EndpointRepository):
 
         return endpoint
 
+    def create_many(self, urls: Sequence[str]) -> dict[str, int]:
+        """
+        Creates an endpoint for each url and returns their ids by url
+        """
+        return dict(zip(urls, self._insert_many(Endpoint, [{"url": url} for url in urls]), strict=True))
+
     def find_one_by_url(self, url: str) -> Endpoint | None:
         return self._session.query(Endpoint).filter_by(url=url).first()
 
+    def find_ids_by_url(self) -> dict[str, int]:
+        return {url: id for id, url in self._session.query(Endpoint.id, Endpoint.url)}
+
     def find_all(self) -> List[Endpoint]:
         return self._session.query(Endpoint).all()
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from app.cache.ttl_cache import CacheStats
+
+from .models import SearchRequest, SearchResponse
+
+logger = logging.getLogger(__name__)
+
+SearchKey = tuple[tuple[str, str], ...]
+
+FREE_TEXT_FIELDS = frozenset({"name", "city", "text"})
+
+
+@dataclass(frozen=True, slots=True)
+class _CachedResponse:
+    fresh_until: float
+    stale_until: float
+    response: SearchResponse
+
+
+class SearchResponseCache:
+    """
+    LRU cache of search responses, keyed on the normalized search request.
+
+    Responses are fresh for `ttl_seconds`. For another `stale_seconds` after that they are still
+    served, while a single background task refreshes the entry (stale-while-revalidate). Concurrent
+    misses for the same search share one upstream request. Empty (None) responses and errors are not
+    cached. A `max_entries` of 0 disables caching.
+
+    The cache is not thread-safe and must only be used from the event loop, including reading its stats.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        stale_seconds: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 0:
+            raise ValueError("max_entries must not be negative")
+
+        self.__max_entries = max_entries
+        self.__ttl_seconds = ttl_seconds
+        self.__stale_seconds = stale_seconds
+        self.__clock = clock
+        self.__entries: OrderedDict[SearchKey, _CachedResponse] = OrderedDict()
+        self.__in_flight: dict[SearchKey, asyncio.Task[SearchResponse | None]] = {}
+        self.__hits = 0
+        self.__stale_hits = 0
+        self.__misses = 0
+        self.__coalesced = 0
+        self.__evictions = 0
+
+    @staticmethod
+    def create_key(search: SearchRequest) -> SearchKey:
+        """
+        Returns a key that is equal for searches that only differ in empty fields, or in the casing and whitespace
+        of their free-text fields. Identifiers are compared exactly.
+        """
+        return tuple(
+            (field, " ".join(value.split()).casefold() if field in FREE_TEXT_FIELDS else value)
+            for field, value in sorted(search.model_dump().items())
+            if isinstance(value, str) and value.strip()
+        )
+
+    async def get_or_load(
+        self,
+        search: SearchRequest,
+        loader: Callable[[], Awaitable[SearchResponse | None]],
+    ) -> SearchResponse | None:
+        if self.__max_entries == 0:
+            self.__misses += 1
+            return await loader()
+
+        key = self.create_key(search)
+        now = self.__clock()
+        entry = self.__entries.get(key)
+
+        if entry is not None and now < entry.stale_until:
+            self.__entries.move_to_end(key)
+
+            if now < entry.fresh_until:
+                self.__hits += 1
+            else:
+                self.__stale_hits += 1
+                self.__load_in_background(key, loader)
+
+            return entry.response
+
+        if entry is not None:
+            del self.__entries[key]
+
+        self.__misses += 1
+        task = self.__in_flight.get(key)
+
+        if task is None:
+            task = self.__start_load(key, loader)
+        else:
+            self.__coalesced += 1
+
+        # Shielded, so a cancelled request does not cancel the load other requests are waiting for
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.__hits,
+            misses=self.__misses,
+            coalesced=self.__coalesced,
+            evictions=self.__evictions,
+            size=len(self.__entries),
+            stale_hits=self.__stale_hits,
+        )
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __load_in_background(
+        self,
+        key: SearchKey,
+        loader: Callable[[], Awaitable[SearchResponse | None]],
+    ) -> None:
+        if key in self.__in_flight:
+            return
+
+        self.__start_load(key, loader).add_done_callback(self.__log_refresh_failure)
+
+    def __start_load(
+        self,
+        key: SearchKey,
+        loader: Callable[[], Awaitable[SearchResponse | None]],
+    ) -> asyncio.Task[SearchResponse | None]:
+        task = asyncio.ensure_future(self.__load(key, loader))
+        self.__in_flight[key] = task
+        return task
+
+    async def __load(
+        self,
+        key: SearchKey,
+        loader: Callable[[], Awaitable[SearchResponse | None]],
+    ) -> SearchResponse | None:
+        try:
+            response = await loader()
+        finally:
+            del self.__in_flight[key]
+
+        if response is not None:
+            self.__store(key, response)
+
+        return response
+
+    def __store(self, key: SearchKey, response: SearchResponse) -> None:
+        now = self.__clock()
+        fresh_until = now + self.__ttl_seconds
+        self.__entries[key] = _CachedResponse(
+            fresh_until=fresh_until,
+            stale_until=fresh_until + self.__stale_seconds,
+            response=response,
+        )
+        self.__entries.move_to_end(key)
+
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+
+    @staticmethod
+    def __log_refresh_failure(task: asyncio.Task[SearchResponse | None]) -> None:
+        if task.cancelled():
+            return
+
+        exception = task.exception()
+        if exception is not None:
+            logger.warning("Failed to refresh stale search response: %s", exception)
@@ -5,19 +5,30 @@ import inject
 from app.addressing.addressing_service import AddressingService
 from app.config.models import Config, HealthcareAdapterType
 from app.exceptions.config_exception import ConfigException
-from app.healthcarefinder.interface import HealthcareFinderAdapter
+from app.healthcarefinder.interface import AsyncHealthcareFinderAdapter, HealthcareFinderAdapter
 from app.healthcarefinder.mock.adapter import MockHealthcareFinderAdapter
+from app.healthcarefinder.threaded import ThreadedHealthcareFinderAdapter
+from app.healthcarefinder.zorgab.cache import PartOfOrganizationCache, ZorgABSearchSingleFlight
 from app.healthcarefinder.zorgab.hydration_service import HydrationService
-from app.healthcarefinder.zorgab.zorgab import ZorgABAdapter
+from app.healthcarefinder.zorgab.zorgab import AsyncZorgABAdapter, ZorgABAdapter
 from app.healthcarefinder.zorgab_mock.zorgab_mock import ZorgABMockHydrationAdapter
 
 
 class HealthcareFinderAdapterFactory:
-    @inject.autoparams("addressing_service", "logger", "config")
-    def __init__(self, addressing_service: AddressingService, logger: Logger, config: Config):
+    @inject.autoparams("addressing_service", "logger", "config", "partof_cache", "search_single_flight")
+    def __init__(
+        self,
+        addressing_service: AddressingService,
+        logger: Logger,
+        config: Config,
+        partof_cache: PartOfOrganizationCache,
+        search_single_flight: ZorgABSearchSingleFlight,
+    ):
         self.__addressing_service = addressing_service
         self.__logger = logger
         self.__config = config
+        self.__partof_cache = partof_cache
+        self.__search_single_flight = search_single_flight
 
     def create(
         self,
@@ -39,6 +50,15 @@ class HealthcareFinderAdapterFactory:
             case _:
                 raise ConfigException("Unknown healthcarefinder adapter")
 
+    def create_async(
+        self,
+        healthcare_adapter: HealthcareAdapterType,
+    ) -> AsyncHealthcareFinderAdapter:
+        if healthcare_adapter == HealthcareAdapterType.zorgab:
+            return self._get_async_zorgab_adapter()
+
+        return ThreadedHealthcareFinderAdapter(self.create(healthcare_adapter=healthcare_adapter))
+
     def _get_zorgab_adapter(
         self,
     ) -> ZorgABAdapter:
@@ -48,6 +68,32 @@ class HealthcareFinderAdapterFactory:
             mtls_key_file=self.__config.zorgab.mtls_key_file,
             mtls_chain_file=self.__config.zorgab.mtls_chain_file,
             proxy=self.__config.zorgab.proxy,
+            partof_fetch_workers=self.__config.zorgab.partof_fetch_workers,
+            partof_cache=self.__partof_cache,
+            strict_fhir_validation=self.__config.zorgab.strict_fhir_validation,
+            search_single_flight=self.__search_single_flight,
+            hydration_service=HydrationService(self.__addressing_service, self.__logger),
+            logger=self.__logger,
+            suppress_hydration_errors=self.__config.healthcarefinder.suppress_hydration_errors,
+        )
+
+    def _get_async_zorgab_adapter(
+        self,
+    ) -> AsyncZorgABAdapter:
+        return AsyncZorgABAdapter(
+            base_url=self.__config.zorgab.base_url,
+            mtls_cert_file=self.__config.zorgab.mtls_cert_file,
+            mtls_key_file=self.__config.zorgab.mtls_key_file,
+            mtls_chain_file=self.__config.zorgab.mtls_chain_file,
+            proxy=self.__config.zorgab.proxy,
+            http2=self.__config.zorgab.http2,
+            max_connections=self.__config.zorgab.max_connections,
+            max_keepalive_connections=self.__config.zorgab.max_keepalive_connections,
+            keepalive_expiry=self.__config.zorgab.keepalive_expiry,
+            timeout=self.__config.zorgab.timeout,
+            strict_fhir_validation=self.__config.zorgab.strict_fhir_validation,
+            stream_hydration_concurrency=self.__config.zorgab.stream_hydration_concurrency,
+            search_single_flight=self.__search_single_flight,
             hydration_service=HydrationService(self.__addressing_service, self.__logger),
             logger=self.__logger,
             suppress_hydration_errors=self.__config.healthcarefinder.suppress_hydration_errors,
@@ -1,26 +1,51 @@
+from typing import AsyncIterator
+
 import inject
+from starlette.concurrency import run_in_threadpool
 
-from .interface import HealthcareFinderAdapter
+from .cache import SearchResponseCache
+from .interface import AsyncHealthcareFinderAdapter
 from .mock.adapter import MockHealthcareFinderAdapter
-from .models import SearchRequest, SearchResponse
+from .models import Organization, SearchRequest, SearchResponse
+from .threaded import iterate_organizations
 
 
 class HealthcareFinder:
-    @inject.autoparams()
+    @inject.autoparams("adapter", "mock_adapter")
     def __init__(
         self,
-        adapter: HealthcareFinderAdapter,
+        adapter: AsyncHealthcareFinderAdapter,
         mock_adapter: MockHealthcareFinderAdapter,
-        allow_search_bypass: bool,
+        allow_search_bypass: bool = False,
+        response_cache: SearchResponseCache | None = None,
     ) -> None:
-        self.__adapter: HealthcareFinderAdapter = adapter
+        self.__adapter: AsyncHealthcareFinderAdapter = adapter
         self.__mock_adapter: MockHealthcareFinderAdapter = mock_adapter
         self.__allow_search_bypass = allow_search_bypass
+        self.__response_cache = response_cache
 
-    def search_organizations(self, search: SearchRequest) -> SearchResponse | None:
+    async def search_organizations(self, search: SearchRequest) -> SearchResponse | None:
         if self.__allow_search_bypass and self.__is_search_bypass_requested(search):
-            return self.__mock_adapter.search_organizations(search=search)
-        return self.__adapter.search_organizations(search=search)
+            return await run_in_threadpool(self.__mock_adapter.search_organizations, search=search)
+
+        if self.__response_cache is None:
+            return await self.__adapter.search_organizations(search=search)
+
+        return await self.__response_cache.get_or_load(
+            search, lambda: self.__adapter.search_organizations(search=search)
+        )
+
+    async def stream_organizations(self, search: SearchRequest) -> AsyncIterator[Organization]:
+        """
+        Returns an iterator over the organizations of a search, yielding them as soon as they are hydrated.
+
+        Streamed searches are not served from, or stored in, the response cache.
+        """
+        if self.__allow_search_bypass and self.__is_search_bypass_requested(search):
+            response = await run_in_threadpool(self.__mock_adapter.search_organizations, search=search)
+            return iterate_organizations(response)
+
+        return await self.__adapter.stream_organizations(search=search)
 
     def __is_search_bypass_requested(self, search: SearchRequest) -> bool:
         name = search.name
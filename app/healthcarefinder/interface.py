@@ -1,10 +1,16 @@
-from typing import Protocol
+from typing import AsyncIterator, Protocol
 
 from fhir.resources.STU3.bundle import Bundle
 
-from app.healthcarefinder.models import SearchRequest, SearchResponse
+from app.healthcarefinder.models import Organization, SearchRequest, SearchResponse
 
 
 class HealthcareFinderAdapter(Protocol):
     def search_organizations(self, search: SearchRequest) -> SearchResponse | None: ...
     def search_organizations_raw_fhir(self, search: SearchRequest) -> Bundle | None: ...
+
+
+class AsyncHealthcareFinderAdapter(Protocol):
+    async def search_organizations(self, search: SearchRequest) -> SearchResponse | None: ...
+    async def stream_organizations(self, search: SearchRequest) -> AsyncIterator[Organization]: ...
+    async def aclose(self) -> None: ...
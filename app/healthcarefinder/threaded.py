@@ -0,0 +1,36 @@
+from typing import AsyncIterator
+
+from starlette.concurrency import run_in_threadpool
+
+from app.healthcarefinder.interface import AsyncHealthcareFinderAdapter, HealthcareFinderAdapter
+from app.healthcarefinder.models import Organization, SearchRequest, SearchResponse
+
+
+class ThreadedHealthcareFinderAdapter(AsyncHealthcareFinderAdapter):
+    """
+    Exposes a synchronous HealthcareFinderAdapter through the async interface by running
+    its searches in the threadpool, so it does not block the event loop.
+    """
+
+    def __init__(self, adapter: HealthcareFinderAdapter) -> None:
+        self.__adapter = adapter
+
+    async def search_organizations(self, search: SearchRequest) -> SearchResponse | None:
+        return await run_in_threadpool(self.__adapter.search_organizations, search)
+
+    async def stream_organizations(self, search: SearchRequest) -> AsyncIterator[Organization]:
+        return iterate_organizations(await self.search_organizations(search))
+
+    async def aclose(self) -> None:
+        return None
+
+
+async def iterate_organizations(response: SearchResponse | None) -> AsyncIterator[Organization]:
+    """
+    Yields the organizations of an already complete search response, for adapters that cannot stream
+    """
+    if response is None:
+        return
+
+    for organization in response.organizations:
+        yield organization
@@ -0,0 +1,22 @@
+from typing import Any
+
+from fhir.resources.STU3.organization import Organization as FhirOrganization
+
+from app.cache.single_flight import SingleFlight
+from app.cache.ttl_cache import TTLCache
+
+
+class PartOfOrganizationCache(TTLCache[str, FhirOrganization]):
+    """
+    Process-wide cache of trimmed partOf (parent) organizations, keyed by their `Organization/<id>`
+    reference. Many scraped organizations share the same few parents, so this saves a ZorgAB round
+    trip and a FHIR validation for every repeated parent.
+    """
+
+
+class ZorgABSearchSingleFlight(SingleFlight[tuple[str, str], Any]):  # type: ignore[explicit-any]
+    """
+    Process-wide deduplication of ZorgAB searches, keyed by the parse mode and the encoded FHIR search
+    parameters. When many users search for the same term at once, only one request goes out to ZorgAB and
+    all of them share its parsed bundle.
+    """
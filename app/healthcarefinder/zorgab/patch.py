@@ -4,20 +4,34 @@ from typing import Any
 
 class TimestampPatcher:
     TIMESTAMP_REGEX = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?$")
+    MIN_TIMESTAMP_LENGTH = len("YYYY-MM-DDTHH:MM:SS")
 
     @classmethod
     def patch(cls, data: Any) -> Any:  # type: ignore[explicit-any]
-        """Recursively traverse dicts/lists and append 'Z' to timestamps missing timezone."""
-        if isinstance(data, dict):
-            for key, value in data.items():
-                data[key] = cls.patch(value)
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                data[i] = cls.patch(item)
+        """Traverse dicts/lists in place and append 'Z' to timestamps missing timezone."""
+        if isinstance(data, (dict, list)):
+            cls._patch_container(data)
         elif isinstance(data, str) and cls._is_timestamp_missing_timezone(data):
             return data + "Z"
         return data
 
+    @classmethod
+    def _patch_container(cls, container: dict[Any, Any] | list[Any]) -> None:  # type: ignore[explicit-any]
+        # Decoded JSON only holds plain dicts, lists and strings, so exact type checks are enough here. Values
+        # are only written back when they change, and the regex only runs on strings shaped like a timestamp.
+        items = container.items() if type(container) is dict else enumerate(container)
+        for key, value in items:
+            value_type = type(value)
+            if value_type is str:
+                if (
+                    len(value) >= cls.MIN_TIMESTAMP_LENGTH
+                    and value[10] == "T"
+                    and cls._is_timestamp_missing_timezone(value)
+                ):
+                    container[key] = value + "Z"
+            elif value_type is dict or value_type is list:
+                cls._patch_container(value)
+
     @classmethod
     def _is_timestamp_missing_timezone(cls, value: str) -> bool:
         # Only match timestamps that exactly match YYYY-MM-DDTHH:MM:SS(.SSS)? with no timezone
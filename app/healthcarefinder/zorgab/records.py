@@ -0,0 +1,223 @@
+"""
+Compact records of the parts of a ZorgAB FHIR Organization that are read during hydration.
+
+The records can be built straight from the decoded JSON of a search response, which skips validating the
+whole bundle with fhir.resources, or from an already validated FHIR Organization.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Iterable, TypeVar
+
+from fhir.resources.STU3.extension import Extension
+from fhir.resources.STU3.organization import Organization as FhirOrganization
+
+from app.fhir_uris import FHIR_STRUCTUREDEFINITION_GEOLOCATION
+
+E = TypeVar("E")
+
+
+@dataclass(frozen=True, slots=True)
+class IdentifierRecord:
+    system: str
+    value: str
+
+
+@dataclass(frozen=True, slots=True)
+class CodingRecord:
+    code: str | None
+    display: str | None
+    system: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class AddressRecord:
+    text: str | None
+    lines: tuple[str, ...]
+    city: str | None
+    country: str | None
+    postal_code: str | None
+    latitude: Decimal | float | None
+    longitude: Decimal | float | None
+
+
+@dataclass(frozen=True, slots=True)
+class OrganizationRecord:
+    id: str | None
+    name: str | None
+    identifiers: tuple[IdentifierRecord, ...]
+    types: tuple[CodingRecord, ...]
+    addresses: tuple[AddressRecord, ...]
+
+    @classmethod
+    def from_json(cls, resource: Any) -> "OrganizationRecord":  # type: ignore[explicit-any]
+        """
+        Build a record from a decoded FHIR Organization resource, without validating the fields it does not read
+
+        :raises ValueError: When the resource is not an Organization or a field that is read has the wrong shape
+        """
+        if not isinstance(resource, dict) or resource.get("resourceType", "Organization") != "Organization":
+            raise ValueError("Bundle entry does not contain an Organization resource")
+
+        identifiers = []
+        for identifier in _objects(resource.get("identifier")):
+            system = _optional_str(identifier.get("system"))
+            value = _optional_str(identifier.get("value"))
+            if system is not None and value is not None:
+                identifiers.append(IdentifierRecord(system=system, value=value))
+
+        types = []
+        for type_entry in _objects(resource.get("type")):
+            codings = _objects(type_entry.get("coding"))
+            if codings:
+                types.append(
+                    CodingRecord(
+                        code=_optional_str(codings[0].get("code")),
+                        display=_optional_str(codings[0].get("display")),
+                        system=_optional_str(codings[0].get("system")),
+                    )
+                )
+
+        addresses = []
+        for address in _objects(resource.get("address")):
+            latitude, longitude = _find_geolocation_in_json(_objects(address.get("extension")))
+            addresses.append(
+                AddressRecord(
+                    text=_optional_str(address.get("text")),
+                    lines=tuple(str(line) for line in _list(address.get("line"))),
+                    city=_optional_str(address.get("city")),
+                    country=_optional_str(address.get("country")),
+                    postal_code=_optional_str(address.get("postalCode")),
+                    latitude=latitude,
+                    longitude=longitude,
+                )
+            )
+
+        return cls(
+            id=_optional_str(resource.get("id")),
+            name=_optional_str(resource.get("name")),
+            identifiers=tuple(identifiers),
+            types=tuple(types),
+            addresses=tuple(addresses),
+        )
+
+    @classmethod
+    def from_fhir(cls, fhir_organization: FhirOrganization) -> "OrganizationRecord":
+        """
+        Build a record from a FHIR Organization that was validated by fhir.resources
+        """
+        identifiers = [
+            IdentifierRecord(system=identifier.system, value=identifier.value)
+            for identifier in fhir_organization.identifier or []
+            if identifier.system is not None and identifier.value is not None
+        ]
+
+        types = [
+            CodingRecord(
+                code=type_entry.coding[0].code, display=type_entry.coding[0].display, system=type_entry.coding[0].system
+            )
+            for type_entry in fhir_organization.type or []
+            if type_entry.coding
+        ]
+
+        addresses = []
+        for address in fhir_organization.address or []:
+            latitude, longitude = _find_geolocation_in_fhir(address.extension or [])
+            addresses.append(
+                AddressRecord(
+                    text=address.text,
+                    lines=tuple(str(line) for line in address.line or []),
+                    city=address.city,
+                    country=address.country,
+                    postal_code=address.postalCode,
+                    latitude=latitude,
+                    longitude=longitude,
+                )
+            )
+
+        return cls(
+            id=fhir_organization.id,
+            name=fhir_organization.name,
+            identifiers=tuple(identifiers),
+            types=tuple(types),
+            addresses=tuple(addresses),
+        )
+
+
+def as_organization_record(organization: OrganizationRecord | FhirOrganization) -> OrganizationRecord:
+    if isinstance(organization, OrganizationRecord):
+        return organization
+
+    return OrganizationRecord.from_fhir(organization)
+
+
+def _find_geolocation_in_json(  # type: ignore[explicit-any]
+    extensions: list[dict[str, Any]],
+) -> tuple[Decimal | float | None, Decimal | float | None]:
+    geolocation = _find_extension(
+        extensions, lambda extension: extension.get("url"), FHIR_STRUCTUREDEFINITION_GEOLOCATION
+    )
+    if geolocation is None:
+        return None, None
+
+    nested_extensions = _objects(geolocation.get("extension"))
+    latitude = _find_extension(nested_extensions, lambda extension: extension.get("url"), "latitude")
+    longitude = _find_extension(nested_extensions, lambda extension: extension.get("url"), "longitude")
+    if latitude is None or longitude is None:
+        return None, None
+
+    return latitude.get("valueDecimal"), longitude.get("valueDecimal")
+
+
+def _find_geolocation_in_fhir(extensions: list[Extension]) -> tuple[Decimal | float | None, Decimal | float | None]:
+    geolocation = _find_extension(extensions, lambda extension: extension.url, FHIR_STRUCTUREDEFINITION_GEOLOCATION)
+    if geolocation is None:
+        return None, None
+
+    nested_extensions = geolocation.extension or []
+    latitude = _find_extension(nested_extensions, lambda extension: extension.url, "latitude")
+    longitude = _find_extension(nested_extensions, lambda extension: extension.url, "longitude")
+    if latitude is None or longitude is None:
+        return None, None
+
+    return latitude.valueDecimal, longitude.valueDecimal
+
+
+def _find_extension(extensions: Iterable[E], get_url: Callable[[E], Any], url: str) -> E | None:  # type: ignore[explicit-any]
+    """
+    Find an extension by URL in a list of extensions.
+
+    :param extensions: The list of extensions to search in.
+    :param get_url: Returns the url of an extension.
+    :param url: The url we want to match.
+    :return: The matching extension, or None if not found.
+    """
+    for extension in extensions:
+        # BEGIN-NOSCAN
+        stripped_url = str(get_url(extension)).replace("http://", "").replace("https://", "")
+        # END-NOSCAN
+        if stripped_url == url:
+            return extension
+    return None
+
+
+def _list(value: Any) -> list[Any]:  # type: ignore[explicit-any]
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"Expected a list, got {type(value).__name__}")
+    return value
+
+
+def _objects(value: Any) -> list[dict[str, Any]]:  # type: ignore[explicit-any]
+    objects = _list(value)
+    for item in objects:
+        if not isinstance(item, dict):
+            raise ValueError(f"Expected an object, got {type(item).__name__}")
+    return objects
+
+
+def _optional_str(value: Any) -> str | None:  # type: ignore[explicit-any]
+    if value is None or isinstance(value, str):
+        return value
+    raise ValueError(f"Expected a string, got {type(value).__name__}")
@@ -1,18 +1,31 @@
+import asyncio
+import ssl
+import threading
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
-from typing import Type, TypeVar
+from typing import Any, AsyncIterator, Callable, Mapping, Type, TypeVar, cast
 
+import httpx
+import orjson
 import requests
 from fhir.resources.STU3.bundle import Bundle, BundleEntry
 from fhir.resources.STU3.organization import Organization as FhirOrganization
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from app.healthcarefinder.interface import HealthcareFinderAdapter
+from app.addressing.models import ZalSearchRequestEntry, ZalSearchResponseEntry
+from app.healthcarefinder.interface import AsyncHealthcareFinderAdapter, HealthcareFinderAdapter
 from app.healthcarefinder.models import Organization, SearchRequest, SearchResponse
+from app.healthcarefinder.zorgab.cache import PartOfOrganizationCache, ZorgABSearchSingleFlight
 from app.healthcarefinder.zorgab.hydration_service import HydrationService
 from app.healthcarefinder.zorgab.patch import TimestampPatcher
+from app.healthcarefinder.zorgab.records import OrganizationRecord
 
 T = TypeVar("T", bound=BaseModel)
+R = TypeVar("R")
+
+ZORGAB_HEADERS: dict[str, str] = {"Accept": "application/fhir+json", "Content-Type": "application/fhir+json"}
 
 
 class BadSearchParams(Exception):
@@ -42,36 +55,68 @@ class ZorgABAdapter(HealthcareFinderAdapter):
         mtls_key_file: str | None = None,
         mtls_chain_file: str | None = None,
         proxy: str | None = None,
+        partof_fetch_workers: int = 8,
+        partof_cache: PartOfOrganizationCache | None = None,
+        strict_fhir_validation: bool = False,
+        search_single_flight: ZorgABSearchSingleFlight | None = None,
     ):
         self.__base_url = base_url.rstrip("/")
         self.__hydration_service = hydration_service
         self.__logger = logger
-        self.__session = requests.Session()
+        self.__partof_cache = partof_cache
+        self.__strict_fhir_validation = strict_fhir_validation
+        self.__search_single_flight = search_single_flight
         self.__suppress_hydration_errors = suppress_hydration_errors
+        self.__mtls_cert_file = mtls_cert_file
+        self.__mtls_key_file = mtls_key_file
+        self.__mtls_chain_file = mtls_chain_file
+        self.__proxy = proxy
+        self.__session = self.__create_session()
+
+        # Owned by the adapter, so its threads and their sessions are reused by every search. requests.Session
+        # is not thread-safe, so each thread fetches partOf organizations with a session of its own.
+        self.__partof_executor: ThreadPoolExecutor | None = None
+        if partof_fetch_workers > 1:
+            self.__partof_executor = ThreadPoolExecutor(
+                max_workers=partof_fetch_workers, thread_name_prefix="zorgab-partof"
+            )
+        self.__partof_sessions = threading.local()
+
+    def __create_session(self) -> requests.Session:
+        session = requests.Session()
+
+        if self.__mtls_chain_file:
+            session.verify = self.__mtls_chain_file
+
+        if self.__mtls_cert_file and self.__mtls_key_file:
+            session.cert = (self.__mtls_cert_file, self.__mtls_key_file)
 
-        if mtls_chain_file:
-            self.__session.verify = mtls_chain_file
+        session.headers.update(ZORGAB_HEADERS)
 
-        if mtls_cert_file and mtls_key_file:
-            self.__session.cert = (mtls_cert_file, mtls_key_file)
+        if self.__proxy:
+            session.proxies = {"http": self.__proxy, "https": self.__proxy}
 
-        self.__session.headers.update({"Accept": "application/fhir+json", "Content-Type": "application/fhir+json"})
+        return session
 
-        if proxy:
-            self.__session.proxies = {"http": proxy, "https": proxy}
+    def __get_partof_session(self) -> requests.Session:
+        session: requests.Session | None = getattr(self.__partof_sessions, "session", None)
+        if session is None:
+            session = self.__partof_sessions.session = self.__create_session()
+        return session
 
     def __make_singular_resource_url(self, base: str, organization_id: str) -> str:
         return f"{base}/fhir/Organization/{organization_id}"
 
-    def __fetch_bundle(self, search: SearchRequest) -> Bundle:
+    def __create_search_params(self, search: SearchRequest) -> str:
         self.__logger.debug("Searching zorgAB with %s" % search)
 
         try:
-            params = self.create_fhir_search(search)
+            return self.create_fhir_search(search)
         except ValueError as e:
             self.__logger.error("Error while trying to create a FHIR search: %s", e)
             raise BadSearchParams("No correct search parameters available") from e
 
+    def __fetch_search_response(self, params: str) -> requests.Response:
         base = self.__base_url.rstrip("/")
         url = f"{base}/fhir/Organization"
         self.__logger.debug("Calling external URL: '%s?%s'" % (url, params))
@@ -85,6 +130,28 @@ class ZorgABAdapter(HealthcareFinderAdapter):
             self.__logger.error("Error while trying to call the external ZorgAB API: %s", e)
             raise ApiError("Error while trying to call the external ZorgAB API") from e
 
+        return response
+
+    def __fetch_bundle(self, search: SearchRequest) -> Bundle:
+        params = self.__create_search_params(search)
+
+        return self.__coalesce(("strict", params), lambda: self.__download_bundle(params))
+
+    def __fetch_bundle_entries(self, search: SearchRequest) -> list[Any]:  # type: ignore[explicit-any]
+        params = self.__create_search_params(search)
+
+        return self.__coalesce(("lean", params), lambda: self.__download_bundle_entries(params))
+
+    def __coalesce(self, key: tuple[str, str], download: Callable[[], R]) -> R:
+        # Concurrent identical searches share one request to ZorgAB, and its parsed result
+        if self.__search_single_flight is None:
+            return download()
+
+        return cast(R, self.__search_single_flight.do(key, download))
+
+    def __download_bundle(self, params: str) -> Bundle:
+        response = self.__fetch_search_response(params)
+
         try:
             return self.__parse_fhir_response(response, Bundle)
         except ValueError as e:
@@ -94,36 +161,40 @@ class ZorgABAdapter(HealthcareFinderAdapter):
             )
             raise
 
-    def search_organizations(self, search: SearchRequest) -> SearchResponse | None:
-        bundle = self.__fetch_bundle(search)
-        organizations: list[Organization] = []
-
-        if bundle.total and bundle.entry:
-            for entry in bundle.entry:
-                try:
-                    bundle_entry = BundleEntry.model_validate(entry)
-                    fhir_organization = FhirOrganization.model_validate(bundle_entry.resource)
-
-                    if fhir_organization.id is None:
-                        self.__logger.warning("Skipping organization without ID")
-                        continue
+    def __download_bundle_entries(self, params: str) -> list[Any]:  # type: ignore[explicit-any]
+        response = self.__fetch_search_response(params)
 
-                    organizations.append(self.__hydration_service.hydrate_to_organization(fhir_organization))
+        try:
+            return parse_bundle_entries(response.content)
+        except ValueError as e:
+            self.__logger.warning(
+                "ZorgAB API returned FHIR non-compliant data. Error: %s",
+                e,
+            )
+            raise
 
-                except Exception as e:
-                    self.__logger.warning(
-                        "Error while trying to hydrate an organization (suppress_hydration_errors=%s)",
-                        self.__suppress_hydration_errors,
-                        exc_info=True,
-                    )
-                    if not self.__suppress_hydration_errors:
-                        raise e
+    def search_organizations(self, search: SearchRequest) -> SearchResponse | None:
+        if self.__strict_fhir_validation:
+            organizations = hydrate_bundle(
+                bundle=self.__fetch_bundle(search),
+                hydration_service=self.__hydration_service,
+                logger=self.__logger,
+                suppress_hydration_errors=self.__suppress_hydration_errors,
+            )
+        else:
+            organizations = hydrate_bundle_entries(
+                entries=self.__fetch_bundle_entries(search),
+                hydration_service=self.__hydration_service,
+                logger=self.__logger,
+                suppress_hydration_errors=self.__suppress_hydration_errors,
+            )
 
         return SearchResponse(organizations=organizations)
 
     def search_organizations_raw_fhir(self, search: SearchRequest) -> Bundle | None:
         base = self.__base_url.rstrip("/")
-        bundle = self.__fetch_bundle(search)
+        # The bundle can be shared with concurrent identical searches, so it is copied before it is changed
+        bundle = self.__fetch_bundle(search).model_copy()
         raw_entries: list[BundleEntry] = []
         seen_ids: set[str] = set()  # for deduplication, we could use raw_entries but this is more efficient
         part_of_references: set[str] = set()
@@ -131,7 +202,7 @@ class ZorgABAdapter(HealthcareFinderAdapter):
         if bundle.total and bundle.entry:
             for entry in bundle.entry:
                 try:
-                    bundle_entry = BundleEntry.model_validate(entry)
+                    bundle_entry = BundleEntry.model_validate(entry).model_copy()
                     fhir_organization = FhirOrganization.model_validate(bundle_entry.resource)
 
                     if fhir_organization.id is None:
@@ -192,44 +263,69 @@ class ZorgABAdapter(HealthcareFinderAdapter):
             return False
 
     def __fetch_partof_organizations(self, base: str, references: set[str]) -> list[BundleEntry]:
-        part_of_organizations: list[BundleEntry] = []
+        # Sorting keeps the order of the returned entries independent of set iteration and completion order
+        sorted_references = sorted(references)
+
+        if self.__partof_executor is None:
+            results = [self.__fetch_partof_organization(base, reference) for reference in sorted_references]
+        else:
+            results = list(
+                self.__partof_executor.map(
+                    lambda reference: self.__fetch_partof_organization(base, reference), sorted_references
+                )
+            )
 
-        for reference in references:
-            if not reference.startswith("Organization/"):
-                self.__logger.info("Skipping unsupported partOf reference '%s'", reference)
-                continue
+        return [entry for entry in results if entry is not None]
 
-            url = f"{base}/fhir/{reference}"
-            try:
-                self.__logger.debug("Fetching partOf organization at '%s'", url)
-                response = self.__session.get(url)
-                if response.status_code != 200:
-                    self.__logger.warning(
-                        "Failed to fetch partOf organization %s: status %s", reference, response.status_code
-                    )
-                    continue
+    def __fetch_partof_organization(self, base: str, reference: str) -> BundleEntry | None:
+        if not reference.startswith("Organization/"):
+            self.__logger.info("Skipping unsupported partOf reference '%s'", reference)
+            return None
 
-                fhir_organization = self.__parse_fhir_response(response, FhirOrganization)
+        if self.__partof_cache is None:
+            fhir_organization = self.__download_partof_organization(base, reference)
+        else:
+            fhir_organization = self.__partof_cache.get_or_load(
+                reference, lambda: self.__download_partof_organization(base, reference)
+            )
 
-                if not fhir_organization.id:
-                    continue
+        if fhir_organization is None or not fhir_organization.id:
+            return None
+
+        full_url = self.__make_singular_resource_url(base, fhir_organization.id)
+        # Cached organizations are shared between searches, so every bundle gets its own copy
+        return BundleEntry(fullUrl=full_url, resource=fhir_organization.model_copy())
 
-                trimmed_organization = FhirOrganization.model_validate(
-                    {
-                        "id": fhir_organization.id,
-                        "name": fhir_organization.name,
-                        "identifier": fhir_organization.identifier,
-                        "address": fhir_organization.address,
-                    }
+    def __download_partof_organization(self, base: str, reference: str) -> FhirOrganization | None:
+        url = f"{base}/fhir/{reference}"
+        try:
+            self.__logger.debug("Fetching partOf organization at '%s'", url)
+            response = self.__get_partof_session().get(url)
+            if response.status_code != 200:
+                self.__logger.warning(
+                    "Failed to fetch partOf organization %s: status %s", reference, response.status_code
                 )
-                full_url = self.__make_singular_resource_url(base, fhir_organization.id)
-                part_of_organizations.append(BundleEntry(fullUrl=full_url, resource=trimmed_organization))
-            except requests.RequestException as e:
-                self.__logger.warning("Error while fetching partOf organization %s: %s", reference, e)
-            except Exception:
-                self.__logger.warning("Error while parsing partOf organization %s", reference, exc_info=True)
+                return None
 
-        return part_of_organizations
+            fhir_organization = self.__parse_fhir_response(response, FhirOrganization)
+
+            if not fhir_organization.id:
+                return None
+
+            return FhirOrganization.model_validate(
+                {
+                    "id": fhir_organization.id,
+                    "name": fhir_organization.name,
+                    "identifier": fhir_organization.identifier,
+                    "address": fhir_organization.address,
+                }
+            )
+        except requests.RequestException as e:
+            self.__logger.warning("Error while fetching partOf organization %s: %s", reference, e)
+        except Exception:
+            self.__logger.warning("Error while parsing partOf organization %s", reference, exc_info=True)
+
+        return None
 
     @staticmethod
     def create_fhir_search(search: SearchRequest) -> str:
@@ -268,8 +364,405 @@ class ZorgABAdapter(HealthcareFinderAdapter):
         zorgab_response: requests.Response,
         fhir_model: Type[T],
     ) -> T:
-        data = zorgab_response.json()
+        return parse_fhir_data(zorgab_response.json(), fhir_model)
+
+
+class AsyncZorgABAdapter(AsyncHealthcareFinderAdapter):
+    """
+    Asyncio-native ZorgAB adapter for the live search path.
+
+    All requests go through one pooled httpx client, so concurrent searches share keep-alive
+    (HTTP/2) connections to the mTLS endpoint instead of each occupying a threadpool worker
+    while waiting for ZorgAB. The client is created lazily and must be closed with `aclose()`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        hydration_service: HydrationService,
+        logger: Logger,
+        suppress_hydration_errors: bool,
+        mtls_cert_file: str | None = None,
+        mtls_key_file: str | None = None,
+        mtls_chain_file: str | None = None,
+        proxy: str | None = None,
+        http2: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+        strict_fhir_validation: bool = False,
+        stream_hydration_concurrency: int = 8,
+        search_single_flight: ZorgABSearchSingleFlight | None = None,
+    ):
+        self.__base_url = base_url.rstrip("/")
+        self.__hydration_service = hydration_service
+        self.__logger = logger
+        self.__suppress_hydration_errors = suppress_hydration_errors
+        self.__strict_fhir_validation = strict_fhir_validation
+        self.__stream_hydration_concurrency = stream_hydration_concurrency
+        self.__search_single_flight = search_single_flight
+        self.__mtls_cert_file = mtls_cert_file
+        self.__mtls_key_file = mtls_key_file
+        self.__mtls_chain_file = mtls_chain_file
+        self.__proxy = proxy or None
+        self.__http2 = http2
+        self.__limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.__timeout = timeout
+        self.__transport = transport
+        self.__client: httpx.AsyncClient | None = None
+
+    async def search_organizations(self, search: SearchRequest) -> SearchResponse | None:
+        parsed_response = await self.__fetch_parsed_response(search)
+        organizations = await run_in_threadpool(self.__parse_organizations, parsed_response)
+        if not organizations:
+            return SearchResponse(organizations=[])
+
+        # The addressing entries of the whole bundle are looked up at once, on the event loop
+        addressing_entries = await self.__search_addressing(organizations)
+        hydrated_organizations = await run_in_threadpool(
+            hydrate_organizations,
+            organizations=organizations,
+            addressing_entries=addressing_entries,
+            hydration_service=self.__hydration_service,
+            logger=self.__logger,
+            suppress_hydration_errors=self.__suppress_hydration_errors,
+        )
+
+        return SearchResponse(organizations=hydrated_organizations)
+
+    async def stream_organizations(self, search: SearchRequest) -> AsyncIterator[Organization]:
+        """
+        Searches ZorgAB and returns an iterator that yields each organization as soon as it is hydrated.
+
+        The search request and the parsing of the response happen before this returns, so their errors are
+        raised here. The organizations are hydrated concurrently, each with its own addressing lookup, and are
+        yielded in the order in which their hydration completes.
+        """
+        parsed_response = await self.__fetch_parsed_response(search)
+        organizations = await run_in_threadpool(self.__parse_organizations, parsed_response)
+
+        return self.__hydrate_concurrently(organizations)
+
+    async def aclose(self) -> None:
+        if self.__client is not None:
+            await self.__client.aclose()
+            self.__client = None
+
+    async def __fetch_parsed_response(self, search: SearchRequest) -> Bundle | list[Any]:  # type: ignore[explicit-any]
+        self.__logger.debug("Searching zorgAB with %s" % search)
+
+        try:
+            params = ZorgABAdapter.create_fhir_search(search)
+        except ValueError as e:
+            self.__logger.error("Error while trying to create a FHIR search: %s", e)
+            raise BadSearchParams("No correct search parameters available") from e
+
+        if self.__search_single_flight is None:
+            return await self.__download_parsed_response(params)
+
+        # Concurrent identical searches share one request to ZorgAB, and its parsed result
+        key = ("strict" if self.__strict_fhir_validation else "lean", params)
+        return await self.__search_single_flight.do_async(  # type: ignore[no-any-return]
+            key, lambda: self.__download_parsed_response(params)
+        )
+
+    async def __download_parsed_response(self, params: str) -> Bundle | list[Any]:  # type: ignore[explicit-any]
+        response = await self.__fetch_search_response(params)
+
+        try:
+            if self.__strict_fhir_validation:
+                return parse_fhir_data(response.json(), Bundle)
+
+            return parse_bundle_entries(response.content)
+        except ValueError as e:
+            self.__logger.warning(
+                "ZorgAB API returned FHIR non-compliant data. Error: %s",
+                e,
+            )
+            raise
+
+    def __parse_organizations(  # type: ignore[explicit-any]
+        self, parsed_response: Bundle | list[Any]
+    ) -> list[FhirOrganization | OrganizationRecord]:
+        if isinstance(parsed_response, Bundle):
+            return parse_bundle_organizations(parsed_response, self.__logger, self.__suppress_hydration_errors)
+
+        return parse_entry_organizations(parsed_response, self.__logger, self.__suppress_hydration_errors)
+
+    async def __hydrate_concurrently(
+        self, organizations: list[FhirOrganization | OrganizationRecord]
+    ) -> AsyncIterator[Organization]:
+        semaphore = asyncio.Semaphore(self.__stream_hydration_concurrency)
+
+        async def hydrate(organization: FhirOrganization | OrganizationRecord) -> Organization | None:
+            async with semaphore:
+                addressing_entries = await self.__search_addressing([organization])
+                return await run_in_threadpool(
+                    hydrate_organization,
+                    organization=organization,
+                    addressing_entries=addressing_entries,
+                    hydration_service=self.__hydration_service,
+                    logger=self.__logger,
+                    suppress_hydration_errors=self.__suppress_hydration_errors,
+                )
+
+        tasks = [asyncio.ensure_future(hydrate(organization)) for organization in organizations]
+        try:
+            for next_hydrated in asyncio.as_completed(tasks):
+                organization = await next_hydrated
+                if organization is not None:
+                    yield organization
+        finally:
+            # The client went away or hydration failed, the remaining organizations are not needed anymore
+            for task in tasks:
+                task.cancel()
+
+    async def __search_addressing(
+        self, organizations: list[FhirOrganization | OrganizationRecord]
+    ) -> dict[ZalSearchRequestEntry, ZalSearchResponseEntry] | None:
+        try:
+            return await self.__hydration_service.search_addressing_async(organizations)
+        except Exception as e:
+            _log_hydration_error(self.__logger, self.__suppress_hydration_errors)
+            if not self.__suppress_hydration_errors:
+                raise e
+
+        # Hydration then falls back to looking up each organization on its own
+        return None
+
+    async def __fetch_search_response(self, params: str) -> httpx.Response:
+        url = f"{self.__base_url}/fhir/Organization"
+        self.__logger.debug("Calling external URL: '%s?%s'" % (url, params))
+
+        try:
+            response = await self.__get_client().get(url, params=params)
+        except httpx.HTTPError as e:
+            self.__logger.error("Error while trying to call the external ZorgAB API: %s", e)
+            raise ApiError("Error while trying to call the external ZorgAB API") from e
+
+        if response.status_code != 200:
+            self.__logger.error("Incorrect status code returned from ZorgAB API: '%s'" % url)
+            raise ApiError("Unexpected status code returned from the ZorgAB API") from None
+
+        return response
+
+    def __get_client(self) -> httpx.AsyncClient:
+        if self.__client is None:
+            self.__client = httpx.AsyncClient(
+                headers=ZORGAB_HEADERS,
+                verify=self.__create_ssl_context(),
+                http2=self.__http2,
+                limits=self.__limits,
+                timeout=self.__timeout,
+                proxy=self.__proxy,
+                transport=self.__transport,
+            )
+
+        return self.__client
+
+    def __create_ssl_context(self) -> ssl.SSLContext:
+        if self.__mtls_chain_file:
+            context = ssl.create_default_context(cafile=self.__mtls_chain_file)
+        else:
+            context = httpx.create_ssl_context()
+
+        if self.__mtls_cert_file and self.__mtls_key_file:
+            context.load_cert_chain(certfile=self.__mtls_cert_file, keyfile=self.__mtls_key_file)
+
+        return context
+
+
+def parse_fhir_data(data: Any, fhir_model: Type[T]) -> T:  # type: ignore[explicit-any]
+    TimestampPatcher.patch(data)
+
+    return fhir_model.model_validate(data)
+
+
+def parse_bundle_entries(content: bytes) -> list[Any]:  # type: ignore[explicit-any]
+    """
+    Decode a ZorgAB search response without validating it against the FHIR models. The entries are turned
+    into organization records by `hydrate_bundle_entries`, which only reads the fields that hydration needs.
+
+    :raises ValueError: When the response is not a (JSON) FHIR Bundle
+    """
+    data = orjson.loads(content)
+    if not isinstance(data, dict) or data.get("resourceType") != "Bundle":
+        raise ValueError("ZorgAB response is not a FHIR Bundle")
+
+    entries = data.get("entry")
+    if not data.get("total") or not entries:
+        return []
+
+    if not isinstance(entries, list):
+        raise ValueError("ZorgAB response contains a malformed Bundle.entry")
+
+    return entries
+
+
+def hydrate_bundle(
+    bundle: Bundle,
+    hydration_service: HydrationService,
+    logger: Logger,
+    suppress_hydration_errors: bool,
+) -> list[Organization]:
+    return _hydrate_organizations(
+        organizations=parse_bundle_organizations(bundle, logger, suppress_hydration_errors),
+        hydration_service=hydration_service,
+        logger=logger,
+        suppress_hydration_errors=suppress_hydration_errors,
+    )
+
+
+def hydrate_bundle_entries(  # type: ignore[explicit-any]
+    entries: list[Any],
+    hydration_service: HydrationService,
+    logger: Logger,
+    suppress_hydration_errors: bool,
+) -> list[Organization]:
+    return _hydrate_organizations(
+        organizations=parse_entry_organizations(entries, logger, suppress_hydration_errors),
+        hydration_service=hydration_service,
+        logger=logger,
+        suppress_hydration_errors=suppress_hydration_errors,
+    )
+
+
+def parse_bundle_organizations(
+    bundle: Bundle,
+    logger: Logger,
+    suppress_hydration_errors: bool,
+) -> list[FhirOrganization | OrganizationRecord]:
+    if not bundle.total or not bundle.entry:
+        return []
+
+    return _parse_organizations(bundle.entry, _fhir_organization_from_entry, logger, suppress_hydration_errors)
+
+
+def parse_entry_organizations(  # type: ignore[explicit-any]
+    entries: list[Any],
+    logger: Logger,
+    suppress_hydration_errors: bool,
+) -> list[FhirOrganization | OrganizationRecord]:
+    return _parse_organizations(entries, _organization_record_from_entry, logger, suppress_hydration_errors)
+
+
+def hydrate_organization(
+    organization: FhirOrganization | OrganizationRecord,
+    hydration_service: HydrationService,
+    logger: Logger,
+    suppress_hydration_errors: bool,
+    addressing_entries: Mapping[ZalSearchRequestEntry, ZalSearchResponseEntry] | None = None,
+) -> Organization | None:
+    """
+    Hydrate a single organization, looking up its addressing entries on its own unless they are given
+
+    :return: The hydrated organization, or None when hydration failed and errors are suppressed
+    """
+    try:
+        return hydration_service.hydrate_to_organization(organization, addressing_entries)
+    except Exception as e:
+        _log_hydration_error(logger, suppress_hydration_errors)
+        if not suppress_hydration_errors:
+            raise e
+
+    return None
+
+
+def hydrate_organizations(
+    organizations: list[FhirOrganization | OrganizationRecord],
+    addressing_entries: Mapping[ZalSearchRequestEntry, ZalSearchResponseEntry] | None,
+    hydration_service: HydrationService,
+    logger: Logger,
+    suppress_hydration_errors: bool,
+) -> list[Organization]:
+    """
+    Hydrate the organizations with the addressing entries found for all of them by `search_addressing`
+
+    :return: The hydrated organizations, without those that failed when errors are suppressed
+    """
+    hydrated_organizations: list[Organization] = []
+    for organization in organizations:
+        try:
+            hydrated_organizations.append(hydration_service.hydrate_to_organization(organization, addressing_entries))
+
+        except Exception as e:
+            _log_hydration_error(logger, suppress_hydration_errors)
+            if not suppress_hydration_errors:
+                raise e
+
+    return hydrated_organizations
+
+
+def _parse_organizations(  # type: ignore[explicit-any]
+    entries: list[Any],
+    to_organization: Callable[[Any], FhirOrganization | OrganizationRecord],
+    logger: Logger,
+    suppress_hydration_errors: bool,
+) -> list[FhirOrganization | OrganizationRecord]:
+    parsed_organizations: list[FhirOrganization | OrganizationRecord] = []
+
+    for entry in entries:
+        try:
+            parsed_organization = to_organization(entry)
+
+            if parsed_organization.id is None:
+                logger.warning("Skipping organization without ID")
+                continue
+
+            parsed_organizations.append(parsed_organization)
+
+        except Exception as e:
+            _log_hydration_error(logger, suppress_hydration_errors)
+            if not suppress_hydration_errors:
+                raise e
+
+    return parsed_organizations
+
+
+def _hydrate_organizations(
+    organizations: list[FhirOrganization | OrganizationRecord],
+    hydration_service: HydrationService,
+    logger: Logger,
+    suppress_hydration_errors: bool,
+) -> list[Organization]:
+    if not organizations:
+        return []
+
+    # Look up the addressing entries of the whole bundle at once, instead of one organization at a time
+    addressing_entries: dict[ZalSearchRequestEntry, ZalSearchResponseEntry] | None = None
+    try:
+        addressing_entries = hydration_service.search_addressing(organizations)
+    except Exception as e:
+        _log_hydration_error(logger, suppress_hydration_errors)
+        if not suppress_hydration_errors:
+            raise e
+
+    return hydrate_organizations(
+        organizations, addressing_entries, hydration_service, logger, suppress_hydration_errors
+    )
+
+
+def _fhir_organization_from_entry(entry: Any) -> FhirOrganization:  # type: ignore[explicit-any]
+    bundle_entry = BundleEntry.model_validate(entry)
+    return FhirOrganization.model_validate(bundle_entry.resource)
+
+
+def _organization_record_from_entry(entry: Any) -> OrganizationRecord:  # type: ignore[explicit-any]
+    if not isinstance(entry, dict):
+        raise ValueError("Bundle entry is not an object")
+
+    return OrganizationRecord.from_json(entry.get("resource"))
 
-        TimestampPatcher.patch(data)
 
-        return fhir_model.model_validate(data)
+def _log_hydration_error(logger: Logger, suppress_hydration_errors: bool) -> None:
+    logger.warning(
+        "Error while trying to hydrate an organization (suppress_hydration_errors=%s)",
+        suppress_hydration_errors,
+        exc_info=True,
+    )
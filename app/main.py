@@ -1,6 +1,7 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncGenerator, cast
 
 import inject
 import uvicorn
@@ -8,6 +9,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from app.addressing.zal.index import ZalAddressingIndex
 from app.benchmark.router import router as benchmark_router
 from app.bindings import configure_bindings
 from app.config.factories import get_config
@@ -16,10 +18,12 @@ from app.constants import APP_NAME
 from app.cron_tasks import CronCommands, CronTaskOrchestrator
 from app.demo.routers import router as demo_router
 from app.docs.routers import router as docs_router
+from app.healthcarefinder.interface import AsyncHealthcareFinderAdapter
 from app.path import project_root
 from app.routers.default import router as default_router
 from app.routers.health import router as health_router
 from app.routers.location import router as location_router
+from app.routers.metrics import router as metrics_router
 from app.version.models import VersionInfo
 
 logger = logging.getLogger(__name__)
@@ -62,10 +66,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     app.state.cron_tasks = cron_task_orchestrator.orchestrated_tasks
 
+    # Built in the background, lookups use the database until the first build has finished
+    zal_addressing_index = inject.instance(ZalAddressingIndex)
+    zal_index_task = asyncio.create_task(zal_addressing_index.run()) if zal_addressing_index is not None else None
+
     try:
         yield
     finally:
+        if zal_index_task is not None:
+            zal_index_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await zal_index_task
         await cron_task_orchestrator.stop()
+        healthcare_finder_adapter = cast(AsyncHealthcareFinderAdapter, inject.instance(AsyncHealthcareFinderAdapter))
+        await healthcare_finder_adapter.aclose()
 
 
 def run_uvicorn() -> None:
@@ -94,6 +108,7 @@ def create_fastapi_app() -> FastAPI:
         default_router,
         health_router,
         location_router,
+        metrics_router,
         docs_router,
         benchmark_router,
     ]
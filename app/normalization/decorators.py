@@ -4,7 +4,7 @@ from typing import Protocol
 from inject import autoparams
 
 from app.db.models import DataService
-from app.db.repositories import DataServiceRepository, OrganisationRepository
+from app.db.repositories import ReadDataServiceRepository, ReadOrganisationRepository
 from app.normalization.models import NormalizedDataService, NormalizedOrganization
 from app.normalization.services import IdStringToIdentifyingFeatureConverter
 from app.normalization.utils import remove_initial_separator_dots
@@ -75,8 +75,8 @@ class PopulateMedMijSpecificFields(NormalizedOrganizationDecorator):
     def __init__(
         self,
         id_string_converter: IdStringToIdentifyingFeatureConverter,
-        organization_repository: OrganisationRepository,
-        data_service_repository: DataServiceRepository,
+        organization_repository: ReadOrganisationRepository,
+        data_service_repository: ReadDataServiceRepository,
     ) -> None:
         self.__id_string_converter = id_string_converter
         self.__organization_repository = organization_repository
@@ -1,11 +1,18 @@
+import json
+import logging
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.healthcarefinder.healthcarefinder import HealthcareFinder
-from app.healthcarefinder.models import SearchRequest, SearchResponse
-from app.healthcarefinder.zorgab.hydration_service import HydrationError
+from app.healthcarefinder.models import Organization, SearchRequest, SearchResponse
 from app.healthcarefinder.zorgab.zorgab import ApiError, BadSearchParams
 from app.utils import resolve_instance
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -14,26 +21,66 @@ router = APIRouter()
     summary="Search for organizations based on the search parameters",
     tags=["localization"],
 )
-def read_item_text_search(
+async def read_item_text_search(
     search: SearchRequest,
     finder: HealthcareFinder = resolve_instance(HealthcareFinder),
 ) -> SearchResponse:
     """
     Returns a list of organizations based on the search parameters
     """
-    try:
-        organization_list = finder.search_organizations(search)
+    with _search_errors_to_http_exceptions():
+        organization_list = await finder.search_organizations(search)
         if organization_list is None:
             raise HTTPException(status_code=404, detail="No organizations found")
 
-    except BadSearchParams:
-        raise HTTPException(status_code=400, detail="Bad search parameters") from BadSearchParams
-    except ApiError:
-        raise HTTPException(
-            status_code=500,
-            detail="Error while processing your request. Please try again later",
-        ) from ApiError
-    except HydrationError:
-        raise HTTPException(status_code=500, detail="Error while processing your request") from HydrationError
-
     return organization_list
+
+
+@router.post(
+    "/localization/organization/search/stream",
+    summary="Search for organizations and stream them as newline-delimited JSON",
+    tags=["localization"],
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def stream_item_text_search(
+    search: SearchRequest,
+    finder: HealthcareFinder = resolve_instance(HealthcareFinder),
+) -> StreamingResponse:
+    """
+    Returns the organizations found for the search parameters, one JSON object per line. Each organization
+    is sent as soon as it is hydrated, so the order can differ from the search endpoint. An error after the
+    first line ends the stream with an {"error": {"status_code": ..., "detail": ...}} line.
+    """
+    with _search_errors_to_http_exceptions():
+        organizations = await finder.stream_organizations(search)
+
+    return StreamingResponse(_to_ndjson(organizations), media_type="application/x-ndjson")
+
+
+async def _to_ndjson(organizations: AsyncIterator[Organization]) -> AsyncIterator[bytes]:
+    try:
+        async for organization in organizations:
+            yield organization.model_dump_json().encode() + b"\n"
+    except Exception as error:
+        # The status has been sent already, so the error ends the stream as a record of its own, which the client
+        # can tell apart from an organization and from a complete stream
+        logger.exception("Error while streaming the found organizations")
+        exception = _to_http_exception(error)
+        yield json.dumps({"error": {"status_code": exception.status_code, "detail": exception.detail}}).encode() + b"\n"
+
+
+@contextmanager
+def _search_errors_to_http_exceptions() -> Iterator[None]:
+    try:
+        yield
+    except (BadSearchParams, ApiError) as error:
+        raise _to_http_exception(error) from error
+
+
+def _to_http_exception(error: Exception) -> HTTPException:
+    if isinstance(error, BadSearchParams):
+        return HTTPException(status_code=400, detail="Bad search parameters")
+    if isinstance(error, ApiError):
+        return HTTPException(status_code=500, detail="Error while processing your request. Please try again later")
+    return HTTPException(status_code=500, detail="Error while processing your request")
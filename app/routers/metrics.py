@@ -0,0 +1,69 @@
+from fastapi import APIRouter
+
+from app.addressing.services import EndpointJWEWrapper
+from app.cache.single_flight import SingleFlightStats
+from app.cache.ttl_cache import CacheStats
+from app.db.db import Database
+from app.db.pool import PoolStats
+from app.healthcarefinder.cache import SearchResponseCache
+from app.healthcarefinder.zorgab.cache import PartOfOrganizationCache, ZorgABSearchSingleFlight
+from app.routers.schemas import CacheStatsResponse, MetricsResponse, PoolStatsResponse, SingleFlightStatsResponse
+from app.utils import resolve_instance
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    summary="Show runtime metrics of the application, like cache hit ratios and database pool usage",
+)
+async def metrics(
+    search_response_cache: SearchResponseCache = resolve_instance(SearchResponseCache),
+    partof_organization_cache: PartOfOrganizationCache = resolve_instance(PartOfOrganizationCache),
+    endpoint_jwe_wrapper: EndpointJWEWrapper = resolve_instance(EndpointJWEWrapper),
+    zorgab_search_single_flight: ZorgABSearchSingleFlight = resolve_instance(ZorgABSearchSingleFlight),
+    database: Database = resolve_instance(Database),
+) -> MetricsResponse:
+    # Async, so it runs on the event loop together with the search response cache, which is not thread-safe
+    return {
+        "caches": {
+            "search_response": _to_response(search_response_cache.stats()),
+            "partof_organization": _to_response(partof_organization_cache.stats()),
+            "endpoint_jwe": _to_response(endpoint_jwe_wrapper.cache_stats()),
+        },
+        "coalescing": {
+            "zorgab_search": _to_single_flight_response(zorgab_search_single_flight.stats()),
+        },
+        "database_pools": {name: _to_pool_response(stats) for name, stats in database.pool_stats().items()},
+    }
+
+
+def _to_response(stats: CacheStats) -> CacheStatsResponse:
+    return {
+        "hits": stats.hits,
+        "stale_hits": stats.stale_hits,
+        "misses": stats.misses,
+        "coalesced": stats.coalesced,
+        "evictions": stats.evictions,
+        "size": stats.size,
+        "hit_ratio": stats.hit_ratio,
+    }
+
+
+def _to_single_flight_response(stats: SingleFlightStats) -> SingleFlightStatsResponse:
+    return {
+        "calls": stats.calls,
+        "coalesced": stats.coalesced,
+    }
+
+
+def _to_pool_response(stats: PoolStats) -> PoolStatsResponse:
+    return {
+        "size": stats.size,
+        "checked_out": stats.checked_out,
+        "overflow": stats.overflow,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_seconds": stats.wait_seconds,
+        "average_wait_seconds": stats.average_wait_seconds,
+    }
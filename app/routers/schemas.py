@@ -4,3 +4,34 @@ from typing_extensions import TypedDict
 class HealthResponse(TypedDict):
     healthy: bool
     externals: dict[str, bool]
+
+
+class CacheStatsResponse(TypedDict):
+    hits: int
+    stale_hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+    size: int
+    hit_ratio: float
+
+
+class SingleFlightStatsResponse(TypedDict):
+    calls: int
+    coalesced: int
+
+
+class PoolStatsResponse(TypedDict):
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds: float
+    average_wait_seconds: float
+
+
+class MetricsResponse(TypedDict):
+    caches: dict[str, CacheStatsResponse]
+    coalescing: dict[str, SingleFlightStatsResponse]
+    database_pools: dict[str, PoolStatsResponse]
@@ -5,3 +5,6 @@ SEARCH_INDEX_OUTPUT_FILENAME: Final[str] = "organizations.json"
 ENCRYPTED_ENDPOINTS_OUTPUT_FILENAME: Final[str] = "endpoints.json"
 SEARCH_INDEX_OUTPUT_DIR: Final[Path] = Path("static/search")
 SEARCH_INDEX_TEMP_DIR: Final[Path] = Path("tmp/search_index")
+ENCRYPTED_ENDPOINTS_MANIFEST_FILENAME: Final[str] = "endpoints.manifest.json"
+# Holds state between search index updates; unlike the output dir, this is not served to clients
+SEARCH_INDEX_STATE_DIR: Final[Path] = Path("storage/search_index")
@@ -6,3 +6,20 @@ from app.normalization.models import NormalizedOrganization
 @dataclass(slots=True)
 class SearchIndex:
     entries: list[NormalizedOrganization]
+
+
+@dataclass(frozen=True, slots=True)
+class EncryptedEndpointManifestEntry:
+    url_hash: str
+    token_hash: str
+    issued_at: int
+
+
+@dataclass(slots=True)
+class EncryptedEndpointsManifest:
+    """
+    Describes the encrypted endpoints of the previous export, so unchanged endpoints can be carried over.
+    """
+
+    key_id: str
+    entries: dict[int, EncryptedEndpointManifestEntry]
@@ -10,7 +10,7 @@ from app.db.repositories import DbEndpointRepository, EndpointRepository
 from app.normalization.models import NormalizedOrganization
 from app.search_indexation.writer import AtomicFileWriter
 
-from .models import SearchIndex
+from .models import EncryptedEndpointManifestEntry, EncryptedEndpointsManifest, SearchIndex
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +52,8 @@ class SearchIndexFileRepository(SearchIndexRepository):
 
 
 class EncryptedEndpointsRepository(Protocol):
+    def load(self) -> EncryptedEndpoints: ...
+
     def save(self, endpoints: EncryptedEndpoints) -> None: ...
 
 
@@ -62,6 +64,20 @@ class EncryptedEndpointsFileRepository(EncryptedEndpointsRepository):
         self.__temp_path = temp_path
         self.__writer = file_writer
 
+    def load(self) -> EncryptedEndpoints:
+        """
+        Returns the previously exported endpoints, or an empty dict when there is no (valid) export.
+        """
+        if not self.__output_path.is_file():
+            return {}
+
+        try:
+            payload = orjson.loads(self.__output_path.read_bytes())
+            return {int(endpoint_id): str(token) for endpoint_id, token in payload.items()}
+        except Exception:
+            logger.warning("Ignoring unreadable encrypted endpoints file %s", self.__output_path, exc_info=True)
+            return {}
+
     def save(self, endpoints: EncryptedEndpoints) -> None:
         logger.debug("Writing encrypted endpoints to disk %s", self.__output_path)
 
@@ -87,6 +103,62 @@ class EncryptedEndpointsFileRepository(EncryptedEndpointsRepository):
             raise
 
 
+class EncryptedEndpointsManifestRepository(Protocol):
+    def load(self) -> EncryptedEndpointsManifest | None: ...
+
+    def save(self, manifest: EncryptedEndpointsManifest) -> None: ...
+
+
+class EncryptedEndpointsManifestFileRepository(EncryptedEndpointsManifestRepository):
+    @inject.autoparams("output_path", "temp_path", "file_writer")
+    def __init__(self, output_path: Path, temp_path: Path, file_writer: AtomicFileWriter) -> None:
+        self.__output_path = output_path
+        self.__temp_path = temp_path
+        self.__writer = file_writer
+
+    def load(self) -> EncryptedEndpointsManifest | None:
+        if not self.__output_path.is_file():
+            return None
+
+        try:
+            payload = orjson.loads(self.__output_path.read_bytes())
+            return EncryptedEndpointsManifest(
+                key_id=payload["key_id"],
+                entries={
+                    int(endpoint_id): EncryptedEndpointManifestEntry(
+                        url_hash=entry["url_hash"],
+                        token_hash=entry["token_hash"],
+                        issued_at=int(entry["issued_at"]),
+                    )
+                    for endpoint_id, entry in payload["endpoints"].items()
+                },
+            )
+        except Exception:
+            logger.warning("Ignoring unreadable encrypted endpoints manifest %s", self.__output_path, exc_info=True)
+            return None
+
+    def save(self, manifest: EncryptedEndpointsManifest) -> None:
+        logger.debug("Writing encrypted endpoints manifest to disk %s", self.__output_path)
+
+        try:
+            data = orjson.dumps(
+                {
+                    "key_id": manifest.key_id,
+                    "endpoints": manifest.entries,
+                },
+                option=orjson.OPT_NON_STR_KEYS,
+            )
+            self.__writer.write(
+                data,
+                output_path=self.__output_path,
+                temp_path=self.__temp_path,
+                prefix="encrypted_endpoints_manifest_",
+            )
+        except Exception:
+            logger.exception("Failed to persist encrypted endpoints manifest to %s", self.__output_path)
+            raise
+
+
 class MockOrganizationsFileRepo:
     def __init__(self, mock_organizations_path: Path, mock_addressing_path: Path) -> None:
         self.__mock_organizations_path = mock_organizations_path
@@ -1,11 +1,22 @@
+import hashlib
 import logging
-from typing import TypeAlias
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import Callable, TypeAlias
 
 import inject
+from jwcrypto import jwk
 
+from app.addressing.constants import ENDPOINT_JWE_REFRESH_SECONDS
+from app.addressing.factories import EndpointJWEFactory, EndpointJWTFactory
+from app.addressing.repositories import FilesystemJWKStoreRepository, KeyStoreRepository
 from app.addressing.services import EndpointJWEWrapper
 from app.db.repositories import EndpointRepository
 from app.normalization.models import NormalizedOrganization
+from app.search_indexation.models import EncryptedEndpointManifestEntry, EncryptedEndpointsManifest
 from app.search_indexation.repositories import MockOrganizationsFileRepo
 
 logger = logging.getLogger(__name__)
@@ -14,30 +25,208 @@ logger = logging.getLogger(__name__)
 EncryptedEndpoints: TypeAlias = dict[int, str]
 
 
+@dataclass(slots=True)
+class EncryptedEndpointsExport:
+    endpoints: EncryptedEndpoints
+    manifest: EncryptedEndpointsManifest
+
+
 class EncryptedEndpointProvider:
-    @inject.autoparams("endpoint_repository", "endpoint_jwe_wrapper")
-    def __init__(self, endpoint_repository: EndpointRepository, endpoint_jwe_wrapper: EndpointJWEWrapper) -> None:
+    # Every worker process gets a few chunks, so a slow chunk does not leave the other workers idle
+    CHUNKS_PER_WORKER = 4
+
+    @inject.autoparams("endpoint_repository", "endpoint_jwe_wrapper", "key_repository")
+    def __init__(
+        self,
+        endpoint_repository: EndpointRepository,
+        endpoint_jwe_wrapper: EndpointJWEWrapper,
+        key_repository: KeyStoreRepository,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
         self.endpoint_repository = endpoint_repository
         self.endpoint_jwe_wrapper = endpoint_jwe_wrapper
+        self.key_repository = key_repository
+        self.__clock = clock
 
     def get_all(
         self,
-    ) -> EncryptedEndpoints:
-        logger.info("Starting encrypted endpoint export")
-        endpoints = self.endpoint_repository.find_all()
-        logger.debug("Found %s endpoints to encrypt", len(endpoints))
+        workers: int = 1,
+    ) -> EncryptedEndpointsExport:
+        """
+        Encrypts the URLs of all endpoints. With more than one worker, the endpoints are split into chunks
+        that are encrypted in a pool of worker processes.
+
+        :raises RuntimeError: Naming the id of the first endpoint that could not be encrypted.
+        """
+        now = int(self.__clock())
+        endpoints = self.__find_endpoints()
+
+        logger.info("Starting encrypted endpoint export (endpoints=%d, workers=%d)", len(endpoints), workers)
+
+        return self.__export(endpoints, {}, {}, endpoints, now, workers)
+
+    def get_all_incremental(
+        self,
+        previous_endpoints: EncryptedEndpoints,
+        previous_manifest: EncryptedEndpointsManifest | None,
+        workers: int = 1,
+    ) -> EncryptedEndpointsExport:
+        """
+        Like `get_all`, but carries over the tokens of the previous export for endpoints whose URL did not
+        change, as long as they were encrypted with the current keys and are not due for a refresh.
+        Only new, changed and aging endpoints are encrypted again.
+
+        :raises RuntimeError: Naming the id of the first endpoint that could not be encrypted.
+        """
+        now = int(self.__clock())
+        previous_entries = {}
+        if previous_manifest is not None and previous_manifest.key_id == self.endpoint_jwe_wrapper.get_key_id():
+            previous_entries = previous_manifest.entries
+
+        endpoints = self.__find_endpoints()
+        carried_over_entries: dict[int, EncryptedEndpointManifestEntry] = {}
+        carried_over: EncryptedEndpoints = {}
+        outdated: list[tuple[int, str]] = []
+
+        for endpoint_id, url in endpoints:
+            previous_entry = previous_entries.get(endpoint_id)
+            previous_token = previous_endpoints.get(endpoint_id)
+
+            if (
+                previous_entry is not None
+                and previous_token is not None
+                and previous_entry.url_hash == _hash(url)
+                and previous_entry.token_hash == _hash(previous_token)
+                and now - previous_entry.issued_at < ENDPOINT_JWE_REFRESH_SECONDS
+            ):
+                carried_over[endpoint_id] = previous_token
+                carried_over_entries[endpoint_id] = previous_entry
+            else:
+                outdated.append((endpoint_id, url))
+
+        logger.info(
+            "Starting incremental encrypted endpoint export (endpoints=%d, to encrypt=%d, workers=%d)",
+            len(endpoints),
+            len(outdated),
+            workers,
+        )
+
+        return self.__export(endpoints, carried_over, carried_over_entries, outdated, now, workers)
+
+    def __find_endpoints(self) -> list[tuple[int, str]]:
+        endpoints = [(endpoint.id, endpoint.url) for endpoint in self.endpoint_repository.find_all()]
+        logger.debug("Found %s endpoints", len(endpoints))
+        return endpoints
+
+    def __export(
+        self,
+        endpoints: list[tuple[int, str]],
+        carried_over: EncryptedEndpoints,
+        carried_over_entries: dict[int, EncryptedEndpointManifestEntry],
+        outdated: list[tuple[int, str]],
+        now: int,
+        workers: int,
+    ) -> EncryptedEndpointsExport:
+        encrypted = self.__encrypt(outdated, workers)
+
+        entries = dict(carried_over_entries)
+        for endpoint_id, url in outdated:
+            entries[endpoint_id] = EncryptedEndpointManifestEntry(
+                url_hash=_hash(url),
+                token_hash=_hash(encrypted[endpoint_id]),
+                issued_at=now,
+            )
+
+        # Keep the order of the endpoint repository
+        return EncryptedEndpointsExport(
+            endpoints={
+                endpoint_id: carried_over[endpoint_id] if endpoint_id in carried_over else encrypted[endpoint_id]
+                for endpoint_id, _ in endpoints
+            },
+            manifest=EncryptedEndpointsManifest(
+                key_id=self.endpoint_jwe_wrapper.get_key_id(),
+                entries={endpoint_id: entries[endpoint_id] for endpoint_id, _ in endpoints},
+            ),
+        )
+
+    def __encrypt(self, endpoints: list[tuple[int, str]], workers: int) -> EncryptedEndpoints:
+        if workers <= 1 or len(endpoints) <= 1:
+            return dict(_encrypt_endpoints(self.endpoint_jwe_wrapper, endpoints))
+
+        return self.__encrypt_in_processes(endpoints, workers)
+
+    def __encrypt_in_processes(self, endpoints: list[tuple[int, str]], workers: int) -> EncryptedEndpoints:
+        chunk_size = math.ceil(len(endpoints) / (workers * self.CHUNKS_PER_WORKER))
+        chunks = [endpoints[index : index + chunk_size] for index in range(0, len(endpoints), chunk_size)]
+
+        signing_key = self.key_repository.get_first_key_from_store(EndpointJWTFactory.JWT_KEY_LABEL)
+        encryption_key = self.key_repository.get_first_key_from_store(EndpointJWEFactory.JWE_KEY_LABEL)
+
         encrypted_endpoints: EncryptedEndpoints = {}
 
-        for endpoint in endpoints:
-            try:
-                encrypted_endpoint = self.endpoint_jwe_wrapper.wrap(endpoint.url)
-                encrypted_endpoints[endpoint.id] = encrypted_endpoint
-            except Exception as e:
-                raise RuntimeError(f"Failed to encrypt endpoint id={endpoint.id}") from e
+        # Spawned, so the workers do not inherit locks held by other threads of this process, which could deadlock them
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_encryption_worker,
+            initargs=(_export_key(signing_key), _export_key(encryption_key)),
+        ) as executor:
+            # map() yields the chunks in order, so the result has the same order as a sequential run
+            for encrypted_chunk in executor.map(_encrypt_chunk, chunks):
+                encrypted_endpoints.update(encrypted_chunk)
 
         return encrypted_endpoints
 
 
+_worker_endpoint_jwe_wrapper: EndpointJWEWrapper | None = None
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _export_key(key: jwk.JWK) -> str:
+    exported: str = key.export(private_key=key.has_private)
+    return exported
+
+
+def _init_encryption_worker(signing_key: str, encryption_key: str) -> None:
+    global _worker_endpoint_jwe_wrapper
+
+    key_repository = FilesystemJWKStoreRepository()
+    key_repository.add_key_to_store(EndpointJWTFactory.JWT_KEY_LABEL, jwk.JWK.from_json(signing_key))
+    key_repository.add_key_to_store(EndpointJWEFactory.JWE_KEY_LABEL, jwk.JWK.from_json(encryption_key))
+
+    _worker_endpoint_jwe_wrapper = EndpointJWEWrapper(
+        jwt_factory=EndpointJWTFactory(),
+        jwe_factory=EndpointJWEFactory(),
+        key_repository=key_repository,
+    )
+
+
+def _encrypt_chunk(endpoints: list[tuple[int, str]]) -> list[tuple[int, str]]:
+    if _worker_endpoint_jwe_wrapper is None:
+        raise RuntimeError("Encryption worker is not initialized")
+
+    return _encrypt_endpoints(_worker_endpoint_jwe_wrapper, endpoints)
+
+
+def _encrypt_endpoints(
+    endpoint_jwe_wrapper: EndpointJWEWrapper,
+    endpoints: list[tuple[int, str]],
+) -> list[tuple[int, str]]:
+    encrypted_endpoints: list[tuple[int, str]] = []
+
+    for endpoint_id, url in endpoints:
+        try:
+            # Not from the wrapper's cache, so the tokens are issued now, as the manifest records
+            encrypted_endpoints.append((endpoint_id, endpoint_jwe_wrapper.wrap_fresh(url)))
+        except Exception as e:
+            raise RuntimeError(f"Failed to encrypt endpoint id={endpoint_id}") from e
+
+    return encrypted_endpoints
+
+
 class MockOrganizationsMerger:
     @inject.autoparams("mock_organizations_file_repo")
     def __init__(
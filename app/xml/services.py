@@ -1,11 +1,33 @@
+import os
+import re
+from contextlib import contextmanager
+from typing import IO, Callable, Iterator
 from xml.etree.ElementTree import Element
 
+from defusedxml.ElementTree import iterparse
+
 from .exceptions import CouldNotTraverse
 
+ProgressCallback = Callable[[int, int], None]
+
 
 class ElementTraverser:
-    def __init__(self, root: Element) -> None:
+    # Path steps that are a plain element name, so they can be qualified with a namespace
+    PLAIN_STEP_REGEX = re.compile(r"^[A-Za-z_][\w.-]*$")
+
+    def __init__(self, root: Element, single_namespace: bool = False) -> None:
+        """
+        :param single_namespace: Assume all elements are in the namespace of the root, so the namespace only
+            has to be resolved once and paths can be compiled to qualified tags and cached
+        """
         self.__root: Element = root
+        self.__single_namespace = single_namespace
+        self.__namespace_prefix = ""
+        self.__compiled_paths: dict[str, tuple[str, ...] | None] = {}
+
+        namespaces = self.decompose_tag(root)[1]
+        if single_namespace and namespaces:
+            self.__namespace_prefix = f"{{{namespaces['']}}}"
 
     @staticmethod
     def decompose_tag(element: Element) -> tuple[str, dict[str, str] | None]:
@@ -57,13 +79,127 @@ class ElementTraverser:
     def get_nested_elements(self, name: str, root: Element | None = None) -> list[Element]:
         return self.__get_all_by_name(name, root)
 
+    def iterate_nested_elements(self, name: str, on_progress: ProgressCallback | None = None) -> Iterator[Element]:
+        """
+        Iterates the elements at the given path from the root, calling on_progress with (progress, total)
+        before each element
+        """
+        elements = self.get_nested_elements(name)
+        for progress, element in enumerate(elements):
+            if on_progress is not None:
+                on_progress(progress, len(elements))
+            yield element
+
     def __get_all_by_name(self, name: str, root: Element | None = None) -> list[Element]:
         root_element = root or self.__root
-        _, namespaces = self.decompose_tag(root_element)
+        tags = self.__compile_path(name) if self.__single_namespace else None
 
-        matches = root_element.findall(path=name, namespaces=namespaces)
+        if tags is None:
+            _, namespaces = self.decompose_tag(root_element)
+            matches = root_element.findall(path=name, namespaces=namespaces)
+        else:
+            # findall with a single qualified tag and no namespaces is matched in C, without going through ElementPath
+            matches = root_element.findall(tags[0])
+            for tag in tags[1:]:
+                matches = [child for parent in matches for child in parent.findall(tag)]
 
         if len(matches) == 0:
             raise CouldNotTraverse.because_element_not_found(name)
 
         return matches
+
+    def __compile_path(self, name: str) -> tuple[str, ...] | None:
+        """
+        Compiles a path of plain element names to their qualified tags, or None for paths that need ElementPath
+        """
+        try:
+            return self.__compiled_paths[name]
+        except KeyError:
+            steps = name.split("/")
+            tags = None
+            if all(self.PLAIN_STEP_REGEX.match(step) for step in steps):
+                tags = tuple(self.__namespace_prefix + step for step in steps)
+            self.__compiled_paths[name] = tags
+            return tags
+
+
+class StreamingElementTraverser(ElementTraverser):
+    """
+    Traverses an XML document that is parsed while it is read. Up front, only the document up to the first element
+    at the streamed path is parsed, so the elements before it can be read as usual. iterate_nested_elements then
+    parses the elements at the streamed path one at a time, and removes each from the tree once it has been handled.
+    """
+
+    def __init__(self, source: IO[bytes], streamed_path: str, single_namespace: bool = False) -> None:
+        self.__source = source
+        self.__size = os.fstat(source.fileno()).st_size
+        self.__streamed_path = streamed_path
+        self.__streamed_names = streamed_path.split("/")
+        self.__events = iterparse(source, events=("start", "end"))
+        self.__open_elements: list[Element] = []
+        self.__has_streamed_element = self.__parse_until_streamed_element()
+
+        super().__init__(self.__open_elements[0], single_namespace)
+
+    @classmethod
+    @contextmanager
+    def open(
+        cls, path: str, streamed_path: str, single_namespace: bool = False
+    ) -> Iterator["StreamingElementTraverser"]:
+        with open(path, "rb") as source:
+            yield cls(source, streamed_path, single_namespace)
+
+    @contextmanager
+    def open_source(self) -> Iterator[IO[bytes]]:
+        """
+        Opens the document again from its start, to read the raw bytes of the streamed elements instead of parsing
+        them with iterate_nested_elements
+        """
+        with open(self.__source.name, "rb") as source:
+            yield source
+
+    def iterate_nested_elements(self, name: str, on_progress: ProgressCallback | None = None) -> Iterator[Element]:
+        if name != self.__streamed_path:
+            yield from super().iterate_nested_elements(name, on_progress)
+            return
+
+        if not self.__has_streamed_element:
+            raise CouldNotTraverse.because_element_not_found(name)
+
+        for event, element in self.__events:
+            if event == "start":
+                self.__open_elements.append(element)
+                continue
+
+            if self.__is_at_streamed_path():
+                if on_progress is not None:
+                    on_progress(self.__source.tell(), self.__size)
+                yield element
+                # Detached from its parent, so the handled elements do not pile up in the tree
+                self.__open_elements[-2].remove(element)
+
+            self.__open_elements.pop()
+
+        if on_progress is not None:
+            on_progress(self.__size, self.__size)
+
+    def __parse_until_streamed_element(self) -> bool:
+        for event, element in self.__events:
+            if event == "start":
+                self.__open_elements.append(element)
+                if self.__is_at_streamed_path():
+                    return True
+            else:
+                self.__open_elements.pop()
+                if not self.__open_elements:
+                    # The whole document was parsed, so the root has to be kept
+                    self.__open_elements.append(element)
+                    return False
+
+        return False
+
+    def __is_at_streamed_path(self) -> bool:
+        path = self.__open_elements[1:]
+        return len(path) == len(self.__streamed_names) and all(
+            self.decompose_tag(element)[0] == name for element, name in zip(path, self.__streamed_names, strict=True)
+        )
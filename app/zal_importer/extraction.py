@@ -0,0 +1,158 @@
+import os
+import re
+from typing import IO, Iterator, NamedTuple
+from xml.etree.ElementTree import Element
+
+from defusedxml.ElementTree import fromstring
+
+from app.xml.exceptions import CouldNotTraverse
+from app.xml.services import ElementTraverser, ProgressCallback
+
+from .enums import OrganisationType
+
+
+class ExtractedSystemRole(NamedTuple):
+    code: str
+    resource_endpoint_url: str
+
+
+class ExtractedDataService(NamedTuple):
+    external_id: str
+    auth_endpoint_url: str
+    token_endpoint_url: str
+    system_roles: list[ExtractedSystemRole]
+
+
+class ExtractedOrganisation(NamedTuple):
+    """
+    The fields of a Zorgaanbieder in a ZAL, as plain tuples so they are cheap to send between processes
+    """
+
+    name: str
+    type: OrganisationType
+    data_services: list[ExtractedDataService]
+
+    def endpoint_urls(self) -> Iterator[str]:
+        for data_service in self.data_services:
+            yield data_service.auth_endpoint_url
+            yield data_service.token_endpoint_url
+            for system_role in data_service.system_roles:
+                yield system_role.resource_endpoint_url
+
+
+def extract_organisation(traverser: ElementTraverser, organisation_element: Element) -> ExtractedOrganisation:
+    return ExtractedOrganisation(
+        name=traverser.get_nested_text("Zorgaanbiedernaam", organisation_element),
+        type=OrganisationType(traverser.get_nested_text("Aanbiedertype", organisation_element)),
+        data_services=[
+            _extract_data_service(traverser, data_service_element)
+            for data_service_element in traverser.get_nested_elements(
+                name="Interfaceversies/Interfaceversie/Gegevensdiensten/Gegevensdienst",
+                root=organisation_element,
+            )
+        ],
+    )
+
+
+# The ZAL has no mixed content or CDATA, so the tags can be found in the raw bytes. A split in the wrong place
+# does not go unnoticed, as the chunk then fails to parse.
+_CONTAINER_START_TAG_REGEX = re.compile(rb"<((?:[\w.-]+:)?Zorgaanbieders)(?:\s[^>]*)?>")
+_ORGANISATION_END_TAG_REGEX = re.compile(rb"</(?:[\w.-]+:)?Zorgaanbieder\s*>")
+_XML_DECLARATION_REGEX = re.compile(rb"<\?xml\s[^>]*\?>")
+_NAMESPACE_DECLARATION_REGEX = re.compile(rb"""\sxmlns(?::[\w.-]+)?\s*=\s*(?:"[^"]*"|'[^']*')""")
+
+
+def split_organisation_chunks(
+    source: IO[bytes],
+    batch_size: int,
+    on_progress: ProgressCallback | None = None,
+    read_size: int = 1 << 20,
+) -> Iterator[bytes]:
+    """
+    Splits the raw bytes of a ZAL at the end tags of its Zorgaanbieder elements, without parsing them, into documents
+    of up to batch_size organisations for extract_organisation_chunk. Each document gets the XML declaration and the
+    namespace declarations of the ZAL, with the Zorgaanbieders element as its root.
+    """
+    size = os.fstat(source.fileno()).st_size
+    buffer = b""
+
+    while (container := _CONTAINER_START_TAG_REGEX.search(buffer)) is None:
+        block = source.read(read_size)
+        if not block:
+            raise CouldNotTraverse.because_element_not_found("Zorgaanbieders")
+        buffer += block
+
+    header = buffer[: container.end()]
+    declaration = _XML_DECLARATION_REGEX.match(header)
+    prefix = b"".join(
+        [
+            declaration.group() if declaration is not None else b"",
+            b"<",
+            container.group(1),
+            *_NAMESPACE_DECLARATION_REGEX.findall(header),
+            b">",
+        ]
+    )
+    suffix = b"</" + container.group(1) + b">"
+
+    buffer = buffer[container.end() :]
+    # The end of the last whole Zorgaanbieder in the buffer, and the number of them up to there
+    position = 0
+    organisations = 0
+
+    while True:
+        end_tag = _ORGANISATION_END_TAG_REGEX.search(buffer, position)
+        if end_tag is not None:
+            position = end_tag.end()
+            organisations += 1
+            if organisations == batch_size:
+                yield prefix + buffer[:position] + suffix
+                buffer = buffer[position:]
+                position = 0
+                organisations = 0
+            continue
+
+        if on_progress is not None:
+            on_progress(source.tell(), size)
+
+        block = source.read(read_size)
+        if not block:
+            break
+        buffer += block
+
+    if organisations:
+        yield prefix + buffer[:position] + suffix
+
+
+def extract_organisation_chunk(content: bytes) -> list[ExtractedOrganisation]:
+    """
+    Parses and extracts the organisations of a document made by split_organisation_chunks. Runs in the parse worker
+    processes.
+    """
+    traverser = ElementTraverser(fromstring(content), single_namespace=True)
+
+    return [
+        extract_organisation(traverser, organisation_element)
+        for organisation_element in traverser.get_nested_elements("Zorgaanbieder")
+    ]
+
+
+def _extract_data_service(traverser: ElementTraverser, data_service_element: Element) -> ExtractedDataService:
+    return ExtractedDataService(
+        external_id=traverser.get_nested_text("GegevensdienstId", data_service_element),
+        auth_endpoint_url=traverser.get_nested_text(
+            "AuthorizationEndpoint/AuthorizationEndpointuri", data_service_element
+        ),
+        token_endpoint_url=traverser.get_nested_text("TokenEndpoint/TokenEndpointuri", data_service_element),
+        system_roles=[
+            ExtractedSystemRole(
+                code=traverser.get_nested_text("Systeemrolcode", system_role_element),
+                resource_endpoint_url=traverser.get_nested_text(
+                    "ResourceEndpoint/ResourceEndpointuri", system_role_element
+                ),
+            )
+            for system_role_element in traverser.get_nested_elements(
+                name="Systeemrollen/Systeemrol", root=data_service_element
+            )
+        ],
+    )
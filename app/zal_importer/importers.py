@@ -1,30 +1,45 @@
 import json
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from logging import Logger
-from typing import Any
+from multiprocessing import get_context
+from typing import IO, Any, Iterator
 from xml.etree.ElementTree import Element
 
 import inject
 from sqlalchemy.orm import Session
 
+from app.config.models import ZalImportConfig
 from app.cron.utils import print_progress_bar
 from app.db.models import Organisation
 from app.db.repositories import (
+    CurrentImportRepository,
     DataServiceRepository,
     DbEndpointRepository,
     IdentifyingFeatureRepository,
+    ImportPartitionRepository,
     OrganisationRepository,
     SystemRoleRepository,
 )
 from app.xml.exceptions import CouldNotTraverse
-from app.xml.services import ElementTraverser
+from app.xml.services import ElementTraverser, StreamingElementTraverser
 from app.zal_importer.exceptions import CouldNotImportOrganisations
 
-from .enums import IdentifyingFeatureType, OrganisationType
+from .enums import IdentifyingFeatureType
+from .extraction import (
+    ExtractedOrganisation,
+    extract_organisation,
+    extract_organisation_chunk,
+    split_organisation_chunks,
+)
 
 
 class OrganisationImporter(ABC):
+    ORGANISATIONS_PATH = "Zorgaanbieders/Zorgaanbieder"
+
     @abstractmethod
     def process_xml(self, traverser: ElementTraverser) -> None:
         pass  # pragma: no cover
@@ -44,15 +59,24 @@ class OrganisationListImporter(OrganisationImporter):
         data_service_repository: DataServiceRepository,
         system_role_repository: SystemRoleRepository,
         endpoint_repository: DbEndpointRepository,
+        current_import_repository: CurrentImportRepository,
+        partition_repository: ImportPartitionRepository,
         session: Session,
         logger: Logger,
+        config: ZalImportConfig,
     ) -> None:
         self.__organisation_repository = organisation_repository
         self.__data_service_repository = data_service_repository
         self.__system_role_repository = system_role_repository
         self.__endpoint_repository = endpoint_repository
+        self.__current_import_repository = current_import_repository
+        self.__partition_repository = partition_repository
         self.__session = session
         self.__logger = logger
+        self.__bulk_insert = config.bulk_insert
+        self.__batch_size = config.batch_size
+        self.__parse_workers = config.parse_workers
+        self.__endpoint_ids: dict[str, int] = {}
 
     def process_xml(self, traverser: ElementTraverser) -> None:
         import_reference = self._create_import_reference(traverser)
@@ -62,76 +86,148 @@ class OrganisationListImporter(OrganisationImporter):
 
         self.__logger.info(f"Start import: type = {traverser.get_root_element_name()}, reference = {import_reference}")
 
+        partitioned = False
         try:
-            self.__process_xml(traverser, import_reference)
+            if self.__partition_repository.is_partitioned():
+                # Committed on their own, so the import is written without locking the parent tables
+                self.__partition_repository.create_partitions(import_reference)
+                partitioned = True
+
+            # Endpoints are shared by all imports and most urls repeat, so they are resolved in memory
+            self.__endpoint_ids = self.__endpoint_repository.find_ids_by_url()
+
+            if self.__bulk_insert:
+                self.__process_xml_in_batches(traverser, import_reference)
+            else:
+                self.__process_xml(traverser, import_reference)
+            # Switched in the same transaction, so lookups move to the new import once it is complete
+            self.__current_import_repository.advance(import_reference)
             self.__session.commit()
             self.__logger.info("Successfully imported data with reference = %s", import_reference)
         except Exception as e:
             self.__session.rollback()
             self.__logger.error("Failed to import data with reference = %s: %s", import_reference, e)
+            if partitioned:
+                self.__partition_repository.drop_partitions([import_reference])
             raise e
 
     def __process_xml(self, traverser: ElementTraverser, import_reference: str) -> None:
-        elements = traverser.get_nested_elements(name="Zorgaanbieders/Zorgaanbieder")
-        total_elements = len(elements)
-        for progress, organisation_element in enumerate(elements):
-            print_progress_bar(progress, total_elements)
-
+        for organisation_element in traverser.iterate_nested_elements(self.ORGANISATIONS_PATH, print_progress_bar):
+            extracted_organisation = extract_organisation(traverser, organisation_element)
             organisation = self.__organisation_repository.create(
-                import_ref=import_reference,
-                **self.__extract_organisation_data(traverser, organisation_element),
+                import_ref=import_reference, name=extracted_organisation.name, type=extracted_organisation.type
             )
 
-            for data_service_element in traverser.get_nested_elements(
-                name="Interfaceversies/Interfaceversie/Gegevensdiensten/Gegevensdienst",
-                root=organisation_element,
-            ):
+            for extracted_data_service in extracted_organisation.data_services:
                 data_service = self.__data_service_repository.create(
                     organisation_id=organisation.id,
-                    **self.__extract_data_service_data(traverser, data_service_element),
+                    external_id=extracted_data_service.external_id,
+                    auth_endpoint_id=self.__find_or_create_endpoint(extracted_data_service.auth_endpoint_url),
+                    token_endpoint_id=self.__find_or_create_endpoint(extracted_data_service.token_endpoint_url),
                 )
 
-                for system_role_element in traverser.get_nested_elements(
-                    name="Systeemrollen/Systeemrol", root=data_service_element
-                ):
+                for extracted_system_role in extracted_data_service.system_roles:
                     self.__system_role_repository.create(
                         data_service_id=data_service.id,
-                        **self.__extract_system_role_data(traverser, system_role_element),
+                        code=extracted_system_role.code,
+                        resource_endpoint_id=self.__find_or_create_endpoint(
+                            extracted_system_role.resource_endpoint_url
+                        ),
                     )
 
-    def __extract_organisation_data(self, traverser: ElementTraverser, organisation_element: Element) -> dict[str, Any]:  # type: ignore[explicit-any]
-        return {
-            "name": traverser.get_nested_text("Zorgaanbiedernaam", organisation_element),
-            "type": OrganisationType(traverser.get_nested_text("Aanbiedertype", organisation_element)),
-        }
+    def __process_xml_in_batches(self, traverser: ElementTraverser, import_reference: str) -> None:
+        if self.__parse_workers and isinstance(traverser, StreamingElementTraverser):
+            with traverser.open_source() as source:
+                for extracted_batch in self.__extract_in_workers(source):
+                    self.__insert_batch(extracted_batch, import_reference)
+            return
+
+        elements = traverser.iterate_nested_elements(self.ORGANISATIONS_PATH, print_progress_bar)
+        batches = iter(lambda: list(islice(elements, self.__batch_size)), [])
+
+        for batch in batches:
+            self.__insert_batch([extract_organisation(traverser, element) for element in batch], import_reference)
+
+    def __extract_in_workers(self, source: IO[bytes]) -> Iterator[list[ExtractedOrganisation]]:
+        """
+        Splits the ZAL into chunks of raw bytes, which the worker processes parse and extract while this process
+        writes the previous ones. So each organisation is only parsed once, in a worker. Batches are yielded in
+        document order, and at most two per worker are in flight so the ZAL is not read ahead into memory.
+        """
+        pending: deque[Future[list[ExtractedOrganisation]]] = deque()
+        max_pending = 2 * self.__parse_workers
+
+        # Spawned, so the workers do not inherit the database connections of this process
+        with ProcessPoolExecutor(self.__parse_workers, mp_context=get_context("spawn")) as executor:
+            try:
+                for chunk in split_organisation_chunks(source, self.__batch_size, print_progress_bar):
+                    pending.append(executor.submit(extract_organisation_chunk, chunk))
+                    if len(pending) >= max_pending:
+                        yield pending.popleft().result()
+
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def __insert_batch(self, organisations: list[ExtractedOrganisation], import_reference: str) -> None:
+        """
+        Writes the new endpoints, then the organisations, then their data services, then their system roles,
+        each with one batched INSERT. The ids returned by an INSERT are the foreign keys of the rows in the next.
+        """
+        self.__create_missing_endpoints(organisations)
+
+        organisation_ids = self.__organisation_repository.create_many(
+            [
+                {"import_ref": import_reference, "name": organisation.name, "type": organisation.type}
+                for organisation in organisations
+            ]
+        )
 
-    def __extract_data_service_data(self, traverser: ElementTraverser, data_service_element: Element) -> dict[str, Any]:  # type: ignore[explicit-any]
-        auth_endpoint_url = traverser.get_nested_text(
-            "AuthorizationEndpoint/AuthorizationEndpointuri", data_service_element
+        data_services = [
+            (organisation_id, data_service)
+            for organisation_id, organisation in zip(organisation_ids, organisations, strict=True)
+            for data_service in organisation.data_services
+        ]
+        data_service_ids = self.__data_service_repository.create_many(
+            [
+                {
+                    "organisation_id": organisation_id,
+                    "external_id": data_service.external_id,
+                    "auth_endpoint_id": self.__endpoint_ids[data_service.auth_endpoint_url],
+                    "token_endpoint_id": self.__endpoint_ids[data_service.token_endpoint_url],
+                }
+                for organisation_id, data_service in data_services
+            ]
         )
-        token_endpoint_url = traverser.get_nested_text("TokenEndpoint/TokenEndpointuri", data_service_element)
 
-        return {
-            "external_id": traverser.get_nested_text("GegevensdienstId", data_service_element),
-            "auth_endpoint_id": self.__find_or_create_endpoint(auth_endpoint_url),
-            "token_endpoint_id": self.__find_or_create_endpoint(token_endpoint_url),
-        }
+        self.__system_role_repository.create_many(
+            [
+                {
+                    "data_service_id": data_service_id,
+                    "code": system_role.code,
+                    "resource_endpoint_id": self.__endpoint_ids[system_role.resource_endpoint_url],
+                }
+                for data_service_id, (_, data_service) in zip(data_service_ids, data_services, strict=True)
+                for system_role in data_service.system_roles
+            ]
+        )
 
-    def __extract_system_role_data(self, traverser: ElementTraverser, system_role_element: Element) -> dict[str, Any]:  # type: ignore[explicit-any]
-        resource_endpoint_url = traverser.get_nested_text("ResourceEndpoint/ResourceEndpointuri", system_role_element)
+    def __create_missing_endpoints(self, organisations: list[ExtractedOrganisation]) -> None:
+        urls = dict.fromkeys(url for organisation in organisations for url in organisation.endpoint_urls())
+        new_urls = [url for url in urls if url not in self.__endpoint_ids]
 
-        return {
-            "code": traverser.get_nested_text("Systeemrolcode", system_role_element),
-            "resource_endpoint_id": self.__find_or_create_endpoint(resource_endpoint_url),
-        }
+        if new_urls:
+            self.__endpoint_ids.update(self.__endpoint_repository.create_many(new_urls))
 
     def __find_or_create_endpoint(self, url: str) -> int:
-        endpoint = self.__endpoint_repository.find_one_by_url(url)
+        endpoint_id = self.__endpoint_ids.get(url)
 
-        if endpoint is None:
-            return self.__endpoint_repository.create(url=url).id
+        if endpoint_id is None:
+            endpoint_id = self.__endpoint_ids[url] = self.__endpoint_repository.create(url=url).id
 
-        return endpoint.id
+        return endpoint_id
 
 
 class OrganisationJoinListImporter(OrganisationImporter):
@@ -143,12 +239,15 @@ class OrganisationJoinListImporter(OrganisationImporter):
         identifying_feature_repository: IdentifyingFeatureRepository,
         session: Session,
         logger: Logger,
+        config: ZalImportConfig,
     ) -> None:
         self.__organisation_repository = organisation_repository
         self.__data_service_repository = data_service_repository
         self.__identifying_feature_repository = identifying_feature_repository
         self.__session = session
         self.__logger = logger
+        self.__bulk_insert = config.bulk_insert
+        self.__batch_size = config.batch_size
 
     def process_xml(self, traverser: ElementTraverser) -> None:
         import_reference = self._create_import_reference(traverser)
@@ -159,7 +258,10 @@ class OrganisationJoinListImporter(OrganisationImporter):
         self.__logger.info(f"Start import: type = {traverser.get_root_element_name()}, reference = {import_reference}")
 
         try:
-            self.__process_xml(traverser, import_reference)
+            if self.__bulk_insert:
+                self.__process_xml_in_batches(traverser, import_reference)
+            else:
+                self.__process_xml(traverser, import_reference)
             self.__session.commit()
             self.__logger.info("Successfully imported data with reference = %s", import_reference)
         except Exception as e:
@@ -168,10 +270,7 @@ class OrganisationJoinListImporter(OrganisationImporter):
             raise e
 
     def __process_xml(self, traverser: ElementTraverser, import_reference: str) -> None:
-        elements = traverser.get_nested_elements(name="Zorgaanbieders/Zorgaanbieder")
-        total_elements = len(elements)
-        for progress, organisation_element in enumerate(elements):
-            print_progress_bar(progress, total_elements)
+        for organisation_element in traverser.iterate_nested_elements(self.ORGANISATIONS_PATH, print_progress_bar):
             organisation = self.__get_organisation(traverser, organisation_element)
 
             if organisation is None:
@@ -215,6 +314,88 @@ class OrganisationJoinListImporter(OrganisationImporter):
                     self.__extract_interface_versions(traverser=traverser, data_service_element=data_service_element)
                 )
 
+    def __process_xml_in_batches(self, traverser: ElementTraverser, import_reference: str) -> None:
+        organisation_ids = self.__organisation_repository.find_ids_by_name()
+
+        elements = traverser.iterate_nested_elements(self.ORGANISATIONS_PATH, print_progress_bar)
+        while batch := list(islice(elements, self.__batch_size)):
+            self.__update_batch(traverser, batch, organisation_ids, import_reference)
+
+    def __update_batch(
+        self,
+        traverser: ElementTraverser,
+        organisation_elements: list[Element],
+        organisation_ids: dict[str, int],
+        import_reference: str,
+    ) -> None:
+        """
+        Inserts the identifying features of a batch of organisations with one batched INSERT, and updates their
+        data services with one batched UPDATE
+        """
+        identifying_feature_rows: list[dict[str, Any]] = []  # type: ignore[explicit-any]
+        # Data service elements together with the id of their organisation
+        data_service_elements: list[tuple[int, Element]] = []
+
+        for organisation_element in organisation_elements:
+            organisation_name = traverser.get_nested_text("Zorgaanbiedernaam", organisation_element)
+            organisation_id = organisation_ids.get(organisation_name)
+
+            if organisation_id is None:
+                self.__logger.warning(f"No Organisation found with name '{organisation_name}'")
+                continue
+
+            identifying_feature_rows.extend(
+                {
+                    "organisation_id": organisation_id,
+                    "import_ref": import_reference,
+                    **self.__extract_identifying_feature_data(
+                        traverser=traverser,
+                        identifying_feature_element=identifying_feature_element,
+                    ),
+                }
+                for identifying_feature_element in traverser.get_nested_elements(
+                    name="IdentificerendeKenmerken/IdentificerendKenmerk",
+                    root=organisation_element,
+                )
+            )
+            data_service_elements.extend(
+                (organisation_id, data_service_element)
+                for data_service_element in traverser.get_nested_elements(
+                    name="Gegevensdiensten/Gegevensdienst",
+                    root=organisation_element,
+                )
+            )
+
+        self.__identifying_feature_repository.create_many(identifying_feature_rows)
+
+        data_service_ids = self.__data_service_repository.find_ids_by_organisation_and_external_id(
+            {organisation_id for organisation_id, _ in data_service_elements}
+        )
+        data_service_rows: list[dict[str, object]] = []
+        for organisation_id, data_service_element in data_service_elements:
+            external_id, name = self.__extract_data_service_data(traverser, data_service_element)
+            data_service_id = data_service_ids.get((organisation_id, external_id))
+
+            if data_service_id is None:
+                self.__logger.warning(
+                    "No DataService found for organisation %s with external ID '%s'", organisation_id, external_id
+                )
+                continue
+
+            data_service_rows.append(
+                {
+                    "id": data_service_id,
+                    "name": name,
+                    "interface_versions": json.dumps(
+                        self.__extract_interface_versions(
+                            traverser=traverser, data_service_element=data_service_element
+                        )
+                    ),
+                }
+            )
+
+        self.__data_service_repository.update_many(data_service_rows)
+
     def __get_organisation(self, traverser: ElementTraverser, organisation_element: Element) -> Organisation | None:
         organisation_name = traverser.get_nested_text("Zorgaanbiedernaam", organisation_element)
         organisation = self.__organisation_repository.find_one_by_name(organisation_name)
@@ -2,13 +2,19 @@ from logging import Logger
 
 import inject
 
-from app.db.repositories import OrganisationRepository
+from app.db.repositories import ImportPartitionRepository, OrganisationRepository
 
 
 class ExpiredImportsCleaner:
     @inject.autoparams()
-    def __init__(self, organisation_repository: OrganisationRepository, logger: Logger) -> None:
+    def __init__(
+        self,
+        organisation_repository: OrganisationRepository,
+        partition_repository: ImportPartitionRepository,
+        logger: Logger,
+    ) -> None:
         self.__organisation_repository = organisation_repository
+        self.__partition_repository = partition_repository
         self.__logger = logger
 
     def clean_expired_imports(self, expiry_threshold: int) -> None:
@@ -18,6 +24,10 @@ class ExpiredImportsCleaner:
         import_refs_to_delete = import_refs[expiry_threshold:]
         self.__logger.info("Deleting %d import refs: %s", len(import_refs_to_delete), import_refs_to_delete)
 
+        if self.__partition_repository.is_partitioned():
+            self.__partition_repository.drop_partitions(import_refs_to_delete)
+            return
+
         for import_ref in import_refs_to_delete:
             count = self.__organisation_repository.count_by_import_ref(import_ref)
             self.__logger.info("Found %d organisations to delete for import ref %s", count, import_ref)
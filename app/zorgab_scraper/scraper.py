@@ -3,6 +3,7 @@ import logging
 import inject
 from fhir.resources.STU3.bundle import Bundle
 
+from app.healthcarefinder.zorgab.cache import PartOfOrganizationCache
 from app.zorgab_scraper.config import IdentifierSource
 from app.zorgab_scraper.factories import ZorgabBundleFactory
 from app.zorgab_scraper.services import IdentifierProvider, ZorgabScrapeExecutor
@@ -11,16 +12,18 @@ logger = logging.getLogger(__name__)
 
 
 class ZorgabScraper:
-    @inject.autoparams("executor", "identifier_provider", "bundle_factory")
+    @inject.autoparams("executor", "identifier_provider", "bundle_factory", "partof_cache")
     def __init__(
         self,
         executor: ZorgabScrapeExecutor,
         identifier_provider: IdentifierProvider,
         bundle_factory: ZorgabBundleFactory,
+        partof_cache: PartOfOrganizationCache,
     ) -> None:
         self.__executor = executor
         self.__identifier_provider = identifier_provider
         self.__bundle_factory = bundle_factory
+        self.__partof_cache = partof_cache
 
     def run(
         self,
@@ -52,6 +55,15 @@ class ZorgabScraper:
         if result.errors:
             logger.warning("Summary of errors: %s", "; ".join(result.errors))
 
+        cache_stats = self.__partof_cache.stats()
+        logger.info(
+            "PartOf organization cache: %d hits, %d misses, %d coalesced fetches (%d cached)",
+            cache_stats.hits,
+            cache_stats.misses,
+            cache_stats.coalesced,
+            cache_stats.size,
+        )
+
         bundle = self.__bundle_factory.create(result)
         logger.info("Merged %d bundles into a single bundle with %d organizations", len(result.bundles), bundle.total)
 
@@ -0,0 +1,16 @@
+-- Pointer to the import that lookups read from, so they no longer need to find the newest import_ref
+CREATE TABLE current_import
+(
+    id         INTEGER PRIMARY KEY,
+    import_ref VARCHAR(24) NOT NULL
+);
+
+ALTER TABLE current_import OWNER TO lo_ad_mgo;
+
+INSERT INTO current_import (id, import_ref)
+SELECT 1, MAX(import_ref) FROM organisations HAVING MAX(import_ref) IS NOT NULL;
+
+-- Indexes for the organisation lookups by name and by identifying feature within the current import
+CREATE INDEX ix_organisations_import_ref_name ON organisations (import_ref, name);
+CREATE INDEX ix_identifying_features_type_value ON identifying_features (type, value, organisation_id);
+CREATE INDEX ix_identifying_features_import_ref ON identifying_features (import_ref);
@@ -0,0 +1,30 @@
+-- Point references to duplicated endpoint urls at the oldest endpoint with that url, and remove the duplicates
+WITH duplicates AS (
+    SELECT id, MIN(id) OVER (PARTITION BY url) AS keep_id
+    FROM endpoints
+)
+UPDATE data_services SET auth_endpoint_id = duplicates.keep_id
+FROM duplicates
+WHERE data_services.auth_endpoint_id = duplicates.id AND duplicates.id <> duplicates.keep_id;
+
+WITH duplicates AS (
+    SELECT id, MIN(id) OVER (PARTITION BY url) AS keep_id
+    FROM endpoints
+)
+UPDATE data_services SET token_endpoint_id = duplicates.keep_id
+FROM duplicates
+WHERE data_services.token_endpoint_id = duplicates.id AND duplicates.id <> duplicates.keep_id;
+
+WITH duplicates AS (
+    SELECT id, MIN(id) OVER (PARTITION BY url) AS keep_id
+    FROM endpoints
+)
+UPDATE system_roles SET resource_endpoint_id = duplicates.keep_id
+FROM duplicates
+WHERE system_roles.resource_endpoint_id = duplicates.id AND duplicates.id <> duplicates.keep_id;
+
+DELETE FROM endpoints
+WHERE id NOT IN (SELECT MIN(id) FROM endpoints GROUP BY url);
+
+-- Concurrent imports can no longer create the same endpoint twice. Urls can exceed the btree row size, hence the hash.
+CREATE UNIQUE INDEX ux_endpoints_url_md5 ON endpoints (md5(url));
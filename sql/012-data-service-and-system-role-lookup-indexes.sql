@@ -0,0 +1,3 @@
+-- Indexes for loading the data services of organisations, and the system roles of data services, in batches
+CREATE INDEX ix_data_services_organisation_id ON data_services (organisation_id);
+CREATE INDEX ix_system_roles_data_service_id ON system_roles (data_service_id);
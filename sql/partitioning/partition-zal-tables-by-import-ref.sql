@@ -0,0 +1,146 @@
+-- Optional: list-partitions the ZAL tables by the import_ref of their organisation, so expiring an import drops its
+-- partitions instead of deleting its rows through the ON DELETE CASCADE foreign keys.
+--
+-- This script is not run by tools/migrate_db.sh. Run it once with psql after all numbered migrations, while no
+-- imports are running. The application detects the partitioned tables: the ZAL importer creates the partitions of
+-- each new import and the expired imports cleaner detaches and drops them.
+BEGIN;
+
+-- Keep the id sequences, they would be dropped together with the tables that own them
+ALTER SEQUENCE organisations_id_seq OWNED BY NONE;
+ALTER SEQUENCE identifying_features_id_seq OWNED BY NONE;
+ALTER SEQUENCE data_services_id_seq OWNED BY NONE;
+ALTER SEQUENCE system_roles_id_seq OWNED BY NONE;
+
+-- The partition key has to be part of the primary and foreign keys, so every table gets the import_ref of its
+-- organisation. Identifying features already have an import_ref, but that is the reference of the ZKL.
+CREATE TEMPORARY TABLE organisations_copy ON COMMIT DROP AS
+SELECT id, name, type, import_ref FROM organisations;
+
+CREATE TEMPORARY TABLE identifying_features_copy ON COMMIT DROP AS
+SELECT identifying_features.id, organisation_id, identifying_features.type, value, identifying_features.import_ref,
+       organisations_copy.import_ref AS organisation_import_ref
+FROM identifying_features
+JOIN organisations_copy ON organisations_copy.id = identifying_features.organisation_id;
+
+CREATE TEMPORARY TABLE data_services_copy ON COMMIT DROP AS
+SELECT data_services.id, organisation_id, external_id, data_services.name, interface_versions, auth_endpoint_id,
+       token_endpoint_id, organisations_copy.import_ref
+FROM data_services
+JOIN organisations_copy ON organisations_copy.id = data_services.organisation_id;
+
+CREATE TEMPORARY TABLE system_roles_copy ON COMMIT DROP AS
+SELECT system_roles.id, data_service_id, code, resource_endpoint_id, data_services_copy.import_ref
+FROM system_roles
+JOIN data_services_copy ON data_services_copy.id = system_roles.data_service_id;
+
+DROP TABLE system_roles, data_services, identifying_features, organisations;
+
+CREATE TABLE organisations
+(
+    id         INTEGER NOT NULL DEFAULT nextval('organisations_id_seq'),
+    name       VARCHAR(255) NOT NULL,
+    type       VARCHAR(4) NOT NULL,
+    import_ref VARCHAR(24) NOT NULL,
+    PRIMARY KEY (id, import_ref)
+) PARTITION BY LIST (import_ref);
+
+-- The import that a ZKL links its identifying features to, the same import the organisation lookups read from
+CREATE FUNCTION zal_current_import_ref() RETURNS VARCHAR(24) LANGUAGE SQL STABLE AS
+$$
+SELECT COALESCE((SELECT import_ref FROM current_import WHERE id = 1), (SELECT MAX(import_ref) FROM organisations))
+$$;
+
+CREATE TABLE identifying_features
+(
+    id                      INTEGER NOT NULL DEFAULT nextval('identifying_features_id_seq'),
+    organisation_id         INTEGER NOT NULL,
+    type                    VARCHAR(4) NOT NULL,
+    value                   VARCHAR(32) NOT NULL,
+    import_ref              VARCHAR(24) NOT NULL,
+    organisation_import_ref VARCHAR(24) NOT NULL DEFAULT zal_current_import_ref(),
+    PRIMARY KEY (id, organisation_import_ref),
+    FOREIGN KEY (organisation_id, organisation_import_ref) REFERENCES organisations (id, import_ref) ON DELETE CASCADE
+) PARTITION BY LIST (organisation_import_ref);
+
+-- The ZAL importer sets zal.import_ref for the transaction of an import, the application does not write the column
+CREATE TABLE data_services
+(
+    id                 INTEGER NOT NULL DEFAULT nextval('data_services_id_seq'),
+    organisation_id    INTEGER NOT NULL,
+    external_id        VARCHAR(32) NOT NULL,
+    name               VARCHAR(255) NULL,
+    interface_versions JSON NULL,
+    auth_endpoint_id   INTEGER NOT NULL REFERENCES endpoints ON DELETE SET NULL,
+    token_endpoint_id  INTEGER NOT NULL REFERENCES endpoints ON DELETE SET NULL,
+    import_ref         VARCHAR(24) NOT NULL DEFAULT NULLIF(current_setting('zal.import_ref', true), ''),
+    PRIMARY KEY (id, import_ref),
+    FOREIGN KEY (organisation_id, import_ref) REFERENCES organisations (id, import_ref) ON DELETE CASCADE
+) PARTITION BY LIST (import_ref);
+
+CREATE TABLE system_roles
+(
+    id                   INTEGER NOT NULL DEFAULT nextval('system_roles_id_seq'),
+    data_service_id      INTEGER NOT NULL,
+    code                 VARCHAR(32) NOT NULL,
+    resource_endpoint_id INTEGER NOT NULL REFERENCES endpoints ON DELETE SET NULL,
+    import_ref           VARCHAR(24) NOT NULL DEFAULT NULLIF(current_setting('zal.import_ref', true), ''),
+    PRIMARY KEY (id, import_ref),
+    FOREIGN KEY (data_service_id, import_ref) REFERENCES data_services (id, import_ref) ON DELETE CASCADE
+) PARTITION BY LIST (import_ref);
+
+CREATE INDEX ix_organisations_import_ref_name ON organisations (import_ref, name);
+CREATE INDEX ix_identifying_features_type_value ON identifying_features (type, value, organisation_id);
+CREATE INDEX ix_identifying_features_import_ref ON identifying_features (import_ref);
+CREATE INDEX ix_data_services_organisation_id ON data_services (organisation_id, import_ref);
+CREATE INDEX ix_system_roles_data_service_id ON system_roles (data_service_id, import_ref);
+
+-- Partitions are named <table>_<import_ref>, the same names the application uses for new imports
+DO
+$$
+    DECLARE
+        partition_import_ref VARCHAR(24);
+        partitioned_table    TEXT;
+    BEGIN
+        FOR partition_import_ref IN SELECT DISTINCT import_ref FROM organisations_copy
+            LOOP
+                FOREACH partitioned_table IN ARRAY ARRAY ['organisations', 'data_services', 'system_roles', 'identifying_features']
+                    LOOP
+                        EXECUTE format(
+                            'CREATE TABLE %I PARTITION OF %I FOR VALUES IN (%L)',
+                            partitioned_table || '_' || partition_import_ref, partitioned_table, partition_import_ref
+                        );
+                        EXECUTE format(
+                            'ALTER TABLE %I OWNER TO lo_ad_mgo', partitioned_table || '_' || partition_import_ref
+                        );
+                    END LOOP;
+            END LOOP;
+    END
+$$;
+
+INSERT INTO organisations (id, name, type, import_ref)
+SELECT id, name, type, import_ref FROM organisations_copy;
+
+INSERT INTO identifying_features (id, organisation_id, type, value, import_ref, organisation_import_ref)
+SELECT id, organisation_id, type, value, import_ref, organisation_import_ref FROM identifying_features_copy;
+
+INSERT INTO data_services (id, organisation_id, external_id, name, interface_versions, auth_endpoint_id,
+                           token_endpoint_id, import_ref)
+SELECT id, organisation_id, external_id, name, interface_versions, auth_endpoint_id, token_endpoint_id, import_ref
+FROM data_services_copy;
+
+INSERT INTO system_roles (id, data_service_id, code, resource_endpoint_id, import_ref)
+SELECT id, data_service_id, code, resource_endpoint_id, import_ref FROM system_roles_copy;
+
+ALTER SEQUENCE organisations_id_seq OWNED BY organisations.id;
+ALTER SEQUENCE identifying_features_id_seq OWNED BY identifying_features.id;
+ALTER SEQUENCE data_services_id_seq OWNED BY data_services.id;
+ALTER SEQUENCE system_roles_id_seq OWNED BY system_roles.id;
+
+ALTER TABLE organisations OWNER TO lo_ad_mgo;
+ALTER TABLE identifying_features OWNER TO lo_ad_mgo;
+ALTER TABLE data_services OWNER TO lo_ad_mgo;
+ALTER TABLE system_roles OWNER TO lo_ad_mgo;
+ALTER FUNCTION zal_current_import_ref() OWNER TO lo_ad_mgo;
+
+COMMIT;
@@ -0,0 +1,130 @@
+import pytest
+from jwcrypto import jwe, jwk, jwt
+from pytest_mock import MockerFixture
+
+from app.addressing.constants import ENDPOINT_JWE_REFRESH_SECONDS, URL_CLAIM_NAME
+from app.addressing.factories import EndpointJWEFactory, EndpointJWTFactory
+from app.addressing.repositories import FilesystemJWKStoreRepository
+from app.addressing.services import EndpointJWEWrapper
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def signing_key() -> jwk.JWK:
+    return jwk.JWK.generate(kty="EC", crv="P-256")
+
+
+@pytest.fixture()
+def encryption_key() -> jwk.JWK:
+    return jwk.JWK.generate(kty="RSA", size=2048)
+
+
+@pytest.fixture()
+def key_repository(signing_key: jwk.JWK, encryption_key: jwk.JWK) -> FilesystemJWKStoreRepository:
+    repository = FilesystemJWKStoreRepository()
+    repository.add_key_to_store(EndpointJWTFactory.JWT_KEY_LABEL, signing_key)
+    repository.add_key_to_store(EndpointJWEFactory.JWE_KEY_LABEL, encryption_key)
+    return repository
+
+
+class TestEndpointJWEWrapper:
+    def test_wrap_returns_decryptable_jwe_with_endpoint_claim(
+        self,
+        key_repository: FilesystemJWKStoreRepository,
+        signing_key: jwk.JWK,
+        encryption_key: jwk.JWK,
+    ) -> None:
+        wrapper = EndpointJWEWrapper(
+            jwt_factory=EndpointJWTFactory(), jwe_factory=EndpointJWEFactory(), key_repository=key_repository
+        )
+
+        token = jwe.JWE()
+        token.deserialize(wrapper.wrap("https://example.com/fhir"), key=encryption_key)
+        signed = jwt.JWT(jwt=token.payload.decode("utf-8"), key=signing_key)
+
+        assert URL_CLAIM_NAME in signed.claims
+        assert "https://example.com/fhir" in signed.claims
+
+    def test_wrap_reuses_jwe_until_refresh(
+        self,
+        mocker: MockerFixture,
+        key_repository: FilesystemJWKStoreRepository,
+    ) -> None:
+        clock = FakeClock()
+        jwe_factory = EndpointJWEFactory()
+        encrypt = mocker.spy(jwe_factory, "encrypt")
+        wrapper = EndpointJWEWrapper(
+            jwt_factory=EndpointJWTFactory(), jwe_factory=jwe_factory, key_repository=key_repository, clock=clock
+        )
+
+        first = wrapper.wrap("https://example.com/fhir")
+        assert wrapper.wrap("https://example.com/fhir") == first
+        assert wrapper.wrap("https://example.com/other") != first
+        assert encrypt.call_count == 2
+
+        clock.now = ENDPOINT_JWE_REFRESH_SECONDS
+        assert wrapper.wrap("https://example.com/fhir") != first
+        assert encrypt.call_count == 3
+        assert wrapper.cache_stats().hits == 1
+
+    def test_wrap_fresh_does_not_use_or_fill_the_cache(
+        self,
+        mocker: MockerFixture,
+        key_repository: FilesystemJWKStoreRepository,
+    ) -> None:
+        jwe_factory = EndpointJWEFactory()
+        encrypt = mocker.spy(jwe_factory, "encrypt")
+        wrapper = EndpointJWEWrapper(
+            jwt_factory=EndpointJWTFactory(), jwe_factory=jwe_factory, key_repository=key_repository
+        )
+
+        cached = wrapper.wrap("https://example.com/fhir")
+        fresh = wrapper.wrap_fresh("https://example.com/fhir")
+
+        assert fresh != cached
+        assert wrapper.wrap_fresh("https://example.com/fhir") != fresh
+        assert wrapper.wrap("https://example.com/fhir") == cached
+        assert encrypt.call_count == 3
+        assert wrapper.cache_stats().size == 1
+
+    def test_wrap_creates_new_jwe_when_key_changes(
+        self,
+        key_repository: FilesystemJWKStoreRepository,
+    ) -> None:
+        wrapper = EndpointJWEWrapper(
+            jwt_factory=EndpointJWTFactory(), jwe_factory=EndpointJWEFactory(), key_repository=key_repository
+        )
+        first = wrapper.wrap("https://example.com/fhir")
+
+        rotated_key = jwk.JWK.generate(kty="RSA", size=2048)
+        key_repository._key_stores[EndpointJWEFactory.JWE_KEY_LABEL] = [rotated_key]
+
+        second = wrapper.wrap("https://example.com/fhir")
+        assert second != first
+
+        token = jwe.JWE()
+        token.deserialize(second, key=rotated_key)
+
+    def test_get_key_id_changes_when_key_rotates(
+        self,
+        key_repository: FilesystemJWKStoreRepository,
+        signing_key: jwk.JWK,
+    ) -> None:
+        wrapper = EndpointJWEWrapper(
+            jwt_factory=EndpointJWTFactory(), jwe_factory=EndpointJWEFactory(), key_repository=key_repository
+        )
+        key_id = wrapper.get_key_id()
+
+        assert key_id.startswith(f"{signing_key.thumbprint()}:")
+        assert wrapper.get_key_id() == key_id
+
+        key_repository._key_stores[EndpointJWEFactory.JWE_KEY_LABEL] = [jwk.JWK.generate(kty="RSA", size=2048)]
+
+        assert wrapper.get_key_id() != key_id
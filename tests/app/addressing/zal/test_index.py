@@ -0,0 +1,153 @@
+import asyncio
+from logging import Logger
+from typing import Any, Generator
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.addressing.zal.index import ZalAddressingIndex
+from app.db.repositories import (
+    CurrentImportRepository,
+    DataServiceRepository,
+    DbEndpointRepository,
+    IdentifyingFeatureRepository,
+    OrganisationRepository,
+    ReadDataServiceRepository,
+    ReadOrganisationRepository,
+)
+from app.zal_importer.enums import IdentifyingFeatureType, OrganisationType
+
+IMPORT_REF = "1700000000000001"
+NEWER_IMPORT_REF = "1700000000000002"
+
+
+@pytest.fixture
+def statements(db_session: Session) -> Generator[list[str], None, None]:
+    executed: list[str] = []
+
+    def before_cursor_execute(*args: Any) -> None:  # type: ignore[explicit-any]
+        executed.append(args[2])
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def index(mocker: MockerFixture, db_session: Session) -> ZalAddressingIndex:
+    return ZalAddressingIndex(
+        organisation_repository=ReadOrganisationRepository(db_session),
+        data_service_repository=ReadDataServiceRepository(db_session),
+        logger=mocker.Mock(Logger),
+        refresh_seconds=30,
+        batch_size=1,
+    )
+
+
+def _create_organisation(session: Session, name: str, agb: str, import_ref: str) -> None:
+    endpoint = DbEndpointRepository(session).create(url=f"https://{name}.example.com/endpoint")
+    organisation = OrganisationRepository(session).create(name=name, type=OrganisationType.ZA, import_ref=import_ref)
+    IdentifyingFeatureRepository(session).create(
+        organisation_id=organisation.id, type=IdentifyingFeatureType.AGB, value=agb, import_ref=import_ref
+    )
+    DataServiceRepository(session).create(
+        organisation_id=organisation.id,
+        external_id="4",
+        auth_endpoint_id=endpoint.id,
+        token_endpoint_id=endpoint.id,
+        name="Data service",
+        interface_versions=["1.0.0"],
+    )
+    CurrentImportRepository(session).advance(import_ref)
+
+
+@pytest.mark.usefixtures("bindings")
+class TestZalAddressingIndex:
+    def test_has_no_snapshot_until_the_first_refresh(self, index: ZalAddressingIndex, db_session: Session) -> None:
+        _create_organisation(db_session, "first@medmij", "71025100", IMPORT_REF)
+
+        assert index.snapshot() is None
+
+    def test_finds_templates_by_name_and_identifying_feature(
+        self, index: ZalAddressingIndex, db_session: Session
+    ) -> None:
+        _create_organisation(db_session, "first@medmij", "71025100", IMPORT_REF)
+        _create_organisation(db_session, "second@medmij", "71025101", IMPORT_REF)
+
+        index.refresh()
+        snapshot = index.snapshot()
+
+        assert snapshot is not None
+        template = snapshot.find_by_name("second@medmij")
+        assert template is not None
+        assert template.dataservices[0].auth_endpoint == "https://second@medmij.example.com/endpoint"
+        assert template.dataservices[0].interface_versions == ("1.0.0",)
+        assert snapshot.find_by_identifying_feature(IdentifyingFeatureType.AGB, "71025101") is template
+        assert snapshot.find_by_identifying_feature(IdentifyingFeatureType.URA, "71025101") is None
+        assert snapshot.find_by_name("unknown@medmij") is None
+
+    def test_refresh_only_checks_the_current_import_when_it_has_not_changed(
+        self, index: ZalAddressingIndex, db_session: Session, statements: list[str]
+    ) -> None:
+        _create_organisation(db_session, "first@medmij", "71025100", IMPORT_REF)
+        index.refresh()
+        snapshot = index.snapshot()
+        statements.clear()
+
+        index.refresh()
+
+        assert index.snapshot() is snapshot
+        assert len(statements) == 1
+
+    def test_refresh_swaps_in_a_new_snapshot_once_a_newer_import_is_current(
+        self, index: ZalAddressingIndex, db_session: Session
+    ) -> None:
+        _create_organisation(db_session, "first@medmij", "71025100", IMPORT_REF)
+        index.refresh()
+        previous = index.snapshot()
+
+        _create_organisation(db_session, "second@medmij", "71025101", NEWER_IMPORT_REF)
+        index.refresh()
+        current = index.snapshot()
+
+        assert previous is not None and current is not None
+        assert current.find_by_name("second@medmij") is not None
+        assert current.find_by_name("first@medmij") is None
+        # The previous snapshot is left as it was, for lookups that were still reading it
+        assert previous.find_by_name("first@medmij") is not None
+
+    def test_is_empty_without_imports(self, index: ZalAddressingIndex) -> None:
+        index.refresh()
+        snapshot = index.snapshot()
+
+        assert snapshot is not None
+        assert snapshot.find_by_name("first@medmij") is None
+
+    @pytest.mark.asyncio
+    async def test_run_keeps_refreshing_after_a_failed_refresh(self, mocker: MockerFixture) -> None:
+        logger = mocker.Mock(Logger)
+        index = ZalAddressingIndex(
+            organisation_repository=mocker.Mock(ReadOrganisationRepository),
+            data_service_repository=mocker.Mock(ReadDataServiceRepository),
+            logger=logger,
+            refresh_seconds=0.001,
+        )
+        failures = [RuntimeError("Database error")]
+
+        def fail_once() -> None:
+            if failures:
+                raise failures.pop()
+
+        refresh = mocker.patch.object(index, "refresh", side_effect=fail_once)
+
+        task = asyncio.create_task(index.run())
+        while refresh.call_count < 2:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        logger.error.assert_called_once_with("Failed to refresh the ZAL addressing index: %s", mocker.ANY)
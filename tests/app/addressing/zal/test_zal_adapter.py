@@ -0,0 +1,328 @@
+import asyncio
+from logging import Logger
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app.addressing.models import IdentificationType, ZalSearchRequestEntry
+from app.addressing.services import EndpointJWEWrapper
+from app.addressing.zal.index import ZalAddressingIndex
+from app.addressing.zal.zal_adapter import AddressingZalAdapter
+from app.db.db import AsyncReadSessionFactory
+from app.db.models import Base
+from app.db.repositories import (
+    DataServiceRepository,
+    DbEndpointRepository,
+    IdentifyingFeatureRepository,
+    OrganisationRepository,
+    ReadDataServiceRepository,
+    ReadOrganisationRepository,
+    SystemRoleRepository,
+)
+from app.zal_importer.enums import IdentifyingFeatureType, OrganisationType
+
+IMPORT_REF = "1700000000000001"
+
+
+@pytest.fixture
+def statements(db_session: Session) -> Generator[list[str], None, None]:
+    executed: list[str] = []
+
+    def before_cursor_execute(*args: Any) -> None:  # type: ignore[explicit-any]
+        executed.append(args[2])
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _create_organisations(session: Session) -> None:
+    organisation_repository = OrganisationRepository(session)
+    identifying_feature_repository = IdentifyingFeatureRepository(session)
+    data_service_repository = DataServiceRepository(session)
+    system_role_repository = SystemRoleRepository(session)
+    endpoint = DbEndpointRepository(session).create(url="https://example.com/endpoint")
+
+    for index, (feature_type, value) in enumerate(
+        [(IdentifyingFeatureType.AGB, "71025100"), (IdentifyingFeatureType.URA, "90000382")]
+    ):
+        organisation = organisation_repository.create(
+            name=f"organisation{index}@medmij", type=OrganisationType.ZA, import_ref=IMPORT_REF
+        )
+        identifying_feature_repository.create(
+            organisation_id=organisation.id, type=feature_type, value=value, import_ref=IMPORT_REF
+        )
+        data_service = data_service_repository.create(
+            organisation_id=organisation.id,
+            external_id=str(index),
+            auth_endpoint_id=endpoint.id,
+            token_endpoint_id=endpoint.id,
+            name=f"Data service {index}",
+            interface_versions=["1.0.0"],
+        )
+        system_role_repository.create(data_service_id=data_service.id, code="role", resource_endpoint_id=endpoint.id)
+
+
+def _create_adapter(
+    mocker: MockerFixture,
+    session: Session,
+    async_sessions: AsyncReadSessionFactory | None = None,
+    index: ZalAddressingIndex | None = None,
+) -> AddressingZalAdapter:
+    wrapper = mocker.Mock(spec=EndpointJWEWrapper)
+    wrapper.wrap.side_effect = lambda url: f"wrapped:{url}"
+
+    return AddressingZalAdapter(
+        organisation_repository=ReadOrganisationRepository(session, async_sessions=async_sessions),
+        data_service_repository=ReadDataServiceRepository(session, async_sessions=async_sessions),
+        endpoint_jwe_wrapper=wrapper,
+        index=index,
+    )
+
+
+@pytest.fixture
+def adapter(mocker: MockerFixture, db_session: Session) -> AddressingZalAdapter:
+    _create_organisations(db_session)
+    return _create_adapter(mocker, db_session)
+
+
+@pytest.fixture
+def index(mocker: MockerFixture, db_session: Session, adapter: AddressingZalAdapter) -> ZalAddressingIndex:
+    return ZalAddressingIndex(
+        organisation_repository=ReadOrganisationRepository(db_session),
+        data_service_repository=ReadDataServiceRepository(db_session),
+        logger=mocker.Mock(Logger),
+        refresh_seconds=30,
+    )
+
+
+@pytest.fixture
+def index_adapter(mocker: MockerFixture, db_session: Session, index: ZalAddressingIndex) -> AddressingZalAdapter:
+    index.refresh()
+    return _create_adapter(mocker, db_session, index=index)
+
+
+@pytest.fixture
+def async_engine_adapter(mocker: MockerFixture, tmp_path: Path) -> Generator[AddressingZalAdapter, None, None]:
+    """
+    Adapter with its async lookups on an aiosqlite engine, on the same database file as its sync session
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'zal.sqlite'}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'zal.sqlite'}")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        _create_organisations(session)
+        session.commit()
+        yield _create_adapter(mocker, session, AsyncReadSessionFactory(async_engine, expire_on_commit=False))
+
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+@pytest.mark.usefixtures("bindings")
+class TestAddressingZalAdapter:
+    def test_search_many_returns_the_same_entries_as_single_searches(self, adapter: AddressingZalAdapter) -> None:
+        agb = ZalSearchRequestEntry(id_type=IdentificationType.agbz, id_value="71025100")
+        ura = ZalSearchRequestEntry(id_type=IdentificationType.ura, id_value="90000382")
+        medmij = ZalSearchRequestEntry(id_type=IdentificationType.medmij, id_value="organisation0@medmij")
+        unknown = ZalSearchRequestEntry(id_type=IdentificationType.kvk, id_value="12345678")
+
+        result = adapter.search_many({agb, ura, medmij, unknown})
+
+        assert result == {
+            agb: adapter.search_by_agb("71025100"),
+            ura: adapter.search_by_ura("90000382"),
+            medmij: adapter.search_by_medmij_name("organisation0@medmij"),
+        }
+
+    def test_search_many_uses_a_fixed_number_of_organisation_and_data_service_queries(
+        self,
+        adapter: AddressingZalAdapter,
+        db_session: Session,
+        statements: list[str],
+    ) -> None:
+        db_session.expire_all()
+        statements.clear()
+
+        adapter.search_many(
+            [
+                ZalSearchRequestEntry(id_type=IdentificationType.agbz, id_value="71025100"),
+                ZalSearchRequestEntry(id_type=IdentificationType.ura, id_value="90000382"),
+                ZalSearchRequestEntry(id_type=IdentificationType.medmij, id_value="organisation1@medmij"),
+            ]
+        )
+
+        organisation_queries = [statement for statement in statements if "FROM organisations" in statement]
+        data_service_queries = [statement for statement in statements if "FROM data_services" in statement]
+        assert len(organisation_queries) == 2
+        assert len(data_service_queries) == 1
+
+    def test_search_loads_data_services_with_roles_and_endpoints_in_a_fixed_number_of_queries(
+        self,
+        adapter: AddressingZalAdapter,
+        db_session: Session,
+        statements: list[str],
+    ) -> None:
+        db_session.expire_all()
+        statements.clear()
+
+        entry = adapter.search_by_agb("71025100")
+
+        assert entry is not None
+        assert entry.dataservices[0].roles[0].resource_endpoint == "wrapped:https://example.com/endpoint"
+        # One query for the organisation, one for its data services and endpoints and one for their roles
+        assert len(statements) == 3
+
+    def test_search_many_loads_the_data_service_graph_in_a_fixed_number_of_queries(
+        self,
+        adapter: AddressingZalAdapter,
+        db_session: Session,
+        statements: list[str],
+    ) -> None:
+        db_session.expire_all()
+        statements.clear()
+
+        result = adapter.search_many(
+            [
+                ZalSearchRequestEntry(id_type=IdentificationType.agbz, id_value="71025100"),
+                ZalSearchRequestEntry(id_type=IdentificationType.ura, id_value="90000382"),
+            ]
+        )
+
+        assert len(result) == 2
+        assert len(statements) == 3
+
+    def test_search_many_without_requests_does_not_query(
+        self,
+        adapter: AddressingZalAdapter,
+        statements: list[str],
+    ) -> None:
+        statements.clear()
+
+        assert adapter.search_many([]) == {}
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_search_many_async_without_async_engine_returns_the_same_entries_as_search_many(
+        self, adapter: AddressingZalAdapter
+    ) -> None:
+        requests = [
+            ZalSearchRequestEntry(id_type=IdentificationType.agbz, id_value="71025100"),
+            ZalSearchRequestEntry(id_type=IdentificationType.medmij, id_value="organisation1@medmij"),
+        ]
+
+        assert await adapter.search_many_async(requests) == adapter.search_many(requests)
+
+
+@pytest.mark.usefixtures("bindings")
+class TestAddressingZalAdapterWithIndex:
+    REQUESTS = [
+        ZalSearchRequestEntry(id_type=IdentificationType.agbz, id_value="71025100"),
+        ZalSearchRequestEntry(id_type=IdentificationType.ura, id_value="90000382"),
+        ZalSearchRequestEntry(id_type=IdentificationType.medmij, id_value="organisation0@medmij"),
+        ZalSearchRequestEntry(id_type=IdentificationType.kvk, id_value="12345678"),
+    ]
+
+    def test_returns_the_same_entries_as_the_database_lookups(
+        self, adapter: AddressingZalAdapter, index_adapter: AddressingZalAdapter
+    ) -> None:
+        assert index_adapter.search_many(self.REQUESTS) == adapter.search_many(self.REQUESTS)
+        assert index_adapter.search_by_agb("71025100") == adapter.search_by_agb("71025100")
+        assert index_adapter.search_by_ura("90000382") == adapter.search_by_ura("90000382")
+        assert index_adapter.search_by_medmij_name("organisation1@medmij") == adapter.search_by_medmij_name(
+            "organisation1@medmij"
+        )
+        assert index_adapter.search_by_kvk("12345678") is None
+
+    def test_lookups_do_not_query_once_the_index_is_built(
+        self, index_adapter: AddressingZalAdapter, statements: list[str]
+    ) -> None:
+        # The index is built by the fixture
+        statements.clear()
+
+        result = index_adapter.search_many(self.REQUESTS)
+
+        assert len(result) == 3
+        assert index_adapter.search_by_medmij_name("organisation0@medmij") is not None
+        assert statements == []
+
+    def test_lookups_use_the_database_until_the_index_is_built(
+        self,
+        mocker: MockerFixture,
+        db_session: Session,
+        adapter: AddressingZalAdapter,
+        index: ZalAddressingIndex,
+        statements: list[str],
+    ) -> None:
+        unbuilt_index_adapter = _create_adapter(mocker, db_session, index=index)
+
+        assert unbuilt_index_adapter.search_many(self.REQUESTS) == adapter.search_many(self.REQUESTS)
+        assert unbuilt_index_adapter.search_by_agb("71025100") == adapter.search_by_agb("71025100")
+        assert statements != []
+        assert index.snapshot() is None
+
+    def test_responses_do_not_change_the_shared_template(self, index_adapter: AddressingZalAdapter) -> None:
+        by_agb = index_adapter.search_by_agb("71025100")
+        by_name = index_adapter.search_by_medmij_name("organisation0@medmij")
+
+        assert by_agb is not None and by_name is not None
+        assert by_agb.id_type == IdentificationType.agbz
+        assert by_name.id_type == IdentificationType.medmij
+        assert by_name.dataservices[0].auth_endpoint == "wrapped:https://example.com/endpoint"
+
+    @pytest.mark.asyncio
+    async def test_search_many_async_uses_the_index(
+        self, index_adapter: AddressingZalAdapter, statements: list[str]
+    ) -> None:
+        expected = index_adapter.search_many(self.REQUESTS)
+        statements.clear()
+
+        assert await index_adapter.search_many_async(self.REQUESTS) == expected
+        assert statements == []
+
+
+@pytest.mark.usefixtures("bindings")
+class TestAddressingZalAdapterAsyncEngine:
+    @pytest.mark.asyncio
+    async def test_search_many_async_returns_the_same_entries_as_search_many(
+        self, async_engine_adapter: AddressingZalAdapter
+    ) -> None:
+        agb = ZalSearchRequestEntry(id_type=IdentificationType.agbz, id_value="71025100")
+        ura = ZalSearchRequestEntry(id_type=IdentificationType.ura, id_value="90000382")
+        medmij = ZalSearchRequestEntry(id_type=IdentificationType.medmij, id_value="organisation0@medmij")
+        unknown = ZalSearchRequestEntry(id_type=IdentificationType.kvk, id_value="12345678")
+
+        result = await async_engine_adapter.search_many_async({agb, ura, medmij, unknown})
+
+        assert result == async_engine_adapter.search_many({agb, ura, medmij, unknown})
+        assert len(result) == 3
+        assert result[agb].dataservices[0].roles[0].resource_endpoint == "wrapped:https://example.com/endpoint"
+
+    @pytest.mark.asyncio
+    async def test_async_lookups_match_the_sync_lookups(self, async_engine_adapter: AddressingZalAdapter) -> None:
+        organisations = async_engine_adapter.organisation_repository
+        data_services = async_engine_adapter.data_service_repository
+
+        organisation = await organisations.find_one_by_name_async("organisation1@medmij")
+        assert organisation is not None
+        assert organisation.id == organisations.find_one_by_name("organisation1@medmij").id  # type: ignore[union-attr]
+
+        by_feature = await organisations.find_one_by_identifying_feature_async(IdentifyingFeatureType.URA, "90000382")
+        assert by_feature is not None
+        assert by_feature.name == "organisation1@medmij"
+        assert await organisations.find_one_by_name_async("unknown@medmij") is None
+
+        roles = [
+            role.code
+            for data_service in await data_services.find_all_by_organisation_async(organisation.id)
+            for role in data_service.roles
+        ]
+        assert roles == ["role"]
+        assert await data_services.find_all_by_organisations_async([]) == []
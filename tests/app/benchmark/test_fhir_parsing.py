@@ -0,0 +1,30 @@
+from logging import Logger
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.addressing.addressing_service import AddressingService
+from app.benchmark.fhir_parsing import build_search_bundle, parse_lean, parse_strict
+from app.benchmark.timestamp_patching import DEFAULT_BUNDLE_PATH
+from app.healthcarefinder.zorgab.hydration_service import HydrationService
+
+
+def read_recorded_bundle() -> bytes:
+    with open(DEFAULT_BUNDLE_PATH, "rb") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("content", [build_search_bundle(3), read_recorded_bundle()], ids=["synthetic", "recorded"])
+def test_lean_and_strict_parsing_hydrate_to_the_same_organizations(mocker: MockerFixture, content: bytes) -> None:
+    hydration_service = HydrationService(
+        addressing_service=mocker.Mock(spec=AddressingService), logger=mocker.Mock(spec=Logger)
+    )
+
+    lean_records = parse_lean(content)
+    strict_records = parse_strict(content)
+
+    assert lean_records
+    assert lean_records == strict_records
+    assert [hydration_service.hydrate_to_organization(record, {}) for record in lean_records] == [
+        hydration_service.hydrate_to_organization(record, {}) for record in strict_records
+    ]
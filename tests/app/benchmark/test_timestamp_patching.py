@@ -0,0 +1,34 @@
+from typing import Any
+
+import orjson
+import pytest
+
+from app.benchmark.fhir_parsing import build_search_bundle
+from app.benchmark.timestamp_patching import DEFAULT_BUNDLE_PATH, recursive_patch
+from app.healthcarefinder.zorgab.patch import TimestampPatcher
+
+
+def test_patcher_matches_recursive_baseline_on_recorded_bundle() -> None:
+    with open(DEFAULT_BUNDLE_PATH, "rb") as file:
+        content = file.read()
+
+    patched = TimestampPatcher.patch(orjson.loads(content))
+
+    assert patched == recursive_patch(orjson.loads(content))
+    assert patched["meta"]["lastUpdated"] == "2025-10-29T12:01:25.586Z"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        orjson.loads(build_search_bundle(3)),
+        "2025-10-29T12:01:25",
+        {"values": ["2025-10-29T12:01:25.5", "2025-10-29T12:01:25+01:00", "2025-10-29", "aaaaaaaaaaT12:01:25"]},
+        [["2025-10-29T12:01:25.586Z", 1, 1.5, True, None], {"nested": {"start": "2020-11-03T12:49:40"}}],
+    ],
+    ids=["synthetic-bundle", "string", "near-timestamps", "mixed-values"],
+)
+def test_patcher_matches_recursive_baseline(data: Any) -> None:  # type: ignore[explicit-any]
+    expected = recursive_patch(orjson.loads(orjson.dumps(data)))
+
+    assert TimestampPatcher.patch(data) == expected
@@ -0,0 +1,49 @@
+import logging
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.addressing.zal.index import ZalAddressingIndex
+from app.benchmark.zal_index import find_in_database, find_in_index, import_zal
+from app.benchmark.zal_traversal import build_zal
+from app.db.models import Base
+from app.db.repositories import OrganisationRepository, ReadDataServiceRepository, ReadOrganisationRepository
+
+
+def test_import_zal_writes_the_organisations_of_the_synthetic_zal() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        assert import_zal(session, build_zal(3)) == 3
+        assert OrganisationRepository(session).find_ids_by_name().keys() == {"za0@medmij", "za1@medmij", "za2@medmij"}
+
+
+def test_index_and_database_find_the_same_organisations() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    names = ["za0@medmij", "za4@medmij", "za9@medmij", "unknown@medmij"]
+
+    with Session(engine) as session:
+        import_zal(session, build_zal(10))
+        index = ZalAddressingIndex(
+            organisation_repository=ReadOrganisationRepository(session, async_sessions=None),
+            data_service_repository=ReadDataServiceRepository(session, async_sessions=None),
+            logger=logging.getLogger(__name__),
+            refresh_seconds=float("inf"),
+        )
+        index.refresh()
+
+        index_entries = find_in_index(index, names)
+        database_entries = find_in_database(session, names)
+
+    assert [
+        (entry.medmij_id, [data_service.id for data_service in entry.dataservices]) if entry is not None else None
+        for entry in index_entries
+    ] == [
+        ("za0@medmij", ["4", "6"]),
+        ("za4@medmij", ["4", "6"]),
+        ("za9@medmij", ["4", "6"]),
+        None,
+    ]
+    assert index_entries == database_entries
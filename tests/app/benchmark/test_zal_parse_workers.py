@@ -0,0 +1,14 @@
+from pathlib import Path
+
+from app.benchmark.zal_parse_workers import extract_in_workers, extract_streaming
+from app.benchmark.zal_traversal import build_zal
+
+
+def test_workers_extract_the_same_organisations_as_the_streaming_importer(tmp_path: Path) -> None:
+    path = tmp_path / "zal.xml"
+    path.write_bytes(build_zal(25))
+
+    streamed = extract_streaming(str(path))
+
+    assert len(streamed) == 25
+    assert extract_in_workers(str(path), workers=1, batch_size=10) == streamed
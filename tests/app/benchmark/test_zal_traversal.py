@@ -0,0 +1,31 @@
+from defusedxml.ElementTree import fromstring
+
+from app.benchmark.zal_traversal import build_zal, extract_organisations
+from app.xml.services import ElementTraverser
+
+
+def test_extract_organisations_reads_synthetic_zal() -> None:
+    organisations = extract_organisations(ElementTraverser(fromstring(build_zal(2)), single_namespace=True))
+
+    assert [(name, type, len(data_services)) for name, type, data_services in organisations] == [
+        ("za0@medmij", "ZA", 2),
+        ("za1@medmij", "ZA", 2),
+    ]
+    assert organisations[1][2][1] == (
+        "6",
+        "https://za1.example.org/oauth/authorize",
+        "https://za1.example.org/oauth/token",
+        [
+            ("MM-1.2-PLB-FHIR", "https://za1.example.org/fhir/6"),
+            ("MM-1.2-PDB-FHIR", "https://za1.example.org/fhir/6"),
+        ],
+    )
+
+
+def test_default_and_single_namespace_traversers_extract_the_same_organisations() -> None:
+    root = fromstring(build_zal(10))
+
+    organisations = extract_organisations(ElementTraverser(root))
+
+    assert len(organisations) == 10
+    assert extract_organisations(ElementTraverser(root, single_namespace=True)) == organisations
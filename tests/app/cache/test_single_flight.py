@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.cache.single_flight import SingleFlight
+
+
+def test_do_coalesces_concurrent_calls() -> None:
+    single_flight: SingleFlight[str, int] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(single_flight.do, "a", fn)
+        started.wait(timeout=5)
+        others = [executor.submit(single_flight.do, "a", fn) for _ in range(3)]
+        while single_flight.stats().coalesced < 3:
+            threading.Event().wait(0.001)
+        release.set()
+
+        assert first.result() == 42
+        assert [future.result() for future in others] == [42, 42, 42]
+
+    assert len(calls) == 1
+    assert single_flight.stats().calls == 1
+    assert single_flight.stats().coalesced == 3
+
+
+def test_do_does_not_keep_results() -> None:
+    single_flight: SingleFlight[str, int] = SingleFlight()
+
+    assert single_flight.do("a", lambda: 1) == 1
+    assert single_flight.do("a", lambda: 2) == 2
+    assert single_flight.do("b", lambda: 3) == 3
+    assert single_flight.stats().calls == 3
+    assert single_flight.stats().coalesced == 0
+
+
+def test_do_propagates_errors() -> None:
+    single_flight: SingleFlight[str, int] = SingleFlight()
+
+    def fn() -> int:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        single_flight.do("a", fn)
+
+    assert single_flight.do("a", lambda: 1) == 1
+
+
+@pytest.mark.asyncio
+async def test_do_async_coalesces_concurrent_calls() -> None:
+    single_flight: SingleFlight[str, int] = SingleFlight()
+    calls = []
+
+    async def fn() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(single_flight.do_async("a", fn) for _ in range(5)))
+
+    assert results == [42] * 5
+    assert len(calls) == 1
+    assert single_flight.stats().calls == 1
+    assert single_flight.stats().coalesced == 4
+    assert await single_flight.do_async("a", fn) == 42
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_do_async_shares_errors_and_survives_cancelled_callers() -> None:
+    single_flight: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+
+    async def fn() -> int:
+        await release.wait()
+        raise RuntimeError("boom")
+
+    cancelled = asyncio.ensure_future(single_flight.do_async("a", fn))
+    waiting = asyncio.ensure_future(single_flight.do_async("a", fn))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+
+    with pytest.raises(RuntimeError):
+        await waiting
+    assert single_flight.stats().coalesced == 1
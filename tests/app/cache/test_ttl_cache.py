@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.cache.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(max_entries=10, ttl_seconds=5, clock=clock)
+
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_entries=2, ttl_seconds=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats().evictions == 1
+
+
+def test_get_or_load_does_not_cache_none() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_entries=10, ttl_seconds=60)
+    calls = []
+
+    def loader() -> int | None:
+        calls.append(1)
+        return None
+
+    assert cache.get_or_load("a", loader) is None
+    assert cache.get_or_load("a", loader) is None
+    assert len(calls) == 2
+
+
+def test_get_or_load_propagates_loader_errors() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_entries=10, ttl_seconds=60)
+
+    def loader() -> int | None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("a", loader)
+
+    assert cache.get_or_load("a", lambda: 1) == 1
+
+
+def test_get_or_load_coalesces_concurrent_loads() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_entries=10, ttl_seconds=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader() -> int | None:
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(cache.get_or_load, "a", loader)
+        started.wait(timeout=5)
+        others = [executor.submit(cache.get_or_load, "a", loader) for _ in range(3)]
+        while cache.stats().coalesced < 3:
+            threading.Event().wait(0.001)
+        release.set()
+
+        assert first.result() == 42
+        assert [future.result() for future in others] == [42, 42, 42]
+
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert stats.misses == 4
+    assert stats.coalesced == 3
+    assert cache.get_or_load("a", loader) == 42
+    assert cache.stats().hit_ratio == pytest.approx(1 / 5)
+
+
+def test_max_entries_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        TTLCache(max_entries=0, ttl_seconds=60)
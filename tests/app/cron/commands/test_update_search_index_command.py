@@ -11,10 +11,15 @@ from pytest_mock import MockerFixture
 from app.cron.commands.update_search_index_command import UpdateSearchIndexCommand
 from app.normalization.bundle import BundleNormalizer
 from app.normalization.models import NormalizedOrganization
-from app.search_indexation.models import SearchIndex
-from app.search_indexation.repositories import EncryptedEndpointsRepository, SearchIndexRepository
+from app.search_indexation.models import EncryptedEndpointManifestEntry, EncryptedEndpointsManifest, SearchIndex
+from app.search_indexation.repositories import (
+    EncryptedEndpointsManifestRepository,
+    EncryptedEndpointsRepository,
+    SearchIndexRepository,
+)
 from app.search_indexation.services import (
     EncryptedEndpointProvider,
+    EncryptedEndpointsExport,
     MockOrganizationsMerger,
 )
 from app.zorgab_scraper.config import IdentifierSource
@@ -36,11 +41,23 @@ def normalized_organizations() -> list[NormalizedOrganization]:
     ]
 
 
+@pytest.fixture()
+def encrypted_endpoints_export() -> EncryptedEndpointsExport:
+    return EncryptedEndpointsExport(
+        endpoints={123: "encrypted-url-123"},
+        manifest=EncryptedEndpointsManifest(
+            key_id="jwt-key:jwe-key",
+            entries={123: EncryptedEndpointManifestEntry(url_hash="url-hash", token_hash="token-hash", issued_at=0)},
+        ),
+    )
+
+
 class TestUpdateSearchIndexCommand:
     def test_happy_path(
         self,
         bundle: Bundle,
         normalized_organizations: list[NormalizedOrganization],
+        encrypted_endpoints_export: EncryptedEndpointsExport,
         caplog: LogCaptureFixture,
         mocker: MockerFixture,
     ) -> None:
@@ -49,8 +66,9 @@ class TestUpdateSearchIndexCommand:
         mock_repository = mocker.Mock(spec=SearchIndexRepository)
         mock_endpoint_provider = mocker.Mock(spec=EncryptedEndpointProvider)
         mock_encrypted_endpoints_repository = mocker.Mock(spec=EncryptedEndpointsRepository)
+        mock_manifest_repository = mocker.Mock(spec=EncryptedEndpointsManifestRepository)
         mock_organizations_merger = mocker.Mock(spec=MockOrganizationsMerger)
-        mock_endpoint_provider.get_all.return_value = {"org-123": "encrypted-url-123"}
+        mock_endpoint_provider.get_all_incremental.return_value = encrypted_endpoints_export
         mock_organizations_merger.merge.return_value = normalized_organizations
 
         mock_scraper.run.return_value = bundle
@@ -59,6 +77,8 @@ class TestUpdateSearchIndexCommand:
         args = Namespace(
             scrape_limit=0,
             scrape_workers=4,
+            encrypt_workers=2,
+            full_encryption=False,
             scrape_sources=[IdentifierSource.zakl_xml, IdentifierSource.agb_csv],
         )
         caplog.set_level(logging.INFO, logger="app.cron.commands.update_search_index_command")
@@ -69,6 +89,7 @@ class TestUpdateSearchIndexCommand:
             search_index_repository=mock_repository,
             encrypted_endpoint_provider=mock_endpoint_provider,
             encrypted_endpoints_repository=mock_encrypted_endpoints_repository,
+            encrypted_endpoints_manifest_repository=mock_manifest_repository,
             mock_organizations_merger=mock_organizations_merger,
         )
         exit_code = command.run(args)
@@ -87,7 +108,7 @@ class TestUpdateSearchIndexCommand:
                 ("Bundle normalization completed successfully (organizations=1)", logging.INFO),
                 ("Saving search index", logging.INFO),
                 ("Search index saved successfully", logging.INFO),
-                ("Exporting encrypted endpoints for search index", logging.INFO),
+                ("Exporting encrypted endpoints for search index (full=False)", logging.INFO),
                 ("Encrypted endpoints export completed successfully", logging.INFO),
                 ("Saving encrypted endpoints", logging.INFO),
                 ("Encrypted endpoints saved successfully", logging.INFO),
@@ -98,8 +119,13 @@ class TestUpdateSearchIndexCommand:
         mock_scraper.run.assert_called_once_with(args.scrape_limit, args.scrape_workers, args.scrape_sources)
         mock_normalizer.normalize.assert_called_once_with(bundle)
         mock_repository.save.assert_called_once_with(SearchIndex(normalized_organizations))
-        mock_encrypted_endpoints_repository.save.assert_called_once_with({"org-123": "encrypted-url-123"})
-        mock_endpoint_provider.get_all.assert_called_once()
+        mock_encrypted_endpoints_repository.save.assert_called_once_with(encrypted_endpoints_export.endpoints)
+        mock_manifest_repository.save.assert_called_once_with(encrypted_endpoints_export.manifest)
+        mock_endpoint_provider.get_all_incremental.assert_called_once_with(
+            mock_encrypted_endpoints_repository.load.return_value,
+            mock_manifest_repository.load.return_value,
+            workers=args.encrypt_workers,
+        )
 
     def test_scraper_failure(self, caplog: LogCaptureFixture, mocker: MockerFixture) -> None:
         mock_scraper = mocker.Mock(spec=ZorgabScraper)
@@ -107,6 +133,7 @@ class TestUpdateSearchIndexCommand:
         mock_repository = mocker.Mock(spec=SearchIndexRepository)
         mock_endpoint_provider = mocker.Mock(spec=EncryptedEndpointProvider)
         mock_encrypted_endpoints_repository = mocker.Mock(spec=EncryptedEndpointsRepository)
+        mock_manifest_repository = mocker.Mock(spec=EncryptedEndpointsManifestRepository)
         mock_organizations_merger = mocker.Mock(spec=MockOrganizationsMerger)
 
         mock_scraper.run.side_effect = Exception("Scraper failed")
@@ -114,6 +141,8 @@ class TestUpdateSearchIndexCommand:
         args = Namespace(
             scrape_limit=0,
             scrape_workers=4,
+            encrypt_workers=2,
+            full_encryption=False,
             scrape_sources=[IdentifierSource.zakl_xml, IdentifierSource.agb_csv],
         )
         caplog.set_level(logging.INFO, logger="app.cron.commands.update_search_index_command")
@@ -124,6 +153,7 @@ class TestUpdateSearchIndexCommand:
             search_index_repository=mock_repository,
             encrypted_endpoint_provider=mock_endpoint_provider,
             encrypted_endpoints_repository=mock_encrypted_endpoints_repository,
+            encrypted_endpoints_manifest_repository=mock_manifest_repository,
             mock_organizations_merger=mock_organizations_merger,
         )
 
@@ -156,7 +186,7 @@ class TestUpdateSearchIndexCommand:
         mock_normalizer.normalize.assert_not_called()
         mock_repository.save.assert_not_called()
         mock_encrypted_endpoints_repository.save.assert_not_called()
-        mock_endpoint_provider.get_all.assert_not_called()
+        mock_endpoint_provider.get_all_incremental.assert_not_called()
 
     def test_normalization_failure(self, bundle: Bundle, caplog: LogCaptureFixture, mocker: MockerFixture) -> None:
         mock_scraper = mocker.Mock(spec=ZorgabScraper)
@@ -164,6 +194,7 @@ class TestUpdateSearchIndexCommand:
         mock_repository = mocker.Mock(spec=SearchIndexRepository)
         mock_endpoint_provider = mocker.Mock(spec=EncryptedEndpointProvider)
         mock_encrypted_endpoints_repository = mocker.Mock(spec=EncryptedEndpointsRepository)
+        mock_manifest_repository = mocker.Mock(spec=EncryptedEndpointsManifestRepository)
         mock_organizations_merger = mocker.Mock(spec=MockOrganizationsMerger)
 
         mock_scraper.run.return_value = bundle
@@ -172,6 +203,8 @@ class TestUpdateSearchIndexCommand:
         args = Namespace(
             scrape_limit=0,
             scrape_workers=4,
+            encrypt_workers=2,
+            full_encryption=False,
             scrape_sources=[IdentifierSource.zakl_xml, IdentifierSource.agb_csv],
         )
         caplog.set_level(logging.INFO, logger="app.cron.commands.update_search_index_command")
@@ -182,6 +215,7 @@ class TestUpdateSearchIndexCommand:
             search_index_repository=mock_repository,
             encrypted_endpoint_provider=mock_endpoint_provider,
             encrypted_endpoints_repository=mock_encrypted_endpoints_repository,
+            encrypted_endpoints_manifest_repository=mock_manifest_repository,
             mock_organizations_merger=mock_organizations_merger,
         )
         exit_code = command.run(args)
@@ -201,12 +235,13 @@ class TestUpdateSearchIndexCommand:
         mock_normalizer.normalize.assert_called_once_with(bundle)
         mock_repository.save.assert_not_called()
         mock_encrypted_endpoints_repository.save.assert_not_called()
-        mock_endpoint_provider.get_all.assert_not_called()
+        mock_endpoint_provider.get_all_incremental.assert_not_called()
 
     def test_persistence_failure(
         self,
         bundle: Bundle,
         normalized_organizations: list[NormalizedOrganization],
+        encrypted_endpoints_export: EncryptedEndpointsExport,
         caplog: LogCaptureFixture,
         mocker: MockerFixture,
     ) -> None:
@@ -215,17 +250,20 @@ class TestUpdateSearchIndexCommand:
         mock_repository = mocker.Mock(spec=SearchIndexRepository)
         mock_endpoint_provider = mocker.Mock(spec=EncryptedEndpointProvider)
         mock_encrypted_endpoints_repository = mocker.Mock(spec=EncryptedEndpointsRepository)
+        mock_manifest_repository = mocker.Mock(spec=EncryptedEndpointsManifestRepository)
         mock_organizations_merger = mocker.Mock(spec=MockOrganizationsMerger)
 
         mock_scraper.run.return_value = bundle
         mock_normalizer.normalize.return_value = normalized_organizations
         mock_organizations_merger.merge.return_value = normalized_organizations
-        mock_endpoint_provider.get_all.return_value = {"org-123": "encrypted-url-123"}
+        mock_endpoint_provider.get_all_incremental.return_value = encrypted_endpoints_export
         mock_repository.save.side_effect = Exception("Persistence failure")
 
         args = Namespace(
             scrape_limit=0,
             scrape_workers=4,
+            encrypt_workers=2,
+            full_encryption=False,
             scrape_sources=[IdentifierSource.zakl_xml, IdentifierSource.agb_csv],
         )
         caplog.set_level(logging.INFO, logger="app.cron.commands.update_search_index_command")
@@ -236,6 +274,7 @@ class TestUpdateSearchIndexCommand:
             search_index_repository=mock_repository,
             encrypted_endpoint_provider=mock_endpoint_provider,
             encrypted_endpoints_repository=mock_encrypted_endpoints_repository,
+            encrypted_endpoints_manifest_repository=mock_manifest_repository,
             mock_organizations_merger=mock_organizations_merger,
         )
 
@@ -258,12 +297,17 @@ class TestUpdateSearchIndexCommand:
         mock_normalizer.normalize.assert_called_once_with(bundle)
         mock_repository.save.assert_called_once()
         mock_encrypted_endpoints_repository.save.assert_not_called()
-        mock_endpoint_provider.get_all.assert_called_once()
+        mock_endpoint_provider.get_all_incremental.assert_called_once_with(
+            mock_encrypted_endpoints_repository.load.return_value,
+            mock_manifest_repository.load.return_value,
+            workers=args.encrypt_workers,
+        )
 
     def test_encrypted_endpoints_save_failure(
         self,
         bundle: Bundle,
         normalized_organizations: list[NormalizedOrganization],
+        encrypted_endpoints_export: EncryptedEndpointsExport,
         caplog: LogCaptureFixture,
         mocker: MockerFixture,
     ) -> None:
@@ -272,17 +316,20 @@ class TestUpdateSearchIndexCommand:
         mock_repository = mocker.Mock(spec=SearchIndexRepository)
         mock_endpoint_provider = mocker.Mock(spec=EncryptedEndpointProvider)
         mock_encrypted_endpoints_repository = mocker.Mock(spec=EncryptedEndpointsRepository)
+        mock_manifest_repository = mocker.Mock(spec=EncryptedEndpointsManifestRepository)
         mock_organizations_merger = mocker.Mock(spec=MockOrganizationsMerger)
 
         mock_scraper.run.return_value = bundle
         mock_normalizer.normalize.return_value = normalized_organizations
         mock_organizations_merger.merge.return_value = normalized_organizations
-        mock_endpoint_provider.get_all.return_value = {"org-123": "encrypted-url-123"}
+        mock_endpoint_provider.get_all_incremental.return_value = encrypted_endpoints_export
         mock_encrypted_endpoints_repository.save.side_effect = Exception("Save failure")
 
         args = Namespace(
             scrape_limit=0,
             scrape_workers=4,
+            encrypt_workers=2,
+            full_encryption=False,
             scrape_sources=[IdentifierSource.zakl_xml, IdentifierSource.agb_csv],
         )
         caplog.set_level(logging.INFO, logger="app.cron.commands.update_search_index_command")
@@ -293,6 +340,7 @@ class TestUpdateSearchIndexCommand:
             search_index_repository=mock_repository,
             encrypted_endpoint_provider=mock_endpoint_provider,
             encrypted_endpoints_repository=mock_encrypted_endpoints_repository,
+            encrypted_endpoints_manifest_repository=mock_manifest_repository,
             mock_organizations_merger=mock_organizations_merger,
         )
 
@@ -312,6 +360,7 @@ class TestUpdateSearchIndexCommand:
         )
 
         mock_encrypted_endpoints_repository.save.assert_called_once()
+        mock_manifest_repository.save.assert_not_called()
         mock_repository.save.assert_called_once()
 
     def test_init_arguments(self) -> None:
@@ -327,8 +376,58 @@ class TestUpdateSearchIndexCommand:
                 "10",
                 "--scrape-workers",
                 "2",
+                "--encrypt-workers",
+                "3",
             ]
         )
 
         assert args.scrape_limit == 10
         assert args.scrape_workers == 2
+        assert args.encrypt_workers == 3
+        assert args.full_encryption is False
+
+    def test_full_encryption_skips_previous_export(
+        self,
+        bundle: Bundle,
+        normalized_organizations: list[NormalizedOrganization],
+        encrypted_endpoints_export: EncryptedEndpointsExport,
+        mocker: MockerFixture,
+    ) -> None:
+        mock_scraper = mocker.Mock(spec=ZorgabScraper)
+        mock_normalizer = mocker.Mock(spec=BundleNormalizer)
+        mock_endpoint_provider = mocker.Mock(spec=EncryptedEndpointProvider)
+        mock_encrypted_endpoints_repository = mocker.Mock(spec=EncryptedEndpointsRepository)
+        mock_manifest_repository = mocker.Mock(spec=EncryptedEndpointsManifestRepository)
+        mock_organizations_merger = mocker.Mock(spec=MockOrganizationsMerger)
+
+        mock_scraper.run.return_value = bundle
+        mock_normalizer.normalize.return_value = normalized_organizations
+        mock_organizations_merger.merge.return_value = normalized_organizations
+        mock_endpoint_provider.get_all.return_value = encrypted_endpoints_export
+
+        command = UpdateSearchIndexCommand(
+            zorgab_scraper=mock_scraper,
+            bundle_normalizer=mock_normalizer,
+            search_index_repository=mocker.Mock(spec=SearchIndexRepository),
+            encrypted_endpoint_provider=mock_endpoint_provider,
+            encrypted_endpoints_repository=mock_encrypted_endpoints_repository,
+            encrypted_endpoints_manifest_repository=mock_manifest_repository,
+            mock_organizations_merger=mock_organizations_merger,
+        )
+
+        exit_code = command.run(
+            Namespace(
+                scrape_limit=0,
+                scrape_workers=4,
+                encrypt_workers=1,
+                full_encryption=True,
+                scrape_sources=[IdentifierSource.zakl_xml],
+            )
+        )
+
+        assert exit_code == 0
+        mock_encrypted_endpoints_repository.load.assert_not_called()
+        mock_manifest_repository.load.assert_not_called()
+        mock_endpoint_provider.get_all.assert_called_once_with(workers=1)
+        mock_endpoint_provider.get_all_incremental.assert_not_called()
+        mock_manifest_repository.save.assert_called_once_with(encrypted_endpoints_export.manifest)
@@ -17,13 +17,20 @@ from app.db.repositories import (
     SystemRoleRepository,
 )
 from app.normalization.models import NormalizedOrganization
-from app.search_indexation.constants import ENCRYPTED_ENDPOINTS_OUTPUT_FILENAME, SEARCH_INDEX_OUTPUT_FILENAME
+from app.search_indexation.constants import (
+    ENCRYPTED_ENDPOINTS_MANIFEST_FILENAME,
+    ENCRYPTED_ENDPOINTS_OUTPUT_FILENAME,
+    SEARCH_INDEX_OUTPUT_FILENAME,
+)
 from app.search_indexation.repositories import (
     EncryptedEndpointsFileRepository,
+    EncryptedEndpointsManifestFileRepository,
+    EncryptedEndpointsManifestRepository,
     EncryptedEndpointsRepository,
     SearchIndexFileRepository,
     SearchIndexRepository,
 )
+from app.search_indexation.writer import AtomicFileWriter
 from app.zal_importer.enums import IdentifyingFeatureType, OrganisationType
 from app.zorgab_scraper.config import IdentifierSource, ZorgABScraperConfig
 from tests.utils import configure_bindings
@@ -107,6 +114,14 @@ class TestUpdateSearchIndexCommandFunctional:
                     temp_path=paths["temp_dir"],
                 ),
             )
+            binder.bind_to_constructor(
+                EncryptedEndpointsManifestRepository,
+                lambda: EncryptedEndpointsManifestFileRepository(
+                    output_path=paths["temp_dir"] / ENCRYPTED_ENDPOINTS_MANIFEST_FILENAME,
+                    temp_path=paths["temp_dir"],
+                    file_writer=AtomicFileWriter(),
+                ),
+            )
 
         configure_bindings(config=config, bindings_override=bindings_override)
 
@@ -200,6 +215,8 @@ class TestUpdateSearchIndexCommandFunctional:
             Namespace(
                 scrape_limit=10,
                 scrape_workers=2,
+                encrypt_workers=1,
+                full_encryption=False,
                 scrape_sources=[IdentifierSource.zakl_xml, IdentifierSource.agb_csv],
             )
         )
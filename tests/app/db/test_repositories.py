@@ -1,15 +1,21 @@
 import json
 from datetime import datetime
-from typing import List
+from typing import Callable, List, cast
 
 from faker import Faker
-from pytest import mark
+from pytest import mark, raises
+from pytest_mock import MockerFixture, MockType
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
 
 from app.db.models import DataService, Endpoint, IdentifyingFeature, Organisation
 from app.db.repositories import (
+    CurrentImportRepository,
     DataServiceRepository,
     DbEndpointRepository,
     IdentifyingFeatureRepository,
+    ImportPartitionRepository,
     OrganisationRepository,
     SystemRoleRepository,
 )
@@ -53,6 +59,31 @@ def create_identifying_feature(
     )
 
 
+def explain_query_plans(session: Session, query: Callable[[], object]) -> List[str]:
+    """
+    Runs the query and returns the EXPLAIN QUERY PLAN details of the SQL statements it executed
+    """
+    statements: List[tuple[str, object]] = []
+
+    def capture(conn: object, cursor: object, statement: str, parameters: object, *args: object) -> None:
+        statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        query()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    connection = session.connection().connection.driver_connection
+    assert connection is not None
+    return [
+        row[3]
+        for statement, parameters in statements
+        for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    ]
+
+
 def create_data_service(
     repository: DataServiceRepository,
     faker: Faker,
@@ -98,6 +129,21 @@ class TestOrganisationRepository:
         assert result.type == type
         assert result.import_ref == import_ref
 
+    def test_create_many_returns_ids_in_order_of_rows(
+        self,
+        organisation_repository: OrganisationRepository,
+        faker: Faker,
+    ) -> None:
+        import_ref = faker.numerify("%##############%%%")
+        names = ["first", "second", "third"]
+
+        ids = organisation_repository.create_many(
+            [{"name": name, "type": OrganisationType.ZA, "import_ref": import_ref} for name in names]
+        )
+
+        organisations = [organisation_repository.find_one_by_name(name) for name in names]
+        assert [organisation.id for organisation in organisations if organisation is not None] == ids
+
     def test_find_one_by_name_returns_matching_organisation(
         self,
         organisation_repository: OrganisationRepository,
@@ -240,6 +286,56 @@ class TestOrganisationRepository:
 
         assert result is None
 
+    def test_find_all_by_names_returns_organisations_of_latest_import(
+        self,
+        organisation_repository: OrganisationRepository,
+        faker: Faker,
+    ) -> None:
+        now = int(datetime.now().timestamp())
+        latest_import_ref = f"{now}000001"
+        create_organisation(organisation_repository, faker, name="outdated", import_ref=f"{now - 60}000001")
+        first = create_organisation(organisation_repository, faker, name="first", import_ref=latest_import_ref)[3]
+        second = create_organisation(organisation_repository, faker, name="second", import_ref=latest_import_ref)[3]
+
+        result = organisation_repository.find_all_by_names(["second", "first", "outdated", "unknown"])
+
+        assert [organisation.id for organisation in result] == [first.id, second.id]
+
+    def test_find_all_by_identifying_features_returns_matched_features(
+        self,
+        organisation_repository: OrganisationRepository,
+        identifying_feature_repository: IdentifyingFeatureRepository,
+        faker: Faker,
+    ) -> None:
+        import_ref = faker.numerify("%##############%%%")
+        agb_organisation = create_organisation(organisation_repository, faker, import_ref=import_ref)[3]
+        ura_organisation = create_organisation(organisation_repository, faker, import_ref=import_ref)[3]
+        create_identifying_feature(
+            identifying_feature_repository, faker, agb_organisation.id, IdentifyingFeatureType.AGB, "123"
+        )
+        create_identifying_feature(
+            identifying_feature_repository, faker, ura_organisation.id, IdentifyingFeatureType.URA, "456"
+        )
+
+        result = organisation_repository.find_all_by_identifying_features(
+            [
+                (IdentifyingFeatureType.AGB, "123"),
+                (IdentifyingFeatureType.URA, "456"),
+                (IdentifyingFeatureType.AGB, "456"),
+            ]
+        )
+
+        assert [(type, value, organisation.id) for type, value, organisation in result] == [
+            (IdentifyingFeatureType.AGB, "123", agb_organisation.id),
+            (IdentifyingFeatureType.URA, "456", ura_organisation.id),
+        ]
+
+    def test_find_all_by_identifying_features_returns_empty_list_without_features(
+        self,
+        organisation_repository: OrganisationRepository,
+    ) -> None:
+        assert organisation_repository.find_all_by_identifying_features([]) == []
+
     def test_import_ref_exists_returns_true_when_exists(
         self,
         organisation_repository: OrganisationRepository,
@@ -297,6 +393,207 @@ class TestOrganisationRepository:
         assert organisation_repository.count_by_import_ref(import_ref_1) == 0
         assert organisation_repository.count_by_import_ref(import_ref_2) == 0
 
+    def test_find_ids_by_name_returns_organisations_of_latest_import(
+        self,
+        organisation_repository: OrganisationRepository,
+        faker: Faker,
+    ) -> None:
+        now = int(datetime.now().timestamp())
+        create_organisation(organisation_repository, faker, name="outdated", import_ref=f"{now - 60}000001")
+        first = create_organisation(organisation_repository, faker, name="first", import_ref=f"{now}000001")[3]
+        second = create_organisation(organisation_repository, faker, name="second", import_ref=f"{now}000001")[3]
+
+        assert organisation_repository.find_ids_by_name() == {"first": first.id, "second": second.id}
+
+    def test_find_ids_by_name_and_find_one_by_name_resolve_duplicate_names_alike(
+        self,
+        organisation_repository: OrganisationRepository,
+        faker: Faker,
+    ) -> None:
+        import_ref = f"{int(datetime.now().timestamp())}000001"
+        first = create_organisation(organisation_repository, faker, name="duplicate", import_ref=import_ref)[3]
+        create_organisation(organisation_repository, faker, name="duplicate", import_ref=import_ref)
+
+        result = organisation_repository.find_one_by_name("duplicate")
+
+        assert result is not None
+        assert result.id == first.id
+        assert organisation_repository.find_ids_by_name() == {"duplicate": first.id}
+
+    def test_find_one_by_name_returns_organisation_of_current_import(
+        self,
+        organisation_repository: OrganisationRepository,
+        current_import_repository: CurrentImportRepository,
+        faker: Faker,
+    ) -> None:
+        now = int(datetime.now().timestamp())
+        name = faker.word()
+        current_organisation = create_organisation(
+            organisation_repository, faker, name=name, import_ref=f"{now}{'1'.zfill(6)}"
+        )[3]
+        current_import_repository.advance(current_organisation.import_ref)
+        # An import that is still being written is not visible until it becomes the current import
+        create_organisation(organisation_repository, faker, name=name, import_ref=f"{now}{'2'.zfill(6)}")
+
+        result = organisation_repository.find_one_by_name(name)
+
+        assert result is not None
+        assert result.id == current_organisation.id
+
+    def test_lookups_use_indexes(
+        self,
+        db_session: Session,
+        organisation_repository: OrganisationRepository,
+        identifying_feature_repository: IdentifyingFeatureRepository,
+        current_import_repository: CurrentImportRepository,
+        faker: Faker,
+    ) -> None:
+        organisation = create_organisation(organisation_repository, faker)[3]
+        type, value, _, _ = create_identifying_feature(
+            identifying_feature_repository, faker, organisation_id=organisation.id
+        )
+        current_import_repository.advance(organisation.import_ref)
+
+        plans = explain_query_plans(db_session, lambda: organisation_repository.find_one_by_name(organisation.name))
+        plans += explain_query_plans(
+            db_session, lambda: organisation_repository.find_one_by_identifying_feature(type, value)
+        )
+
+        assert any("ix_organisations_import_ref_name" in detail for detail in plans)
+        assert any("ix_identifying_features_type_value" in detail for detail in plans)
+        assert not [detail for detail in plans if detail in ("SCAN organisations", "SCAN identifying_features")]
+
+
+class TestCurrentImportRepository:
+    def test_find_import_ref_returns_none_without_current_import(
+        self,
+        current_import_repository: CurrentImportRepository,
+    ) -> None:
+        assert current_import_repository.find_import_ref() is None
+
+    def test_advance_sets_current_import(
+        self,
+        current_import_repository: CurrentImportRepository,
+    ) -> None:
+        current_import_repository.advance("1620148431000009")
+
+        assert current_import_repository.find_import_ref() == "1620148431000009"
+
+    def test_advance_does_not_move_back_to_an_older_import(
+        self,
+        current_import_repository: CurrentImportRepository,
+    ) -> None:
+        current_import_repository.advance("1620148431000013")
+        current_import_repository.advance("1620148431000009")
+
+        assert current_import_repository.find_import_ref() == "1620148431000013"
+
+
+def _create_postgresql_session_mock(mocker: MockerFixture) -> MockType:
+    session: MockType = mocker.Mock()
+    session.get_bind.return_value.dialect = postgresql.dialect()  # type: ignore[no-untyped-call]
+    return session
+
+
+def _create_autocommit_connection_mock(mocker: MockerFixture, session: MockType) -> MockType:
+    connection: MockType = mocker.MagicMock()
+    session.get_bind.return_value.engine.connect.return_value.execution_options.return_value = connection
+    return cast(MockType, connection.__enter__.return_value)
+
+
+class TestImportPartitionRepository:
+    def test_is_partitioned_is_false_for_non_postgresql_database(self, db_session: Session) -> None:
+        assert ImportPartitionRepository(db_session).is_partitioned() is False
+
+    def test_create_partitions_attaches_and_commits_partition_per_table_then_sets_import_ref(
+        self, mocker: MockerFixture
+    ) -> None:
+        session = _create_postgresql_session_mock(mocker)
+
+        ImportPartitionRepository(session).create_partitions("1620148431000009")
+
+        statements = [str(call.args[0]) for call in session.execute.call_args_list]
+        assert statements == [
+            *(
+                statement
+                for table in ("organisations", "data_services", "system_roles", "identifying_features")
+                for statement in (
+                    f"CREATE TABLE {table}_1620148431000009 (LIKE {table} INCLUDING ALL)",
+                    f"ALTER TABLE {table} ATTACH PARTITION {table}_1620148431000009 FOR VALUES IN ('1620148431000009')",
+                )
+            ),
+            "SELECT set_config('zal.import_ref', :import_ref, true)",
+        ]
+        assert session.execute.call_args_list[-1].args[1] == {"import_ref": "1620148431000009"}
+        # The partitions are committed before the import_ref is set for the import transaction
+        assert session.mock_calls.index(mocker.call.commit()) == len(session.mock_calls) - 2
+
+    def test_create_partitions_quotes_partition_names(self, mocker: MockerFixture) -> None:
+        session = _create_postgresql_session_mock(mocker)
+
+        ImportPartitionRepository(session).create_partitions("Ref_1")
+
+        assert str(session.execute.call_args_list[1].args[0]) == (
+            "ALTER TABLE organisations ATTACH PARTITION \"organisations_Ref_1\" FOR VALUES IN ('Ref_1')"
+        )
+
+    def test_drop_partitions_detaches_concurrently_and_drops_referencing_partitions_first(
+        self, mocker: MockerFixture
+    ) -> None:
+        session = _create_postgresql_session_mock(mocker)
+        connection = _create_autocommit_connection_mock(mocker, session)
+        connection.execute.return_value.scalar.return_value = False
+
+        ImportPartitionRepository(session).drop_partitions(["1620148431000009"])
+
+        statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+        assert statements == [
+            statement
+            for table in ("identifying_features", "system_roles", "data_services", "organisations")
+            for statement in (
+                "SELECT inhdetachpending FROM pg_inherits WHERE inhrelid = to_regclass(:partition)",
+                f"ALTER TABLE {table} DETACH PARTITION {table}_1620148431000009 CONCURRENTLY",
+                f"DROP TABLE IF EXISTS {table}_1620148431000009",
+            )
+        ]
+        assert connection.execute.call_args_list[0].args[1] == {"partition": "identifying_features_1620148431000009"}
+        session.get_bind.return_value.engine.connect.return_value.execution_options.assert_called_once_with(
+            isolation_level="AUTOCOMMIT"
+        )
+        # The session is done with the parent tables before the first detach, which waits for it otherwise
+        session.commit.assert_called_once()
+        session.execute.assert_not_called()
+
+    def test_drop_partitions_finalizes_interrupted_detach_and_skips_dropped_partitions(
+        self, mocker: MockerFixture
+    ) -> None:
+        session = _create_postgresql_session_mock(mocker)
+        connection = _create_autocommit_connection_mock(mocker, session)
+        # identifying_features is dropped already and the detach of system_roles was interrupted
+        connection.execute.return_value.scalar.side_effect = [None, True, False, False]
+
+        ImportPartitionRepository(session).drop_partitions(["1"])
+
+        statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+        assert [statement for statement in statements if not statement.startswith("SELECT")] == [
+            "DROP TABLE IF EXISTS identifying_features_1",
+            "ALTER TABLE system_roles DETACH PARTITION system_roles_1 FINALIZE",
+            "DROP TABLE IF EXISTS system_roles_1",
+            "ALTER TABLE data_services DETACH PARTITION data_services_1 CONCURRENTLY",
+            "DROP TABLE IF EXISTS data_services_1",
+            "ALTER TABLE organisations DETACH PARTITION organisations_1 CONCURRENTLY",
+            "DROP TABLE IF EXISTS organisations_1",
+        ]
+
+    @mark.parametrize("import_ref", ["1620'; DROP TABLE organisations; --", "", "1620148431000009\n"])
+    def test_partitions_are_not_created_for_invalid_import_ref(self, mocker: MockerFixture, import_ref: str) -> None:
+        session = _create_postgresql_session_mock(mocker)
+
+        with raises(ValueError, match="Invalid import reference"):
+            ImportPartitionRepository(session).create_partitions(import_ref)
+
+        session.execute.assert_not_called()
+
 
 @mark.usefixtures("organisation_repository", "data_service_repository", "endpoint_repository")
 class TestDataServiceRepository:
@@ -408,6 +705,65 @@ class TestDataServiceRepository:
         assert result[0].id == target_data_service_0.id
         assert result[1].id == target_data_service_1.id
 
+    def test_find_all_by_organisations_returns_data_services_of_all_organisations(
+        self,
+        organisation_repository: OrganisationRepository,
+        data_service_repository: DataServiceRepository,
+        endpoint_repository: DbEndpointRepository,
+        faker: Faker,
+    ) -> None:
+        organisations = [create_organisation(organisation_repository, faker)[3] for _ in range(3)]
+        endpoint = create_endpoint(endpoint_repository, faker)[1]
+        data_services = [
+            create_data_service(data_service_repository, faker, organisation.id, endpoint.id, endpoint.id)[3]
+            for organisation in organisations
+        ]
+
+        result = data_service_repository.find_all_by_organisations([organisations[0].id, organisations[2].id])
+
+        assert [data_service.id for data_service in result] == [data_services[0].id, data_services[2].id]
+
+    def test_find_ids_by_organisation_and_external_id_returns_data_services_of_given_organisations(
+        self,
+        organisation_repository: OrganisationRepository,
+        data_service_repository: DataServiceRepository,
+        endpoint_repository: DbEndpointRepository,
+        faker: Faker,
+    ) -> None:
+        organisations = [create_organisation(organisation_repository, faker)[3] for _ in range(2)]
+        endpoint = create_endpoint(endpoint_repository, faker)[1]
+        first = create_data_service(data_service_repository, faker, organisations[0].id, endpoint.id, endpoint.id, "1")
+        create_data_service(data_service_repository, faker, organisations[1].id, endpoint.id, endpoint.id, "2")
+
+        result = data_service_repository.find_ids_by_organisation_and_external_id([organisations[0].id])
+
+        assert result == {(organisations[0].id, "1"): first[3].id}
+
+    def test_update_many_updates_given_data_services(
+        self,
+        db_session: Session,
+        organisation_repository: OrganisationRepository,
+        data_service_repository: DataServiceRepository,
+        endpoint_repository: DbEndpointRepository,
+        faker: Faker,
+    ) -> None:
+        organisation = create_organisation(organisation_repository, faker)[3]
+        endpoint = create_endpoint(endpoint_repository, faker)[1]
+        data_services = [
+            create_data_service(data_service_repository, faker, organisation.id, endpoint.id, endpoint.id, name="old")[
+                3
+            ]
+            for _ in range(2)
+        ]
+
+        data_service_repository.update_many(
+            [{"id": data_services[1].id, "name": "new", "interface_versions": json.dumps(["1.4.0"])}]
+        )
+        db_session.expire_all()
+
+        assert [data_service.name for data_service in data_services] == ["old", "new"]
+        assert data_services[1].interface_versions == json.dumps(["1.4.0"])
+
 
 @mark.usefixtures("organisation_repository", "data_service_repository", "system_role_repository", "endpoint_repository")
 class TestSystemRoleRepository:
@@ -476,6 +832,23 @@ class TestIdentifyingFeatureRepository:
 
         assert identifying_feature_repository.has_one_by_import_ref(import_ref)
 
+    def test_create_many_stores_identifying_features(
+        self,
+        organisation_repository: OrganisationRepository,
+        identifying_feature_repository: IdentifyingFeatureRepository,
+        faker: Faker,
+    ) -> None:
+        organisation = create_organisation(organisation_repository, faker)[3]
+        rows = [
+            {"organisation_id": organisation.id, "type": type, "value": value, "import_ref": "1620148431000013"}
+            for type, value in [(IdentifyingFeatureType.AGB, "1"), (IdentifyingFeatureType.URA, "2")]
+        ]
+
+        ids = identifying_feature_repository.create_many(rows)
+
+        assert len(ids) == 2
+        assert organisation_repository.find_one_by_identifying_feature(IdentifyingFeatureType.URA, "2") == organisation
+
     def test_import_ref_exists_returns_false_when_non_existing(
         self,
         organisation_repository: OrganisationRepository,
@@ -535,3 +908,16 @@ class TestDbEndpointRepository:
         results = endpoint_repository.find_all()
 
         assert len(results) == 3
+
+    def test_find_ids_by_url_returns_ids_of_all_endpoints(
+        self, endpoint_repository: DbEndpointRepository, faker: Faker
+    ) -> None:
+        first = create_endpoint(endpoint_repository, faker, "foo")[1]
+        second = create_endpoint(endpoint_repository, faker, "bar")[1]
+
+        assert endpoint_repository.find_ids_by_url() == {"foo": first.id, "bar": second.id}
+
+    def test_create_many_returns_ids_by_url(self, endpoint_repository: DbEndpointRepository) -> None:
+        ids = endpoint_repository.create_many(["foo", "bar"])
+
+        assert ids == endpoint_repository.find_ids_by_url()
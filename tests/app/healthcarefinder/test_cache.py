@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from app.healthcarefinder.cache import SearchResponseCache
+from app.healthcarefinder.models import SearchRequest, SearchResponse
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingLoader:
+    def __init__(self, response: SearchResponse | None = None) -> None:
+        self.calls = 0
+        self.response = response if response is not None else SearchResponse()
+
+    async def __call__(self) -> SearchResponse | None:
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.response
+
+
+def test_create_key_normalizes_search_request() -> None:
+    key = SearchResponseCache.create_key(SearchRequest(name=" Huisarts  de Vries", city="AMSTERDAM"))
+
+    assert key == SearchResponseCache.create_key(SearchRequest(name="huisarts de vries", city="Amsterdam", kvk=""))
+    assert key != SearchResponseCache.create_key(SearchRequest(name="huisarts", city="Amsterdam"))
+
+
+def test_create_key_compares_identifiers_exactly() -> None:
+    key = SearchResponseCache.create_key(SearchRequest(medmij_name="Huisarts@medmij"))
+
+    assert key != SearchResponseCache.create_key(SearchRequest(medmij_name="huisarts@medmij"))
+    assert key == SearchResponseCache.create_key(SearchRequest(medmij_name=" Huisarts@medmij "))
+
+
+@pytest.mark.asyncio
+async def test_fresh_response_is_served_from_cache() -> None:
+    clock = FakeClock()
+    cache = SearchResponseCache(max_entries=10, ttl_seconds=60, clock=clock)
+    loader = CountingLoader()
+    search = SearchRequest(city="Amsterdam", name="huisarts")
+
+    first = await cache.get_or_load(search, loader)
+    clock.now = 59
+    second = await cache.get_or_load(search, loader)
+
+    assert first is second is loader.response
+    assert loader.calls == 1
+    assert cache.stats().hit_ratio == 0.5
+
+    clock.now = 60
+    await cache.get_or_load(search, loader)
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_response_is_served_while_revalidating() -> None:
+    clock = FakeClock()
+    cache = SearchResponseCache(max_entries=10, ttl_seconds=60, stale_seconds=30, clock=clock)
+    search = SearchRequest(text="huisarts")
+    old = CountingLoader()
+    await cache.get_or_load(search, old)
+
+    clock.now = 70
+    new = CountingLoader(SearchResponse(organizations=[]))
+    assert await cache.get_or_load(search, new) is old.response
+    assert await cache.get_or_load(search, new) is old.response
+
+    await asyncio.sleep(0.01)
+
+    assert new.calls == 1
+    assert await cache.get_or_load(search, new) is new.response
+    assert cache.stats().stale_hits == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load() -> None:
+    cache = SearchResponseCache(max_entries=10, ttl_seconds=60)
+    loader = CountingLoader()
+    search = SearchRequest(ura="123")
+
+    responses = await asyncio.gather(*(cache.get_or_load(search, loader) for _ in range(5)))
+
+    assert all(response is loader.response for response in responses)
+    assert loader.calls == 1
+    assert cache.stats().coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_response_is_evicted() -> None:
+    cache = SearchResponseCache(max_entries=2, ttl_seconds=60)
+    loader = CountingLoader()
+
+    for ura in ["1", "2", "1", "3"]:
+        await cache.get_or_load(SearchRequest(ura=ura), loader)
+
+    assert len(cache) == 2
+    assert cache.stats().evictions == 1
+
+    await cache.get_or_load(SearchRequest(ura="1"), loader)
+    assert loader.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_and_empty_responses_are_not_cached() -> None:
+    cache = SearchResponseCache(max_entries=10, ttl_seconds=60)
+    search = SearchRequest(ura="123")
+
+    async def failing_loader() -> SearchResponse | None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load(search, failing_loader)
+
+    empty = CountingLoader()
+    empty.response = None  # type: ignore[assignment]
+    assert await cache.get_or_load(search, empty) is None
+    assert await cache.get_or_load(search, empty) is None
+    assert empty.calls == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_zero_max_entries_disables_cache() -> None:
+    cache = SearchResponseCache(max_entries=0, ttl_seconds=60)
+    loader = CountingLoader()
+    search = SearchRequest(ura="123")
+
+    await cache.get_or_load(search, loader)
+    await cache.get_or_load(search, loader)
+
+    assert loader.calls == 2
+    assert len(cache) == 0
@@ -6,7 +6,8 @@ from app.config.models import HealthcareAdapterType
 from app.exceptions.config_exception import ConfigException
 from app.healthcarefinder.factory import HealthcareFinderAdapterFactory
 from app.healthcarefinder.mock.adapter import MockHealthcareFinderAdapter
-from app.healthcarefinder.zorgab.zorgab import ZorgABAdapter
+from app.healthcarefinder.threaded import ThreadedHealthcareFinderAdapter
+from app.healthcarefinder.zorgab.zorgab import AsyncZorgABAdapter, ZorgABAdapter
 from app.healthcarefinder.zorgab_mock.zorgab_mock import ZorgABMockHydrationAdapter
 from tests.utils import configure_bindings
 
@@ -39,6 +40,26 @@ class TestFactory:
 
         assert isinstance(adapter, expected)
 
+    @pytest.mark.parametrize(
+        "adapter_type, expected",
+        [
+            (HealthcareAdapterType.zorgab, AsyncZorgABAdapter),
+            (HealthcareAdapterType.mock_zorgab_hydrated, ThreadedHealthcareFinderAdapter),
+            (HealthcareAdapterType.mock, ThreadedHealthcareFinderAdapter),
+        ],
+    )
+    def test_returns_correct_async_healthcare_adapter(
+        self,
+        adapter_type: HealthcareAdapterType,
+        expected: type[object],
+        mocker: MockerFixture,
+    ) -> None:
+        configure_bindings(lambda binder: binder.bind(AddressingService, mocker.Mock(AddressingService)))
+
+        adapter = HealthcareFinderAdapterFactory().create_async(adapter_type)
+
+        assert isinstance(adapter, expected)
+
     def test_throws_config_exception_for_invalid_adapter_type(self, mocker: MockerFixture) -> None:
         mock_addressing_service = mocker.Mock(AddressingService)
         configure_bindings(
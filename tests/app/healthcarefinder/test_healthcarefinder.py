@@ -1,10 +1,12 @@
 import pytest
 from pytest_mock import MockerFixture
 
+from app.healthcarefinder.cache import SearchResponseCache
 from app.healthcarefinder.healthcarefinder import HealthcareFinder
-from app.healthcarefinder.interface import HealthcareFinderAdapter
+from app.healthcarefinder.interface import AsyncHealthcareFinderAdapter
 from app.healthcarefinder.mock.adapter import MockHealthcareFinderAdapter
-from app.healthcarefinder.models import SearchRequest, SearchResponse
+from app.healthcarefinder.models import CType, Organization, SearchRequest, SearchResponse
+from app.healthcarefinder.threaded import iterate_organizations
 
 
 @pytest.fixture
@@ -12,39 +14,39 @@ def mock_healthcarefinder_adapter(mocker: MockerFixture) -> MockHealthcareFinder
     return mocker.patch("app.healthcarefinder.mock.adapter.MockHealthcareFinderAdapter")
 
 
-def test_search_organizations_bypass(
+@pytest.mark.asyncio
+async def test_search_organizations_bypass(
     mocker: MockerFixture,
 ) -> None:
     mock_healthcarefinder_adapter = mocker.Mock(MockHealthcareFinderAdapter)
     mock_healthcarefinder_adapter.search_organizations.return_value = SearchResponse()
-    healthcare_finder_adapter_mock: HealthcareFinderAdapter = mocker.Mock(spec=HealthcareFinderAdapter)
+    healthcare_finder_adapter_mock: AsyncHealthcareFinderAdapter = mocker.AsyncMock(spec=AsyncHealthcareFinderAdapter)
     finder = HealthcareFinder(
         adapter=healthcare_finder_adapter_mock, mock_adapter=mock_healthcarefinder_adapter, allow_search_bypass=True
     )
     search_request = SearchRequest(name="test", city="test")
-    response: SearchResponse | None = finder.search_organizations(search=search_request)
+    response: SearchResponse | None = await finder.search_organizations(search=search_request)
 
     mock_healthcarefinder_adapter.search_organizations.assert_called_once_with(search=search_request)
     assert isinstance(response, SearchResponse)
 
 
-def test_search_organizations_no_bypass(mocker: MockerFixture) -> None:
-    mock_adapter: HealthcareFinderAdapter = mocker.Mock(spec=HealthcareFinderAdapter)
+@pytest.mark.asyncio
+async def test_search_organizations_no_bypass(mocker: MockerFixture) -> None:
+    mock_adapter = mocker.AsyncMock(spec=AsyncHealthcareFinderAdapter)
+    mock_adapter.search_organizations.return_value = SearchResponse()
 
     finder = HealthcareFinder(adapter=mock_adapter, allow_search_bypass=False)
     search_request = SearchRequest(name="not_test", city="not_test")
 
-    # Mock the search_organizations method of HealthcareFinderAdapter
-    mock_search_organizations = mocker.patch.object(mock_adapter, "search_organizations", return_value=SearchResponse())
+    response: SearchResponse | None = await finder.search_organizations(search=search_request)
 
-    response: SearchResponse | None = finder.search_organizations(search=search_request)
-
-    mock_search_organizations.assert_called_once_with(search=search_request)
+    mock_adapter.search_organizations.assert_awaited_once_with(search=search_request)
     assert isinstance(response, SearchResponse)
 
 
 def test_is_search_bypass_requested(mocker: MockerFixture) -> None:
-    mock_adapter: HealthcareFinderAdapter = mocker.Mock(spec=HealthcareFinderAdapter)
+    mock_adapter: AsyncHealthcareFinderAdapter = mocker.AsyncMock(spec=AsyncHealthcareFinderAdapter)
     finder = HealthcareFinder(adapter=mock_adapter)
 
     search_request = SearchRequest(name="test", city="test")
@@ -52,3 +54,55 @@ def test_is_search_bypass_requested(mocker: MockerFixture) -> None:
 
     search_request = SearchRequest(name="not_test", city="not_test")
     assert not finder._HealthcareFinder__is_search_bypass_requested(search=search_request)
+
+
+@pytest.mark.asyncio
+async def test_search_organizations_uses_response_cache(mocker: MockerFixture) -> None:
+    mock_adapter = mocker.AsyncMock(spec=AsyncHealthcareFinderAdapter)
+    mock_adapter.search_organizations.return_value = SearchResponse()
+
+    finder = HealthcareFinder(
+        adapter=mock_adapter,
+        mock_adapter=mocker.Mock(MockHealthcareFinderAdapter),
+        response_cache=SearchResponseCache(max_entries=10, ttl_seconds=60),
+    )
+
+    first = await finder.search_organizations(search=SearchRequest(name="Huisarts", city="Amsterdam"))
+    second = await finder.search_organizations(search=SearchRequest(name="huisarts", city="amsterdam"))
+
+    assert first is second
+    mock_adapter.search_organizations.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_organizations_bypass(mocker: MockerFixture) -> None:
+    organization = Organization(
+        medmij_id=None,
+        display_name="Test",
+        identification="agb:1",
+        types=[CType(code="1", display_name="Test", type="test")],
+    )
+    mock_adapter = mocker.Mock(MockHealthcareFinderAdapter)
+    mock_adapter.search_organizations.return_value = SearchResponse(organizations=[organization])
+    adapter = mocker.AsyncMock(spec=AsyncHealthcareFinderAdapter)
+    finder = HealthcareFinder(adapter=adapter, mock_adapter=mock_adapter, allow_search_bypass=True)
+
+    organizations = await finder.stream_organizations(SearchRequest(name="test", city="test"))
+
+    assert [streamed async for streamed in organizations] == [organization]
+    adapter.stream_organizations.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_organizations_no_bypass(mocker: MockerFixture) -> None:
+    adapter = mocker.AsyncMock(spec=AsyncHealthcareFinderAdapter)
+    adapter.stream_organizations.return_value = iterate_organizations(None)
+    finder = HealthcareFinder(
+        adapter=adapter, mock_adapter=mocker.Mock(MockHealthcareFinderAdapter), allow_search_bypass=False
+    )
+    search_request = SearchRequest(name="not_test", city="not_test")
+
+    organizations = await finder.stream_organizations(search_request)
+
+    assert [streamed async for streamed in organizations] == []
+    adapter.stream_organizations.assert_awaited_once_with(search=search_request)
@@ -8,7 +8,12 @@ from pytest_mock import MockerFixture
 
 from app.addressing.addressing_service import AddressingService
 from app.addressing.mock.mock_adapter import AddressingMockAdapter
-from app.addressing.models import ZalDataServiceResponse, ZalSearchResponseEntry
+from app.addressing.models import (
+    IdentificationType,
+    ZalDataServiceResponse,
+    ZalSearchRequestEntry,
+    ZalSearchResponseEntry,
+)
 from app.fhir_uris import FHIR_NAMINGSYSTEM_AGB_Z, FHIR_NAMINGSYSTEM_URA
 from app.healthcarefinder.models import Organization as LoadOrganization
 from app.healthcarefinder.zorgab.hydration_service import HydrationService
@@ -353,3 +358,85 @@ def test_get_organization_identifier_falls_back_to_ura(mocker: MockerFixture) ->
     assert identification == "ura:90000382"
     addressing_service.search_by_agb.assert_called_once_with("71025100")
     addressing_service.search_by_ura.assert_called_once_with("90000382")
+
+
+def test_search_addressing_looks_up_all_identifiers_at_once(mocker: MockerFixture) -> None:
+    fhir_organizations = [
+        FhirOrganization.model_validate(
+            {
+                "id": "f001",
+                "identifier": [
+                    {"system": FHIR_NAMINGSYSTEM_AGB_Z, "value": "71025100"},
+                    {"system": FHIR_NAMINGSYSTEM_URA, "value": "90000382"},
+                ],
+            }
+        ),
+        FhirOrganization.model_validate(
+            {"id": "f002", "identifier": [{"system": FHIR_NAMINGSYSTEM_URA, "value": "1"}]}
+        ),
+        FhirOrganization.model_validate({"id": "f003"}),
+    ]
+    addressing_service = mocker.Mock(AddressingService)
+    hydration_service = HydrationService(addressing_service=addressing_service, logger=mocker.Mock(spec=Logger))
+
+    result = hydration_service.search_addressing(fhir_organizations)
+
+    assert result is addressing_service.search_many.return_value
+    addressing_service.search_many.assert_called_once_with(
+        {
+            ZalSearchRequestEntry(id_type=IdentificationType.agbz, id_value="71025100"),
+            ZalSearchRequestEntry(id_type=IdentificationType.ura, id_value="90000382"),
+            ZalSearchRequestEntry(id_type=IdentificationType.ura, id_value="1"),
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_addressing_async_looks_up_all_identifiers_at_once(mocker: MockerFixture) -> None:
+    fhir_organizations = [
+        FhirOrganization.model_validate(
+            {"id": "f001", "identifier": [{"system": FHIR_NAMINGSYSTEM_AGB_Z, "value": "71025100"}]}
+        ),
+        FhirOrganization.model_validate({"id": "f002"}),
+    ]
+    addressing_service = mocker.Mock(AddressingService)
+    hydration_service = HydrationService(addressing_service=addressing_service, logger=mocker.Mock(spec=Logger))
+
+    result = await hydration_service.search_addressing_async(fhir_organizations)
+
+    assert result is addressing_service.search_many_async.return_value
+    addressing_service.search_many_async.assert_awaited_once_with(
+        {ZalSearchRequestEntry(id_type=IdentificationType.agbz, id_value="71025100")}
+    )
+    addressing_service.search_many.assert_not_called()
+
+
+def test_get_organization_identifier_uses_prefetched_addressing_entries(mocker: MockerFixture) -> None:
+    fhir_organization = FhirOrganization.model_validate(
+        {
+            "id": "f001",
+            "identifier": [
+                {"system": FHIR_NAMINGSYSTEM_AGB_Z, "value": "71025100"},
+                {"system": FHIR_NAMINGSYSTEM_URA, "value": "90000382"},
+            ],
+        }
+    )
+    ura_entry = ZalSearchResponseEntry(
+        medmij_id="ura@medmij",
+        dataservices=[],
+        organization_type="test_type",
+        id_type="ura",
+        id_value="90000382",
+    )
+    addressing_service = mocker.Mock(AddressingService)
+    hydration_service = HydrationService(addressing_service=addressing_service, logger=mocker.Mock(spec=Logger))
+
+    data_service_entry, identification = hydration_service._get_organization_identifier(
+        fhir_organization,
+        {ZalSearchRequestEntry(id_type=IdentificationType.ura, id_value="90000382"): ura_entry},
+    )
+
+    assert data_service_entry == ura_entry
+    assert identification == "ura:90000382"
+    addressing_service.search_by_agb.assert_not_called()
+    addressing_service.search_by_ura.assert_not_called()
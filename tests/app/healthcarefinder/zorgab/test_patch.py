@@ -81,3 +81,26 @@ class TestTimestampPatcher:
 
         TimestampPatcher.patch(data)
         assert data == expected
+
+    def test_patcher_patches_timestamps_in_lists(self) -> None:
+        data = ["2025-10-29T12:01:25", "2025-10-29T12:01:25+01:00", ["2025-10-29T12:01:25.1"]]
+        expected = ["2025-10-29T12:01:25Z", "2025-10-29T12:01:25+01:00", ["2025-10-29T12:01:25.1Z"]]
+        assert TimestampPatcher.patch(data) == expected
+
+    def test_patcher_patches_top_level_timestamp(self) -> None:
+        assert TimestampPatcher.patch("2025-10-29T12:01:25.586") == "2025-10-29T12:01:25.586Z"
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "2025-10-29",
+            "2025-10-29 12:01:25.586",
+            "abcd-ef-ghTij:kl:mn",
+            "2025-10-29T12:01:25.586 ",
+            "Teststraat 1 Utrecht",
+        ],
+    )
+    def test_patcher_leaves_timestamp_like_strings_unchanged(self, value: str) -> None:
+        data = {"value": value}
+        TimestampPatcher.patch(data)
+        assert data == {"value": value}
@@ -0,0 +1,79 @@
+from typing import Any
+
+import pytest
+from fhir.resources.STU3.organization import Organization as FhirOrganization
+
+from app.healthcarefinder.zorgab.records import (
+    AddressRecord,
+    CodingRecord,
+    IdentifierRecord,
+    OrganizationRecord,
+    as_organization_record,
+)
+
+RESOURCE: dict[str, Any] = {  # type: ignore[explicit-any]
+    "resourceType": "Organization",
+    "id": "org-1",
+    "name": "Test Organization",
+    "identifier": [
+        {"system": "http://fhir.nl/fhir/NamingSystem/agb-z", "value": "12345678"},
+        {"system": "http://fhir.nl/fhir/NamingSystem/ura"},
+    ],
+    "type": [
+        {"coding": [{"code": "Z3", "display": "Huisartspraktijk", "system": "http://example.org/types"}]},
+        {"text": "type without coding"},
+    ],
+    "address": [
+        {
+            "line": ["Teststraat 1"],
+            "city": "Utrecht",
+            "postalCode": "3500 AA",
+        }
+    ],
+}
+
+
+class TestOrganizationRecord:
+    def test_from_json_reads_the_fields_used_for_hydration(self) -> None:
+        record = OrganizationRecord.from_json(RESOURCE)
+
+        assert record == OrganizationRecord(
+            id="org-1",
+            name="Test Organization",
+            identifiers=(IdentifierRecord(system="http://fhir.nl/fhir/NamingSystem/agb-z", value="12345678"),),
+            types=(CodingRecord(code="Z3", display="Huisartspraktijk", system="http://example.org/types"),),
+            addresses=(
+                AddressRecord(
+                    text=None,
+                    lines=("Teststraat 1",),
+                    city="Utrecht",
+                    country=None,
+                    postal_code="3500 AA",
+                    latitude=None,
+                    longitude=None,
+                ),
+            ),
+        )
+
+    def test_from_json_and_from_fhir_build_the_same_record(self) -> None:
+        fhir_organization = FhirOrganization.model_validate(RESOURCE)
+
+        assert OrganizationRecord.from_json(RESOURCE) == OrganizationRecord.from_fhir(fhir_organization)
+        assert as_organization_record(fhir_organization) == OrganizationRecord.from_json(RESOURCE)
+
+    def test_from_json_rejects_other_resource_types(self) -> None:
+        with pytest.raises(ValueError):
+            OrganizationRecord.from_json({"resourceType": "Practitioner", "id": "p-1"})
+
+    @pytest.mark.parametrize(
+        "resource",
+        [
+            None,
+            {"resourceType": "Organization", "name": 42},
+            {"resourceType": "Organization", "identifier": {"system": "a", "value": "b"}},
+            {"resourceType": "Organization", "address": ["not an object"]},
+        ],
+    )
+    def test_from_json_rejects_malformed_resources(self, resource: Any) -> None:  # type: ignore[explicit-any]
+        with pytest.raises(ValueError):
+            OrganizationRecord.from_json(resource)
@@ -1,6 +1,7 @@
 from logging import Logger
 from typing import Any
 
+import orjson
 import pytest
 import requests
 from pydantic import ValidationError
@@ -47,6 +48,7 @@ class TestZorgABAdapter:
             hydration_service=hydration_service,
             logger=logger,
             suppress_hydration_errors=False,
+            strict_fhir_validation=True,
         )
 
         fake_response = mocker.Mock(spec=Response)
@@ -76,7 +78,7 @@ class TestZorgABAdapter:
 
         fake_response = mocker.Mock(spec=Response)
         fake_response.status_code = 200
-        fake_response.json.return_value = self.__bundle_data()
+        fake_response.content = orjson.dumps(self.__bundle_data())
         mocker.patch.object(requests.Session, "get", return_value=fake_response)
 
         request = SearchRequest(name="huisarts", city="Amsterdam")
@@ -104,7 +106,7 @@ class TestZorgABAdapter:
 
         fake_response = mocker.Mock(spec=Response)
         fake_response.status_code = 200
-        fake_response.json.return_value = self.__bundle_data()
+        fake_response.content = orjson.dumps(self.__bundle_data())
         mocker.patch.object(requests.Session, "get", return_value=fake_response)
 
         request = SearchRequest(name="huisarts", city="Amsterdam")
@@ -130,7 +132,7 @@ class TestZorgABAdapter:
 
         fake_response = mocker.Mock(spec=Response)
         fake_response.status_code = 200
-        fake_response.json.return_value = invalid_bundle_data
+        fake_response.content = orjson.dumps(invalid_bundle_data)
         mocker.patch.object(requests.Session, "get", return_value=fake_response)
 
         request = SearchRequest(name="huisarts", city="Amsterdam")
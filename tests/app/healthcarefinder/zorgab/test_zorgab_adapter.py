@@ -1,17 +1,24 @@
+import asyncio
+import threading
 from logging import Logger
 from types import SimpleNamespace
-from typing import Any, cast
+from typing import Any, Callable, cast
 
+import httpx
+import orjson
 import pytest
+import requests
 from fhir.resources.STU3.bundle import BundleEntry
 from pytest_mock import MockerFixture
 from requests.models import Response
 
 from app.addressing.addressing_service import AddressingService
+from app.addressing.models import ZalSearchRequestEntry
 from app.fhir_uris import FHIR_NAMINGSYSTEM_AGB_Z, FHIR_STRUCTUREDEFINITION_GEOLOCATION
 from app.healthcarefinder.models import SearchRequest
+from app.healthcarefinder.zorgab.cache import PartOfOrganizationCache, ZorgABSearchSingleFlight
 from app.healthcarefinder.zorgab.hydration_service import HydrationService
-from app.healthcarefinder.zorgab.zorgab import ZorgABAdapter
+from app.healthcarefinder.zorgab.zorgab import ApiError, AsyncZorgABAdapter, BadSearchParams, ZorgABAdapter
 
 
 def get_address() -> list[dict[str, Any]]:  # type: ignore[explicit-any]
@@ -103,13 +110,13 @@ def test_search_organizations(
 ) -> None:
     mock_response = mocker.Mock(spec=Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = create_bundle_json
+    mock_response.content = orjson.dumps(create_bundle_json)
 
     mock_get = mocker.patch("requests.Session.get")
     mock_get.return_value = mock_response
 
     addressing_service = mocker.Mock(spec=AddressingService)
-    addressing_service.search_by_agb.return_value = None
+    addressing_service.search_many.return_value = {}
 
     adapter = ZorgABAdapter(
         base_url="https://example.com",
@@ -130,6 +137,73 @@ def test_search_organizations(
     )
 
 
+def test_search_organizations_lean_parsing_matches_strict_validation(
+    mocker: MockerFixture,
+    create_bundle_json: dict[str, object],
+) -> None:
+    mock_response = mocker.Mock(spec=Response)
+    mock_response.status_code = 200
+    mock_response.json.side_effect = lambda: orjson.loads(orjson.dumps(create_bundle_json))
+    mock_response.content = orjson.dumps(create_bundle_json)
+    mocker.patch("requests.Session.get", return_value=mock_response)
+
+    addressing_service = mocker.Mock(spec=AddressingService)
+    addressing_service.search_many.return_value = {}
+    hydration_service = HydrationService(
+        addressing_service=cast(AddressingService, addressing_service), logger=mocker.Mock(spec=Logger)
+    )
+
+    responses = [
+        ZorgABAdapter(
+            base_url="https://example.com",
+            hydration_service=hydration_service,
+            logger=mocker.Mock(Logger),
+            suppress_hydration_errors=False,
+            strict_fhir_validation=strict_fhir_validation,
+        ).search_organizations(SearchRequest(name="foo", city="bar"))
+        for strict_fhir_validation in (False, True)
+    ]
+
+    assert responses[0] is not None
+    assert responses[0].organizations[0].display_name == "Acme Corporation"
+    assert responses[0] == responses[1]
+
+
+def test_search_organizations_lean_parsing_skips_invalid_entries_when_suppressed(mocker: MockerFixture) -> None:
+    bundle = {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "total": 3,
+        "entry": [
+            {"resource": {"resourceType": "Organization", "id": "valid", "name": "Valid"}},
+            {"resource": {"resourceType": "Organization", "id": "broken", "identifier": "not-a-list"}},
+            {"resource": {"resourceType": "Organization", "name": "Without id"}},
+        ],
+    }
+    mock_response = mocker.Mock(spec=Response)
+    mock_response.status_code = 200
+    mock_response.content = orjson.dumps(bundle)
+    mocker.patch("requests.Session.get", return_value=mock_response)
+
+    addressing_service = mocker.Mock(spec=AddressingService)
+    addressing_service.search_many.return_value = {}
+    logger = mocker.Mock(Logger)
+    adapter = ZorgABAdapter(
+        base_url="https://example.com",
+        hydration_service=HydrationService(
+            addressing_service=cast(AddressingService, addressing_service), logger=mocker.Mock(spec=Logger)
+        ),
+        logger=logger,
+        suppress_hydration_errors=True,
+    )
+
+    response = adapter.search_organizations(SearchRequest(name="foo", city="bar"))
+
+    assert response is not None
+    assert [organization.display_name for organization in response.organizations] == ["Valid"]
+    logger.warning.assert_any_call("Skipping organization without ID")
+
+
 def test_verify_connection_success(mocker: MockerFixture) -> None:
     adapter = ZorgABAdapter(
         base_url="https://example.com/",
@@ -193,6 +267,7 @@ def test_search_organizations_hydration_error_bubbles_when_not_suppressed(mocker
         hydration_service=hydration_service,
         logger=mocker.Mock(Logger),
         suppress_hydration_errors=False,
+        strict_fhir_validation=True,
     )
 
     response = mocker.Mock()
@@ -225,7 +300,7 @@ def test_search_organizations_raw_fhir_returns_bundle_entries(
     mock_get.return_value = mock_response
 
     addressing_service = mocker.Mock(spec=AddressingService)
-    addressing_service.search_by_agb.return_value = None
+    addressing_service.search_many.return_value = {}
 
     adapter = ZorgABAdapter(
         base_url="https://example.com",
@@ -244,3 +319,383 @@ def test_search_organizations_raw_fhir_returns_bundle_entries(
     assert result.entry is not None
     entry = BundleEntry.model_validate(result.entry[0])
     assert entry.fullUrl == "https://example.com/fhir/Organization/f001"
+
+
+def create_async_adapter(  # type: ignore[explicit-any]
+    mocker: MockerFixture,
+    handler: Callable[[httpx.Request], httpx.Response],
+    strict_fhir_validation: bool = False,
+    addressing_service: Any | None = None,
+    search_single_flight: ZorgABSearchSingleFlight | None = None,
+) -> AsyncZorgABAdapter:
+    if addressing_service is None:
+        addressing_service = mocker.Mock(spec=AddressingService)
+        addressing_service.search_many_async.return_value = {}
+
+    return AsyncZorgABAdapter(
+        base_url="https://example.com/",
+        hydration_service=HydrationService(
+            addressing_service=cast(AddressingService, addressing_service),
+            logger=mocker.Mock(spec=Logger),
+        ),
+        logger=mocker.Mock(Logger),
+        suppress_hydration_errors=False,
+        transport=httpx.MockTransport(handler),
+        strict_fhir_validation=strict_fhir_validation,
+        search_single_flight=search_single_flight,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strict_fhir_validation", [False, True])
+async def test_async_search_organizations(
+    mocker: MockerFixture, create_bundle_json: dict[str, object], strict_fhir_validation: bool
+) -> None:
+    requests_seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return httpx.Response(200, json=create_bundle_json)
+
+    addressing_service = mocker.Mock(spec=AddressingService)
+    addressing_service.search_many_async.return_value = {}
+    adapter = create_async_adapter(mocker, handler, strict_fhir_validation, addressing_service)
+
+    response = await adapter.search_organizations(SearchRequest(name="foo", city="bar"))
+    await adapter.aclose()
+
+    assert response is not None
+    assert [organization.display_name for organization in response.organizations] == ["Acme Corporation"]
+    addressing_service.search_many_async.assert_awaited_once()
+    addressing_service.search_many.assert_not_called()
+    assert len(requests_seen) == 1
+    assert str(requests_seen[0].url) == "https://example.com/fhir/Organization?name=foo&address-city=bar"
+    assert requests_seen[0].headers["Accept"] == "application/fhir+json"
+
+
+@pytest.mark.asyncio
+async def test_async_search_organizations_reuses_client(
+    mocker: MockerFixture, create_bundle_json: dict[str, object]
+) -> None:
+    adapter = create_async_adapter(mocker, lambda _: httpx.Response(200, json=create_bundle_json))
+
+    await adapter.search_organizations(SearchRequest(name="foo", city="bar"))
+    client = cast(Any, adapter)._AsyncZorgABAdapter__client  # type: ignore[explicit-any]
+    await adapter.search_organizations(SearchRequest(name="foo", city="bar"))
+
+    assert cast(Any, adapter)._AsyncZorgABAdapter__client is client  # type: ignore[explicit-any]
+
+    await adapter.aclose()
+    assert cast(Any, adapter)._AsyncZorgABAdapter__client is None  # type: ignore[explicit-any]
+
+
+@pytest.mark.asyncio
+async def test_async_search_organizations_raises_api_error_on_status(mocker: MockerFixture) -> None:
+    adapter = create_async_adapter(mocker, lambda _: httpx.Response(503))
+
+    with pytest.raises(ApiError):
+        await adapter.search_organizations(SearchRequest(name="foo", city="bar"))
+
+
+@pytest.mark.asyncio
+async def test_async_search_organizations_raises_api_error_on_transport_error(mocker: MockerFixture) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("boom", request=request)
+
+    adapter = create_async_adapter(mocker, handler)
+
+    with pytest.raises(ApiError):
+        await adapter.search_organizations(SearchRequest(name="foo", city="bar"))
+
+
+@pytest.mark.asyncio
+async def test_async_search_organizations_raises_bad_search_params(mocker: MockerFixture) -> None:
+    adapter = create_async_adapter(mocker, lambda _: httpx.Response(200))
+
+    with pytest.raises(BadSearchParams):
+        await adapter.search_organizations(SearchRequest.model_construct(name="", city="bar"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strict_fhir_validation", [False, True])
+async def test_async_search_organizations_coalesces_identical_searches(
+    mocker: MockerFixture, create_bundle_json: dict[str, object], strict_fhir_validation: bool
+) -> None:
+    requests_seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return httpx.Response(200, json=create_bundle_json)
+
+    search_single_flight = ZorgABSearchSingleFlight()
+    adapter = create_async_adapter(mocker, handler, strict_fhir_validation, search_single_flight=search_single_flight)
+
+    responses = await asyncio.gather(
+        adapter.search_organizations(SearchRequest(text="foo")),
+        adapter.search_organizations(SearchRequest(text="foo")),
+        adapter.search_organizations(SearchRequest(text="bar")),
+    )
+    await adapter.aclose()
+
+    assert [len(response.organizations) for response in responses if response is not None] == [1, 1, 1]
+    assert sorted(str(request.url) for request in requests_seen) == [
+        "https://example.com/fhir/Organization?_text=bar",
+        "https://example.com/fhir/Organization?_text=foo",
+    ]
+    assert search_single_flight.stats().calls == 2
+    assert search_single_flight.stats().coalesced == 1
+
+
+def test_search_organizations_raw_fhir_does_not_change_coalesced_bundle(
+    mocker: MockerFixture, create_bundle_json: dict[str, object]
+) -> None:
+    mock_response = mocker.Mock(spec=Response)
+    mock_response.status_code = 200
+    mock_response.json.return_value = create_bundle_json
+    mocker.patch("requests.Session.get", return_value=mock_response)
+
+    search_single_flight = mocker.Mock(spec=ZorgABSearchSingleFlight)
+    shared_bundles = []
+
+    def do(key: tuple[str, str], fn: Callable[[], Any]) -> Any:  # type: ignore[explicit-any]
+        shared_bundles.append(fn())
+        return shared_bundles[-1]
+
+    search_single_flight.do.side_effect = do
+    adapter = ZorgABAdapter(
+        base_url="https://example.com",
+        hydration_service=mocker.Mock(spec=HydrationService),
+        logger=mocker.Mock(Logger),
+        suppress_hydration_errors=False,
+        search_single_flight=search_single_flight,
+    )
+
+    bundle = adapter.search_organizations_raw_fhir(SearchRequest(text="foo"))
+
+    assert bundle is not None and bundle.entry is not None
+    assert bundle.entry[0].fullUrl == "https://example.com/fhir/Organization/f001"
+    search_single_flight.do.assert_called_once()
+    assert search_single_flight.do.call_args.args[0] == ("strict", "_text=foo")
+    assert shared_bundles[0].entry[0].fullUrl is None
+
+
+def create_stream_bundle_json(agb_values: list[str]) -> dict[str, object]:
+    entries = []
+    for agb_value in agb_values:
+        organization = create_organization_json()
+        organization["id"] = f"org-{agb_value}"
+        organization["name"] = f"Organization {agb_value}"
+        organization["identifier"] = [{"system": FHIR_NAMINGSYSTEM_AGB_Z, "value": agb_value}]
+        entries.append({"resource": organization})
+
+    return {"resourceType": "Bundle", "type": "searchset", "entry": entries, "total": len(entries)}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strict_fhir_validation", [False, True])
+async def test_async_stream_organizations_yields_hydrated_organizations(
+    mocker: MockerFixture, strict_fhir_validation: bool
+) -> None:
+    addressing_service = mocker.Mock(spec=AddressingService)
+    addressing_service.search_many_async.return_value = {}
+    adapter = create_async_adapter(
+        mocker,
+        lambda _: httpx.Response(200, json=create_stream_bundle_json(["1", "2", "3"])),
+        strict_fhir_validation,
+        addressing_service,
+    )
+
+    organizations = [
+        organization async for organization in await adapter.stream_organizations(SearchRequest(text="foo"))
+    ]
+    await adapter.aclose()
+
+    assert sorted(organization.display_name or "" for organization in organizations) == [
+        "Organization 1",
+        "Organization 2",
+        "Organization 3",
+    ]
+    assert sorted(
+        request.id_value for call in addressing_service.search_many_async.await_args_list for request in call.args[0]
+    ) == ["1", "2", "3"]
+    addressing_service.search_many.assert_not_called()
+    addressing_service.search_by_agb.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_async_stream_organizations_yields_organizations_as_soon_as_they_are_hydrated(
+    mocker: MockerFixture,
+) -> None:
+    second_organization_received = asyncio.Event()
+
+    async def search_many_async(requests: set[ZalSearchRequestEntry]) -> dict[object, object]:
+        # The first organization can only finish after the second one was yielded by the stream
+        if any(request.id_value == "1" for request in requests):
+            await asyncio.wait_for(second_organization_received.wait(), timeout=5)
+        return {}
+
+    addressing_service = mocker.Mock(spec=AddressingService)
+    addressing_service.search_many_async.side_effect = search_many_async
+    adapter = create_async_adapter(
+        mocker,
+        lambda _: httpx.Response(200, json=create_stream_bundle_json(["1", "2"])),
+        addressing_service=addressing_service,
+    )
+
+    names = []
+    async for organization in await adapter.stream_organizations(SearchRequest(text="foo")):
+        names.append(organization.display_name)
+        second_organization_received.set()
+    await adapter.aclose()
+
+    assert names == ["Organization 2", "Organization 1"]
+
+
+@pytest.mark.asyncio
+async def test_async_stream_organizations_raises_before_streaming(mocker: MockerFixture) -> None:
+    adapter = create_async_adapter(mocker, lambda _: httpx.Response(503))
+
+    with pytest.raises(ApiError):
+        await adapter.stream_organizations(SearchRequest(name="foo", city="bar"))
+
+    with pytest.raises(BadSearchParams):
+        await adapter.stream_organizations(SearchRequest.model_construct(name="", city="bar"))
+
+
+def create_partof_bundle_json(parent_ids: list[str]) -> dict[str, object]:
+    entries = []
+    for index, parent_id in enumerate(parent_ids):
+        organization = create_organization_json()
+        organization["id"] = f"child{index}"
+        organization["partOf"] = {"reference": f"Organization/{parent_id}"}
+        entries.append({"resource": organization})
+
+    return {"resourceType": "Bundle", "type": "searchset", "entry": entries, "total": len(entries)}
+
+
+def create_partof_response(mocker: MockerFixture, url: str) -> Response:
+    parent_id = url.rsplit("/", 1)[1]
+    response: Response = mocker.Mock(spec=Response)
+
+    if parent_id == "broken":
+        response.status_code = 500
+        return response
+
+    response.status_code = 200
+    cast(Any, response).json.return_value = {  # type: ignore[explicit-any]
+        "resourceType": "Organization",
+        "id": parent_id,
+        "name": f"Parent {parent_id}",
+    }
+    return response
+
+
+@pytest.mark.parametrize("partof_fetch_workers", [1, 4])
+def test_search_organizations_raw_fhir_fetches_partof_organizations_in_deterministic_order(
+    mocker: MockerFixture,
+    partof_fetch_workers: int,
+) -> None:
+    parent_ids = ["p3", "p1", "broken", "p2"]
+    search_response: Response = mocker.Mock(spec=Response)
+    search_response.status_code = 200
+    cast(Any, search_response).json.return_value = create_partof_bundle_json(parent_ids)  # type: ignore[explicit-any]
+
+    def get(url: str, params: str | None = None) -> Response:
+        if params is not None:
+            return search_response
+        return create_partof_response(mocker, url)
+
+    mock_get = mocker.patch("requests.Session.get", side_effect=get)
+
+    adapter = ZorgABAdapter(
+        base_url="https://example.com",
+        hydration_service=mocker.Mock(),
+        logger=mocker.Mock(Logger),
+        suppress_hydration_errors=False,
+        partof_fetch_workers=partof_fetch_workers,
+    )
+
+    result = adapter.search_organizations_raw_fhir(SearchRequest(ura="123"))
+
+    assert result is not None and result.entry is not None
+    ids = [BundleEntry.model_validate(entry).fullUrl for entry in result.entry]
+    assert ids == [
+        "https://example.com/fhir/Organization/child0",
+        "https://example.com/fhir/Organization/child1",
+        "https://example.com/fhir/Organization/child2",
+        "https://example.com/fhir/Organization/child3",
+        "https://example.com/fhir/Organization/p1",
+        "https://example.com/fhir/Organization/p2",
+        "https://example.com/fhir/Organization/p3",
+    ]
+    assert mock_get.call_count == 1 + len(parent_ids)
+
+
+def test_search_organizations_raw_fhir_fetches_partof_organizations_with_a_session_per_adapter_thread(
+    mocker: MockerFixture,
+) -> None:
+    search_response: Response = mocker.Mock(spec=Response)
+    search_response.status_code = 200
+    cast(Any, search_response).json.return_value = create_partof_bundle_json(["p1", "p2", "p3", "p4"])  # type: ignore[explicit-any]
+    sessions_by_thread: dict[str, list[requests.Session]] = {}
+
+    def get(session: requests.Session, url: str, params: str | None = None) -> Response:
+        if params is not None:
+            return search_response
+        thread_sessions = sessions_by_thread.setdefault(threading.current_thread().name, [])
+        if session not in thread_sessions:
+            thread_sessions.append(session)
+        return create_partof_response(mocker, url)
+
+    mocker.patch("requests.Session.get", autospec=True, side_effect=get)
+
+    adapter = ZorgABAdapter(
+        base_url="https://example.com",
+        hydration_service=mocker.Mock(),
+        logger=mocker.Mock(Logger),
+        suppress_hydration_errors=False,
+        partof_fetch_workers=2,
+    )
+
+    for _ in range(3):
+        result = adapter.search_organizations_raw_fhir(SearchRequest(ura="123"))
+        assert result is not None and result.entry is not None and len(result.entry) == 8
+
+    # The threads of the adapter are reused by every search, each with a session of its own
+    assert 1 <= len(sessions_by_thread) <= 2
+    assert all(name.startswith("zorgab-partof") for name in sessions_by_thread)
+    assert all(len(sessions) == 1 for sessions in sessions_by_thread.values())
+    assert len({id(sessions[0]) for sessions in sessions_by_thread.values()}) == len(sessions_by_thread)
+
+
+def test_search_organizations_raw_fhir_reuses_cached_partof_organizations(mocker: MockerFixture) -> None:
+    search_response: Response = mocker.Mock(spec=Response)
+    search_response.status_code = 200
+    cast(Any, search_response).json.return_value = create_partof_bundle_json(["p1", "broken"])  # type: ignore[explicit-any]
+
+    def get(url: str, params: str | None = None) -> Response:
+        if params is not None:
+            return search_response
+        return create_partof_response(mocker, url)
+
+    mock_get = mocker.patch("requests.Session.get", side_effect=get)
+    partof_cache = PartOfOrganizationCache(max_entries=10, ttl_seconds=60)
+
+    adapter = ZorgABAdapter(
+        base_url="https://example.com",
+        hydration_service=mocker.Mock(),
+        logger=mocker.Mock(Logger),
+        suppress_hydration_errors=False,
+        partof_cache=partof_cache,
+    )
+
+    first = adapter.search_organizations_raw_fhir(SearchRequest(ura="123"))
+    second = adapter.search_organizations_raw_fhir(SearchRequest(ura="123"))
+
+    assert first is not None and first.entry is not None
+    assert second is not None and second.entry is not None
+    assert len(first.entry) == len(second.entry) == 3
+    # p1 is fetched once, the failed "broken" parent is retried on every search
+    assert mock_get.call_count == 2 + 2 + 1
+    assert partof_cache.stats().hits == 1
+    assert len(partof_cache) == 1
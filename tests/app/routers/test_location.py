@@ -0,0 +1,85 @@
+import json
+from typing import AsyncIterator
+
+from fastapi.testclient import TestClient
+from inject import Binder
+from pytest_mock import MockerFixture
+from requests import RequestException
+
+from app.healthcarefinder.healthcarefinder import HealthcareFinder
+from app.healthcarefinder.models import CType, Organization, SearchResponse
+from app.healthcarefinder.threaded import iterate_organizations
+from app.healthcarefinder.zorgab.zorgab import BadSearchParams
+from tests.utils import configure_bindings
+
+
+def create_organization(identification: str) -> Organization:
+    return Organization(
+        medmij_id=None,
+        display_name=f"Organization {identification}",
+        identification=identification,
+        types=[CType(code="1", display_name="Test", type="test")],
+    )
+
+
+def test_stream_search_returns_organizations_as_ndjson(test_client: TestClient, mocker: MockerFixture) -> None:
+    organizations = [create_organization("agb:1"), create_organization("agb:2")]
+    finder = mocker.AsyncMock(spec=HealthcareFinder)
+    finder.stream_organizations.return_value = iterate_organizations(SearchResponse(organizations=organizations))
+
+    def bindings_override(binder: Binder) -> Binder:
+        binder.bind(HealthcareFinder, finder)
+        return binder
+
+    configure_bindings(bindings_override)
+
+    response = test_client.post("/localization/organization/search/stream", json={"text": "foo"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["identification"] for line in lines] == ["agb:1", "agb:2"]
+
+
+def test_stream_search_ends_with_an_error_record_for_a_failure_mid_stream(
+    test_client: TestClient, mocker: MockerFixture
+) -> None:
+    async def fail_after_first_organization() -> AsyncIterator[Organization]:
+        yield create_organization("agb:1")
+        raise RequestException("Connection reset by peer")
+
+    finder = mocker.AsyncMock(spec=HealthcareFinder)
+    finder.stream_organizations.return_value = fail_after_first_organization()
+    logger = mocker.patch("app.routers.location.logger")
+
+    def bindings_override(binder: Binder) -> Binder:
+        binder.bind(HealthcareFinder, finder)
+        return binder
+
+    configure_bindings(bindings_override)
+
+    response = test_client.post("/localization/organization/search/stream", json={"text": "foo"})
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["identification"] == "agb:1"
+    assert lines[1] == {"error": {"status_code": 500, "detail": "Error while processing your request"}}
+    logger.exception.assert_called_once()
+
+
+def test_stream_search_returns_bad_request_for_bad_search_params(
+    test_client: TestClient, mocker: MockerFixture
+) -> None:
+    finder = mocker.AsyncMock(spec=HealthcareFinder)
+    finder.stream_organizations.side_effect = BadSearchParams()
+
+    def bindings_override(binder: Binder) -> Binder:
+        binder.bind(HealthcareFinder, finder)
+        return binder
+
+    configure_bindings(bindings_override)
+
+    response = test_client.post("/localization/organization/search/stream", json={"text": "foo"})
+
+    assert response.status_code == 400
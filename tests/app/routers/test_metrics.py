@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+from inject import Binder
+
+from app.healthcarefinder.cache import SearchResponseCache
+from app.healthcarefinder.zorgab.cache import PartOfOrganizationCache, ZorgABSearchSingleFlight
+from tests.utils import configure_bindings
+
+
+def test_metrics_endpoint_reports_cache_stats(test_client: TestClient) -> None:
+    partof_cache = PartOfOrganizationCache(max_entries=10, ttl_seconds=60)
+    partof_cache.get_or_load("Organization/1", lambda: None)
+    search_single_flight = ZorgABSearchSingleFlight()
+    search_single_flight.do(("lean", "_text=foo"), lambda: [])
+
+    def bindings_override(binder: Binder) -> Binder:
+        binder.bind(SearchResponseCache, SearchResponseCache(max_entries=10, ttl_seconds=60))
+        binder.bind(PartOfOrganizationCache, partof_cache)
+        binder.bind(ZorgABSearchSingleFlight, search_single_flight)
+
+        return binder
+
+    configure_bindings(bindings_override)
+
+    response = test_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "caches": {
+            "search_response": {
+                "hits": 0,
+                "stale_hits": 0,
+                "misses": 0,
+                "coalesced": 0,
+                "evictions": 0,
+                "size": 0,
+                "hit_ratio": 0.0,
+            },
+            "partof_organization": {
+                "hits": 0,
+                "stale_hits": 0,
+                "misses": 1,
+                "coalesced": 0,
+                "evictions": 0,
+                "size": 0,
+                "hit_ratio": 0.0,
+            },
+            "endpoint_jwe": {
+                "hits": 0,
+                "stale_hits": 0,
+                "misses": 0,
+                "coalesced": 0,
+                "evictions": 0,
+                "size": 0,
+                "hit_ratio": 0.0,
+            },
+        },
+        "coalescing": {
+            "zorgab_search": {"calls": 1, "coalesced": 0},
+        },
+        "database_pools": {},
+    }
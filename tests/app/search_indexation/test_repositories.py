@@ -6,9 +6,10 @@ from pytest_mock import MockerFixture
 
 from app.db.models import Endpoint
 from app.normalization.models import NormalizedOrganization
-from app.search_indexation.models import SearchIndex
+from app.search_indexation.models import EncryptedEndpointManifestEntry, EncryptedEndpointsManifest, SearchIndex
 from app.search_indexation.repositories import (
     EncryptedEndpointsFileRepository,
+    EncryptedEndpointsManifestFileRepository,
     MockEndpointsRepository,
     MockOrganizationsFileRepo,
     SearchIndexFileRepository,
@@ -100,6 +101,64 @@ class TestEncryptedEndpointsFileRepository:
         with pytest.raises(RuntimeError, match="writer failed"):
             repo.save({1: "encrypted-url-1"})
 
+    def test_load_returns_saved_endpoints(self, tmp_path: Path) -> None:
+        target_file = tmp_path / "endpoints.json"
+        repo = EncryptedEndpointsFileRepository(
+            output_path=target_file, temp_path=tmp_path / "tmp", file_writer=AtomicFileWriter()
+        )
+
+        repo.save({1: "encrypted-url-1", 2: "encrypted-url-2"})
+
+        assert repo.load() == {1: "encrypted-url-1", 2: "encrypted-url-2"}
+
+    @pytest.mark.parametrize("content", [None, b"not json", b"[]"])
+    def test_load_returns_empty_dict_without_valid_file(self, tmp_path: Path, content: bytes | None) -> None:
+        target_file = tmp_path / "endpoints.json"
+        if content is not None:
+            target_file.write_bytes(content)
+
+        repo = EncryptedEndpointsFileRepository(
+            output_path=target_file, temp_path=tmp_path / "tmp", file_writer=AtomicFileWriter()
+        )
+
+        assert repo.load() == {}
+
+
+class TestEncryptedEndpointsManifestFileRepository:
+    def test_save_and_load_roundtrip(self, tmp_path: Path) -> None:
+        target_file = tmp_path / "state" / "endpoints.manifest.json"
+        manifest = EncryptedEndpointsManifest(
+            key_id="jwt-key:jwe-key",
+            entries={
+                1: EncryptedEndpointManifestEntry(url_hash="url-1", token_hash="token-1", issued_at=1000),
+                2: EncryptedEndpointManifestEntry(url_hash="url-2", token_hash="token-2", issued_at=2000),
+            },
+        )
+        repo = EncryptedEndpointsManifestFileRepository(
+            output_path=target_file, temp_path=tmp_path / "tmp", file_writer=AtomicFileWriter()
+        )
+
+        repo.save(manifest)
+
+        assert orjson.loads(target_file.read_bytes())["endpoints"]["1"] == {
+            "url_hash": "url-1",
+            "token_hash": "token-1",
+            "issued_at": 1000,
+        }
+        assert repo.load() == manifest
+
+    @pytest.mark.parametrize("content", [None, b"not json", b'{"endpoints": {}}'])
+    def test_load_returns_none_without_valid_file(self, tmp_path: Path, content: bytes | None) -> None:
+        target_file = tmp_path / "endpoints.manifest.json"
+        if content is not None:
+            target_file.write_bytes(content)
+
+        repo = EncryptedEndpointsManifestFileRepository(
+            output_path=target_file, temp_path=tmp_path / "tmp", file_writer=AtomicFileWriter()
+        )
+
+        assert repo.load() is None
+
 
 class TestMockOrganizationsFileRepo:
     def test_get_unique_mock_endpoints_parses_string_keys_to_int(self, tmp_path: Path) -> None:
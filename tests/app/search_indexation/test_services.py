@@ -1,12 +1,18 @@
+import hashlib
 from pathlib import Path
 
 import orjson
 import pytest
+from jwcrypto import jwe, jwk, jwt
 from pytest_mock import MockerFixture
 
+from app.addressing.constants import ENDPOINT_JWE_REFRESH_SECONDS, URL_CLAIM_NAME
+from app.addressing.factories import EndpointJWEFactory, EndpointJWTFactory
+from app.addressing.repositories import FilesystemJWKStoreRepository, KeyStoreRepository
 from app.addressing.services import EndpointJWEWrapper
 from app.db.models import Endpoint
 from app.normalization.models import NormalizedOrganization
+from app.search_indexation.models import EncryptedEndpointManifestEntry, EncryptedEndpointsManifest
 from app.search_indexation.repositories import MockOrganizationsFileRepo
 from app.search_indexation.services import (
     EncryptedEndpointProvider,
@@ -22,18 +28,36 @@ class TestEncryptedEndpointProvider:
             Endpoint(id=2, url="https://example.com/token"),
         ]
         endpoint_jwe_wrapper = mocker.Mock(spec=EndpointJWEWrapper)
-        endpoint_jwe_wrapper.wrap.side_effect = lambda url: f"encrypted:{url}"
+        endpoint_jwe_wrapper.wrap_fresh.side_effect = lambda url: f"encrypted:{url}"
+        endpoint_jwe_wrapper.get_key_id.return_value = "key-1"
 
         provider = EncryptedEndpointProvider(
             endpoint_repository=endpoint_repository,
             endpoint_jwe_wrapper=endpoint_jwe_wrapper,
+            key_repository=mocker.Mock(spec=KeyStoreRepository),
+            clock=lambda: 1000.0,
         )
         result = provider.get_all()
 
-        assert result == {
+        assert result.endpoints == {
             1: "encrypted:https://example.com/auth",
             2: "encrypted:https://example.com/token",
         }
+        assert result.manifest == EncryptedEndpointsManifest(
+            key_id="key-1",
+            entries={
+                1: EncryptedEndpointManifestEntry(
+                    url_hash=_sha256("https://example.com/auth"),
+                    token_hash=_sha256("encrypted:https://example.com/auth"),
+                    issued_at=1000,
+                ),
+                2: EncryptedEndpointManifestEntry(
+                    url_hash=_sha256("https://example.com/token"),
+                    token_hash=_sha256("encrypted:https://example.com/token"),
+                    issued_at=1000,
+                ),
+            },
+        )
 
     def test_get_all_raises_when_encryption_fails(self, mocker: MockerFixture) -> None:
         endpoint_repository = mocker.Mock()
@@ -41,16 +65,180 @@ class TestEncryptedEndpointProvider:
             Endpoint(id=42, url="https://fail.example.com"),
         ]
         endpoint_jwe_wrapper = mocker.Mock(spec=EndpointJWEWrapper)
-        endpoint_jwe_wrapper.wrap.side_effect = Exception("encryption failure")
+        endpoint_jwe_wrapper.wrap_fresh.side_effect = Exception("encryption failure")
 
         provider = EncryptedEndpointProvider(
             endpoint_repository=endpoint_repository,
             endpoint_jwe_wrapper=endpoint_jwe_wrapper,
+            key_repository=mocker.Mock(spec=KeyStoreRepository),
         )
 
         with pytest.raises(RuntimeError, match="Failed to encrypt endpoint id=42"):
             provider.get_all()
 
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_get_all_with_worker_processes_returns_same_endpoints(self, mocker: MockerFixture, workers: int) -> None:
+        signing_key = jwk.JWK.generate(kty="EC", crv="P-256")
+        encryption_key = jwk.JWK.generate(kty="RSA", size=2048)
+        key_repository = FilesystemJWKStoreRepository()
+        key_repository.add_key_to_store(EndpointJWTFactory.JWT_KEY_LABEL, signing_key)
+        key_repository.add_key_to_store(EndpointJWEFactory.JWE_KEY_LABEL, encryption_key)
+
+        endpoints = [Endpoint(id=index, url=f"https://example.com/{index}") for index in range(10, 0, -1)]
+        endpoint_repository = mocker.Mock()
+        endpoint_repository.find_all.return_value = endpoints
+
+        provider = EncryptedEndpointProvider(
+            endpoint_repository=endpoint_repository,
+            endpoint_jwe_wrapper=EndpointJWEWrapper(
+                jwt_factory=EndpointJWTFactory(), jwe_factory=EndpointJWEFactory(), key_repository=key_repository
+            ),
+            key_repository=key_repository,
+        )
+        result = provider.get_all(workers=workers).endpoints
+
+        assert list(result) == [endpoint.id for endpoint in endpoints]
+        for endpoint in endpoints:
+            token = jwe.JWE()
+            token.deserialize(result[endpoint.id], key=encryption_key)
+            claims = orjson.loads(jwt.JWT(jwt=token.payload.decode("utf-8"), key=signing_key).claims)
+            assert claims[URL_CLAIM_NAME] == endpoint.url
+
+    def test_get_all_with_worker_processes_reports_failing_endpoint(self, mocker: MockerFixture) -> None:
+        key_repository = FilesystemJWKStoreRepository()
+        key_repository.add_key_to_store(EndpointJWTFactory.JWT_KEY_LABEL, jwk.JWK.generate(kty="EC", crv="P-256"))
+        key_repository.add_key_to_store(EndpointJWEFactory.JWE_KEY_LABEL, jwk.JWK.generate(kty="RSA", size=2048))
+
+        # Bytes are not JSON serializable, so encrypting this endpoint fails inside a worker process
+        endpoints = [Endpoint(id=index, url=f"https://example.com/{index}") for index in range(1, 9)]
+        endpoints[5].url = b"https://example.com/6"  # type: ignore[assignment]
+        endpoint_repository = mocker.Mock()
+        endpoint_repository.find_all.return_value = endpoints
+
+        provider = EncryptedEndpointProvider(
+            endpoint_repository=endpoint_repository,
+            endpoint_jwe_wrapper=mocker.Mock(spec=EndpointJWEWrapper),
+            key_repository=key_repository,
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to encrypt endpoint id=6"):
+            provider.get_all(workers=2)
+
+
+def _sha256(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+class TestEncryptedEndpointProviderIncremental:
+    NOW = 1_700_000_000
+
+    @pytest.fixture()
+    def endpoint_jwe_wrapper(self, mocker: MockerFixture) -> EndpointJWEWrapper:
+        endpoint_jwe_wrapper: EndpointJWEWrapper = mocker.Mock(spec=EndpointJWEWrapper)
+        endpoint_jwe_wrapper.wrap_fresh.side_effect = lambda url: f"encrypted:{url}"  # type: ignore[attr-defined]
+        endpoint_jwe_wrapper.get_key_id.return_value = "jwt-key:jwe-key"  # type: ignore[attr-defined]
+        return endpoint_jwe_wrapper
+
+    def _create_provider(
+        self, mocker: MockerFixture, endpoint_jwe_wrapper: EndpointJWEWrapper, endpoints: list[Endpoint]
+    ) -> EncryptedEndpointProvider:
+        endpoint_repository = mocker.Mock()
+        endpoint_repository.find_all.return_value = endpoints
+
+        return EncryptedEndpointProvider(
+            endpoint_repository=endpoint_repository,
+            endpoint_jwe_wrapper=endpoint_jwe_wrapper,
+            key_repository=mocker.Mock(spec=KeyStoreRepository),
+            clock=lambda: self.NOW,
+        )
+
+    def _manifest_entry(self, url: str, token: str, issued_at: int) -> EncryptedEndpointManifestEntry:
+        return EncryptedEndpointManifestEntry(url_hash=_sha256(url), token_hash=_sha256(token), issued_at=issued_at)
+
+    def test_without_previous_export_encrypts_all_endpoints(
+        self, mocker: MockerFixture, endpoint_jwe_wrapper: EndpointJWEWrapper
+    ) -> None:
+        endpoints = [Endpoint(id=2, url="https://example.com/b"), Endpoint(id=1, url="https://example.com/a")]
+        provider = self._create_provider(mocker, endpoint_jwe_wrapper, endpoints)
+
+        result = provider.get_all_incremental({}, None)
+
+        assert list(result.endpoints.items()) == [
+            (2, "encrypted:https://example.com/b"),
+            (1, "encrypted:https://example.com/a"),
+        ]
+        assert result.manifest == EncryptedEndpointsManifest(
+            key_id="jwt-key:jwe-key",
+            entries={
+                2: self._manifest_entry("https://example.com/b", "encrypted:https://example.com/b", self.NOW),
+                1: self._manifest_entry("https://example.com/a", "encrypted:https://example.com/a", self.NOW),
+            },
+        )
+
+    def test_carries_over_unchanged_endpoints(
+        self, mocker: MockerFixture, endpoint_jwe_wrapper: EndpointJWEWrapper
+    ) -> None:
+        endpoints = [
+            Endpoint(id=1, url="https://example.com/unchanged"),
+            Endpoint(id=2, url="https://example.com/changed"),
+            Endpoint(id=3, url="https://example.com/new"),
+        ]
+        unchanged_entry = self._manifest_entry("https://example.com/unchanged", "previous-1", self.NOW - 60)
+        previous_manifest = EncryptedEndpointsManifest(
+            key_id="jwt-key:jwe-key",
+            entries={
+                1: unchanged_entry,
+                2: self._manifest_entry("https://example.com/old", "previous-2", self.NOW - 60),
+                4: self._manifest_entry("https://example.com/removed", "previous-4", self.NOW - 60),
+            },
+        )
+        provider = self._create_provider(mocker, endpoint_jwe_wrapper, endpoints)
+
+        result = provider.get_all_incremental({1: "previous-1", 2: "previous-2", 4: "previous-4"}, previous_manifest)
+
+        assert result.endpoints == {
+            1: "previous-1",
+            2: "encrypted:https://example.com/changed",
+            3: "encrypted:https://example.com/new",
+        }
+        assert result.manifest.entries[1] == unchanged_entry
+        assert result.manifest.entries[2].issued_at == self.NOW
+        assert list(result.manifest.entries) == [1, 2, 3]
+        assert [call.args for call in endpoint_jwe_wrapper.wrap_fresh.call_args_list] == [  # type: ignore[attr-defined]
+            ("https://example.com/changed",),
+            ("https://example.com/new",),
+        ]
+
+    @pytest.mark.parametrize(
+        "key_id, previous_token, issued_at",
+        [
+            ("other-jwt-key:jwe-key", "previous-1", NOW - 60),
+            ("jwt-key:jwe-key", "tampered-1", NOW - 60),
+            ("jwt-key:jwe-key", "previous-1", NOW - ENDPOINT_JWE_REFRESH_SECONDS),
+        ],
+        ids=["key_rotated", "token_mismatch", "refresh_due"],
+    )
+    def test_encrypts_again_when_previous_token_is_not_reusable(
+        self,
+        mocker: MockerFixture,
+        endpoint_jwe_wrapper: EndpointJWEWrapper,
+        key_id: str,
+        previous_token: str,
+        issued_at: int,
+    ) -> None:
+        endpoints = [Endpoint(id=1, url="https://example.com/a")]
+        previous_manifest = EncryptedEndpointsManifest(
+            key_id=key_id,
+            entries={1: self._manifest_entry("https://example.com/a", "previous-1", issued_at)},
+        )
+        provider = self._create_provider(mocker, endpoint_jwe_wrapper, endpoints)
+
+        result = provider.get_all_incremental({1: previous_token}, previous_manifest)
+
+        assert result.endpoints == {1: "encrypted:https://example.com/a"}
+        assert result.manifest.key_id == "jwt-key:jwe-key"
+        assert result.manifest.entries[1].issued_at == self.NOW
+
 
 class TestMockOrganizationsMerger:
     def test_merge_flag_off_skips_mock_file(self, mocker: MockerFixture) -> None:
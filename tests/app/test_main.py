@@ -1,8 +1,11 @@
+import asyncio
+
 import inject
 import pytest
 from fastapi import FastAPI
 from pytest_mock import MockerFixture
 
+from app.addressing.zal.index import ZalAddressingIndex
 from app.config.models import Config
 from app.cron_tasks import CronTask, CronTaskOrchestrator
 from app.main import create_fastapi_app, lifespan, run_uvicorn
@@ -71,3 +74,33 @@ async def test_lifespan_stops_cron_tasks_on_exit(mocker: MockerFixture, config:
         pass
 
     orchestrator.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_runs_the_zal_index_in_the_background_until_exit(mocker: MockerFixture, config: Config) -> None:
+    states: list[str] = []
+
+    async def run() -> None:
+        states.append("running")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            states.append("cancelled")
+            raise
+
+    index = mocker.Mock(spec=ZalAddressingIndex)
+    index.run = run
+    orchestrator = mocker.Mock(spec=CronTaskOrchestrator)
+
+    def bindings_override(binder: inject.Binder) -> inject.Binder:
+        binder.bind(CronTaskOrchestrator, orchestrator)
+        binder.bind(ZalAddressingIndex, index)
+        return binder
+
+    configure_bindings(bindings_override, config=config)
+
+    async with lifespan(FastAPI()):
+        await asyncio.sleep(0)
+        assert states == ["running"]
+
+    assert states == ["running", "cancelled"]
@@ -1,16 +1,20 @@
+import tracemalloc
 from pathlib import Path
+from typing import Iterator
 from xml.etree.ElementTree import Element, fromstring
 
 from pytest import fixture, raises
 
 from app.xml.exceptions import CouldNotTraverse
-from app.xml.services import ElementTraverser
+from app.xml.services import ElementTraverser, StreamingElementTraverser
+
+DUMMY_XML_PATH = Path(__file__).parent / "dummy.xml"
 
 
 class TestElementTraverser:
     @fixture
     def example_xml(self) -> Element:
-        with open(Path(__file__).parent / "dummy.xml", "r") as example_xml_file:
+        with open(DUMMY_XML_PATH, "r") as example_xml_file:
             return fromstring(example_xml_file.read())
 
     @fixture
@@ -151,3 +155,140 @@ class TestElementTraverser:
         assert len(matches) == 2
         assert matches[0].text == "IAmRoot/Nested/Elements/Element1"
         assert matches[1].text == "IAmRoot/Nested/Elements/Element2"
+
+    def test_iterate_nested_elements_reports_progress_per_element(
+        self,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        progress: list[tuple[int, int]] = []
+
+        matches = list(
+            xml_traverser.iterate_nested_elements("Nested/Elements/Element", lambda *args: progress.append(args))
+        )
+
+        assert [match.text for match in matches] == [
+            "IAmRoot/Nested/Elements/Element1",
+            "IAmRoot/Nested/Elements/Element2",
+        ]
+        assert progress == [(0, 2), (1, 2)]
+
+
+class TestSingleNamespaceElementTraverser:
+    @fixture
+    def xml_traverser(self) -> ElementTraverser:
+        with open(DUMMY_XML_PATH, "r") as example_xml_file:
+            return ElementTraverser(fromstring(example_xml_file.read()), single_namespace=True)
+
+    def test_get_nested_elements_returns_matching_elements_of_compiled_path(
+        self,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        matches = xml_traverser.get_nested_elements("Nested/Elements/Element")
+
+        assert [match.text for match in matches] == [
+            "IAmRoot/Nested/Elements/Element1",
+            "IAmRoot/Nested/Elements/Element2",
+        ]
+
+    def test_get_nested_text_returns_matching_element_content_of_given_root(
+        self,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        single = xml_traverser.get_nested_element("Single")
+
+        assert xml_traverser.get_nested_text("Nested/Element", single) == "IAmRoot/Single/Nested/Element"
+
+    def test_get_nested_elements_supports_paths_that_are_not_compiled(
+        self,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        matches = xml_traverser.get_nested_elements("Nested/Elements/*")
+
+        assert [match.text for match in matches] == [
+            "IAmRoot/Nested/Elements/Element1",
+            "IAmRoot/Nested/Elements/Element2",
+        ]
+
+    def test_get_nested_element_raises_exception_when_no_match(
+        self,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        with raises(CouldNotTraverse, match="Element 'Nested/DoesNotExist' not found"):
+            xml_traverser.get_nested_element("Nested/DoesNotExist")
+
+    def test_compiled_paths_match_elements_without_namespace(self) -> None:
+        traverser = ElementTraverser(fromstring("<Foo><Bar><Baz>baz</Baz></Bar></Foo>"), single_namespace=True)
+
+        assert traverser.get_nested_text("Bar/Baz") == "baz"
+
+
+def _write_list_xml(path: Path, elements: int) -> Path:
+    with open(path, "w") as file:
+        file.write('<List xmlns="xmlns://foo.bar/xml/namespace/"><Header>header</Header><Items>')
+        for index in range(elements):
+            file.write(f"<Item><Name>item-{index}</Name><Value>{'x' * 200}</Value></Item>")
+        file.write("</Items><Footer>footer</Footer></List>")
+
+    return path
+
+
+class TestStreamingElementTraverser:
+    @fixture
+    def streaming_traverser(self) -> Iterator[StreamingElementTraverser]:
+        with StreamingElementTraverser.open(str(DUMMY_XML_PATH), "Nested/Elements/Element") as traverser:
+            yield traverser
+
+    def test_elements_before_streamed_path_can_be_traversed(
+        self,
+        streaming_traverser: StreamingElementTraverser,
+    ) -> None:
+        assert streaming_traverser.get_root_element_name() == "IAmRoot"
+        assert streaming_traverser.get_nested_text("Test") == "IAmRoot/Test"
+
+    def test_iterate_nested_elements_yields_streamed_elements_and_removes_them_from_the_tree(
+        self,
+        streaming_traverser: StreamingElementTraverser,
+    ) -> None:
+        texts = [element.text for element in streaming_traverser.iterate_nested_elements("Nested/Elements/Element")]
+
+        assert texts == ["IAmRoot/Nested/Elements/Element1", "IAmRoot/Nested/Elements/Element2"]
+        assert len(streaming_traverser.get_nested_element("Nested/Elements")) == 0
+        # The rest of the document has been parsed
+        assert streaming_traverser.get_nested_text("Single/Nested/Element") == "IAmRoot/Single/Nested/Element"
+
+    def test_iterate_nested_elements_reports_progress_in_bytes(
+        self,
+        streaming_traverser: StreamingElementTraverser,
+    ) -> None:
+        progress: list[tuple[int, int]] = []
+
+        for _ in streaming_traverser.iterate_nested_elements(
+            "Nested/Elements/Element", lambda *args: progress.append(args)
+        ):
+            pass
+
+        size = DUMMY_XML_PATH.stat().st_size
+        assert len(progress) == 3
+        assert progress[-1] == (size, size)
+
+    def test_iterate_nested_elements_raises_exception_when_streamed_path_not_found(self) -> None:
+        with StreamingElementTraverser.open(str(DUMMY_XML_PATH), "DoesNotExist") as traverser:
+            assert traverser.get_nested_text("Test") == "IAmRoot/Test"
+
+            with raises(CouldNotTraverse, match="Element 'DoesNotExist' not found"):
+                list(traverser.iterate_nested_elements("DoesNotExist"))
+
+    def test_peak_memory_does_not_grow_with_number_of_streamed_elements(self, tmp_path: Path) -> None:
+        def peak_memory(elements: int) -> int:
+            path = _write_list_xml(tmp_path / f"list-{elements}.xml", elements)
+
+            tracemalloc.start()
+            try:
+                with StreamingElementTraverser.open(str(path), "Items/Item") as traverser:
+                    for item in traverser.iterate_nested_elements("Items/Item"):
+                        traverser.get_nested_text("Name", item)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        assert peak_memory(20000) < peak_memory(1000) * 2
@@ -0,0 +1,118 @@
+import re
+from pathlib import Path
+from typing import Iterator
+from xml.etree.ElementTree import fromstring
+
+from pytest import mark, raises
+
+from app.xml.exceptions import CouldNotTraverse
+from app.xml.services import ElementTraverser
+from app.zal_importer.enums import OrganisationType
+from app.zal_importer.extraction import (
+    ExtractedDataService,
+    ExtractedOrganisation,
+    ExtractedSystemRole,
+    extract_organisation,
+    extract_organisation_chunk,
+    split_organisation_chunks,
+)
+from app.zal_importer.importers import OrganisationListImporter
+
+EXAMPLE_PATH = Path(__file__).parent / "MedMij_Zorgaanbiederslijst_example.9.3.xml"
+
+
+def _load_traverser() -> ElementTraverser:
+    with open(EXAMPLE_PATH, "r") as xml_file:
+        return ElementTraverser(fromstring(xml_file.read()))
+
+
+def _split(path: Path, batch_size: int, read_size: int) -> Iterator[bytes]:
+    with open(path, "rb") as source:
+        yield from split_organisation_chunks(source, batch_size, read_size=read_size)
+
+
+class TestExtraction:
+    def test_extract_organisation_extracts_nested_fields(self) -> None:
+        traverser = _load_traverser()
+        element = traverser.get_nested_elements(OrganisationListImporter.ORGANISATIONS_PATH)[1]
+
+        assert extract_organisation(traverser, element) == ExtractedOrganisation(
+            name="radiologencentraalflevoland@medmij",
+            type=OrganisationType.ZA,
+            data_services=[
+                ExtractedDataService(
+                    external_id="1",
+                    auth_endpoint_url="https://medmij.za983.xisbridge.net/oauth/authorize",
+                    token_endpoint_url="https://medmij.xisbridge.net/oauth/token",
+                    system_roles=[
+                        ExtractedSystemRole(
+                            code="MM-2.1-BZB-FHIR", resource_endpoint_url="https://rcf-rso.nl/rcf/fhir-stu3"
+                        )
+                    ],
+                )
+            ],
+        )
+
+    def test_endpoint_urls_lists_urls_of_data_services_and_system_roles(self) -> None:
+        traverser = _load_traverser()
+        element = traverser.get_nested_elements(OrganisationListImporter.ORGANISATIONS_PATH)[1]
+
+        assert list(extract_organisation(traverser, element).endpoint_urls()) == [
+            "https://medmij.za983.xisbridge.net/oauth/authorize",
+            "https://medmij.xisbridge.net/oauth/token",
+            "https://rcf-rso.nl/rcf/fhir-stu3",
+        ]
+
+    def test_extract_organisation_fails_with_invalid_type(self) -> None:
+        element = fromstring(
+            "<Zorgaanbieder><Zorgaanbiedernaam>za@medmij</Zorgaanbiedernaam><Aanbiedertype>foobar</Aanbiedertype>"
+            "</Zorgaanbieder>"
+        )
+
+        with raises(ValueError, match="'foobar' is not a valid OrganisationType"):
+            extract_organisation(ElementTraverser(element), element)
+
+    # A small read size splits tags over several reads
+    @mark.parametrize("batch_size,read_size", [(1, 64), (2, 64), (1000, 1 << 20)])
+    def test_extracting_split_chunks_matches_extraction_from_document(self, batch_size: int, read_size: int) -> None:
+        traverser = _load_traverser()
+        elements = traverser.get_nested_elements(OrganisationListImporter.ORGANISATIONS_PATH)
+
+        chunks = list(_split(EXAMPLE_PATH, batch_size, read_size))
+
+        assert len(chunks) == -(-len(elements) // batch_size)
+        assert [organisation for chunk in chunks for organisation in extract_organisation_chunk(chunk)] == [
+            extract_organisation(traverser, element) for element in elements
+        ]
+
+    def test_split_chunks_keep_the_namespace_prefix_of_the_zal(self, tmp_path: Path) -> None:
+        path = tmp_path / "zal.xml"
+        # The example ZAL with all its elements in a prefixed instead of the default namespace
+        path.write_bytes(
+            re.sub(rb"<(/?)(?=[A-Z])", rb"<\1zal:", EXAMPLE_PATH.read_bytes()).replace(b"xmlns=", b"xmlns:zal=")
+        )
+
+        chunks = list(_split(path, batch_size=1, read_size=64))
+
+        assert [organisation for chunk in chunks for organisation in extract_organisation_chunk(chunk)] == [
+            organisation
+            for chunk in _split(EXAMPLE_PATH, batch_size=1, read_size=64)
+            for organisation in extract_organisation_chunk(chunk)
+        ]
+        assert chunks[0].startswith(b'<?xml version="1.0" encoding="UTF-8"?><zal:Zorgaanbieders xmlns:zal=')
+
+    def test_split_organisation_chunks_fails_without_organisations_element(self, tmp_path: Path) -> None:
+        path = tmp_path / "zal.xml"
+        path.write_bytes(b"<Zorgaanbiederslijst><Tijdstempel>2021-05-04</Tijdstempel></Zorgaanbiederslijst>")
+
+        with raises(CouldNotTraverse):
+            list(_split(path, batch_size=1, read_size=16))
+
+    def test_extract_organisation_chunk_fails_with_invalid_type(self) -> None:
+        chunk = (
+            b"<Zorgaanbieders><Zorgaanbieder><Zorgaanbiedernaam>za@medmij</Zorgaanbiedernaam>"
+            b"<Aanbiedertype>foobar</Aanbiedertype></Zorgaanbieder></Zorgaanbieders>"
+        )
+
+        with raises(ValueError, match="'foobar' is not a valid OrganisationType"):
+            extract_organisation_chunk(chunk)
@@ -1,18 +1,20 @@
 from copy import deepcopy
 from dataclasses import dataclass
 from pathlib import Path
+from typing import ContextManager
 from xml.etree.ElementTree import Element, fromstring
 
 from pytest import FixtureRequest, fixture, mark, raises
 from pytest_mock import MockerFixture, MockType
 
+from app.config.models import ZalImportConfig
 from app.db.models import (
     DataService,
     Endpoint,
     Organisation,
 )
 from app.xml.exceptions import CouldNotTraverse
-from app.xml.services import ElementTraverser
+from app.xml.services import ElementTraverser, StreamingElementTraverser
 from app.zal_importer.enums import IdentifyingFeatureType, OrganisationType
 from app.zal_importer.exceptions import CouldNotImportOrganisations
 from app.zal_importer.importers import (
@@ -44,6 +46,8 @@ class OrganisationListMocks:
     data_service_repository: MockType
     system_role_repository: MockType
     endpoint_repository: MockType
+    current_import_repository: MockType
+    partition_repository: MockType
 
 
 @dataclass
@@ -70,6 +74,12 @@ def _load_xml_file(filename: str) -> ElementTraverser:
         return ElementTraverser(fromstring(xml_file.read()))
 
 
+def _stream_xml_file(filename: str) -> ContextManager[StreamingElementTraverser]:
+    return StreamingElementTraverser.open(
+        str(Path(__file__).parent / filename), OrganisationListImporter.ORGANISATIONS_PATH
+    )
+
+
 def _create_test_organisations() -> list[Organisation]:
     return [Organisation(id=123), Organisation(id=456)]
 
@@ -82,6 +92,35 @@ def _create_test_endpoints() -> list[Endpoint]:
     return [Endpoint(id=i) for i in range(10, 20)]
 
 
+def _create_organisation_list_mocks(mocker: MockerFixture, config: ZalImportConfig) -> OrganisationListMocks:
+    mock_logger = mocker.Mock()
+    org_repo, data_repo, sys_repo, endpoint_repo = _create_mock_repositories(mocker)
+    mock_current_import_repo = mocker.Mock()
+    mock_partition_repo = mocker.Mock()
+    mock_partition_repo.is_partitioned.return_value = False
+
+    importer = OrganisationListImporter(
+        organisation_repository=org_repo,
+        data_service_repository=data_repo,
+        system_role_repository=sys_repo,
+        endpoint_repository=endpoint_repo,
+        current_import_repository=mock_current_import_repo,
+        partition_repository=mock_partition_repo,
+        logger=mock_logger,
+        config=config,
+    )
+
+    return OrganisationListMocks(
+        importer=importer,
+        organisation_repository=org_repo,
+        data_service_repository=data_repo,
+        system_role_repository=sys_repo,
+        endpoint_repository=endpoint_repo,
+        current_import_repository=mock_current_import_repo,
+        partition_repository=mock_partition_repo,
+    )
+
+
 class TestOrganisationListImporter:
     @fixture
     def mocks(
@@ -89,24 +128,7 @@ class TestOrganisationListImporter:
         request: FixtureRequest,
         mocker: MockerFixture,
     ) -> OrganisationListMocks:
-        mock_logger = mocker.Mock()
-        org_repo, data_repo, sys_repo, endpoint_repo = _create_mock_repositories(mocker)
-
-        importer = OrganisationListImporter(
-            organisation_repository=org_repo,
-            data_service_repository=data_repo,
-            system_role_repository=sys_repo,
-            endpoint_repository=endpoint_repo,
-            logger=mock_logger,
-        )
-
-        return OrganisationListMocks(
-            importer=importer,
-            organisation_repository=org_repo,
-            data_service_repository=data_repo,
-            system_role_repository=sys_repo,
-            endpoint_repository=endpoint_repo,
-        )
+        return _create_organisation_list_mocks(mocker, ZalImportConfig(bulk_insert=False))
 
     @fixture
     def xml_traverser(self) -> ElementTraverser:
@@ -115,7 +137,7 @@ class TestOrganisationListImporter:
     def _setup_successful_processing_mocks(self, mocks: OrganisationListMocks) -> None:
         mocks.organisation_repository.create.side_effect = _create_test_organisations()
         mocks.data_service_repository.create.side_effect = _create_test_data_services()
-        mocks.endpoint_repository.find_one_by_url.return_value = None
+        mocks.endpoint_repository.find_ids_by_url.return_value = {}
         mocks.endpoint_repository.create.side_effect = _create_test_endpoints()
 
     def _assert_organisation_creation(self, mocks: OrganisationListMocks, mocker: MockerFixture) -> None:
@@ -138,7 +160,7 @@ class TestOrganisationListImporter:
         expected_calls = [
             mocker.call(organisation_id=123, external_id="4", auth_endpoint_id=10, token_endpoint_id=11),
             mocker.call(organisation_id=123, external_id="6", auth_endpoint_id=13, token_endpoint_id=14),
-            mocker.call(organisation_id=456, external_id="1", auth_endpoint_id=17, token_endpoint_id=18),
+            mocker.call(organisation_id=456, external_id="1", auth_endpoint_id=16, token_endpoint_id=11),
         ]
         mocks.data_service_repository.create.assert_has_calls(expected_calls)
 
@@ -146,14 +168,16 @@ class TestOrganisationListImporter:
         expected_calls = [
             mocker.call(data_service_id=123, code="LAB-1.1-LRB-FHIR", resource_endpoint_id=12),
             mocker.call(data_service_id=456, code="MM-1.2-PLB-FHIR", resource_endpoint_id=15),
-            mocker.call(data_service_id=456, code="MM-1.2-PDB-FHIR", resource_endpoint_id=16),
-            mocker.call(data_service_id=789, code="MM-2.1-BZB-FHIR", resource_endpoint_id=19),
+            mocker.call(data_service_id=456, code="MM-1.2-PDB-FHIR", resource_endpoint_id=15),
+            mocker.call(data_service_id=789, code="MM-2.1-BZB-FHIR", resource_endpoint_id=17),
         ]
         mocks.system_role_repository.create.assert_has_calls(expected_calls)
 
     def _assert_endpoint_creation(self, mocks: OrganisationListMocks, mocker: MockerFixture) -> None:
-        expected_calls = [mocker.call(url=url) for url in TEST_URLS]
+        # Each url is created once, also when it occurs multiple times in the list
+        expected_calls = [mocker.call(url=url) for url in dict.fromkeys(TEST_URLS)]
         mocks.endpoint_repository.create.assert_has_calls(expected_calls)
+        assert mocks.endpoint_repository.create.call_count == len(expected_calls)
 
     def test_process_xml_successfully_processes_xml(
         self,
@@ -169,6 +193,65 @@ class TestOrganisationListImporter:
         self._assert_data_service_creation(mocks, mocker)
         self._assert_system_role_creation(mocks, mocker)
         self._assert_endpoint_creation(mocks, mocker)
+        mocks.current_import_repository.advance.assert_called_once_with(IMPORT_REF)
+        mocks.partition_repository.create_partitions.assert_not_called()
+
+    def test_process_xml_creates_partitions_of_import_in_partitioned_database(
+        self,
+        mocks: OrganisationListMocks,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        self._setup_successful_processing_mocks(mocks)
+        mocks.partition_repository.is_partitioned.return_value = True
+
+        mocks.importer.process_xml(xml_traverser)
+
+        mocks.partition_repository.create_partitions.assert_called_once_with(IMPORT_REF)
+
+    def test_process_xml_drops_partitions_of_failed_import(
+        self,
+        mocks: OrganisationListMocks,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        self._setup_successful_processing_mocks(mocks)
+        mocks.partition_repository.is_partitioned.return_value = True
+        mocks.current_import_repository.advance.side_effect = RuntimeError("Database error")
+
+        with raises(RuntimeError, match="Database error"):
+            mocks.importer.process_xml(xml_traverser)
+
+        mocks.partition_repository.drop_partitions.assert_called_once_with([IMPORT_REF])
+
+    def test_process_xml_processes_streamed_xml(
+        self,
+        mocker: MockerFixture,
+        mocks: OrganisationListMocks,
+    ) -> None:
+        self._setup_successful_processing_mocks(mocks)
+
+        with _stream_xml_file("MedMij_Zorgaanbiederslijst_example.9.3.xml") as traverser:
+            mocks.importer.process_xml(traverser)
+
+        self._assert_organisation_creation(mocks, mocker)
+        self._assert_data_service_creation(mocks, mocker)
+        self._assert_system_role_creation(mocks, mocker)
+        self._assert_endpoint_creation(mocks, mocker)
+
+    def test_process_xml_detects_existing_import_reference_before_streaming_organisations(
+        self,
+        mocker: MockerFixture,
+        mocks: OrganisationListMocks,
+    ) -> None:
+        mocks.organisation_repository.has_one_by_import_ref.return_value = True
+
+        with _stream_xml_file("MedMij_Zorgaanbiederslijst_example.9.3.xml") as traverser:
+            iterate_nested_elements = mocker.spy(traverser, "iterate_nested_elements")
+
+            with raises(CouldNotImportOrganisations, match=r"Import reference '.+' already exists"):
+                mocks.importer.process_xml(traverser)
+
+        mocks.organisation_repository.has_one_by_import_ref.assert_called_once_with(IMPORT_REF)
+        iterate_nested_elements.assert_not_called()
 
     def test_process_xml_fails_when_import_reference_already_exists(
         self,
@@ -180,6 +263,8 @@ class TestOrganisationListImporter:
         with raises(CouldNotImportOrganisations, match=r"Import reference '.+' already exists"):
             mocks.importer.process_xml(xml_traverser)
 
+        mocks.current_import_repository.advance.assert_not_called()
+
     @mark.parametrize(
         "field_name,invalid_value,expected_error",
         [
@@ -222,8 +307,9 @@ class TestOrganisationListImporter:
     ) -> None:
         self._setup_successful_processing_mocks(mocks)
 
-        existing_endpoints = [mocker.Mock(id=i) for i in range(10, 20)]
-        mocks.endpoint_repository.find_one_by_url.side_effect = existing_endpoints
+        mocks.endpoint_repository.find_ids_by_url.return_value = {
+            url: endpoint_id for endpoint_id, url in enumerate(dict.fromkeys(TEST_URLS), start=10)
+        }
 
         mocks.importer.process_xml(xml_traverser)
 
@@ -234,6 +320,148 @@ class TestOrganisationListImporter:
         mocks.endpoint_repository.create.assert_not_called()
 
 
+class TestOrganisationListImporterBulkInsert:
+    ENDPOINT_IDS = {url: endpoint_id for endpoint_id, url in enumerate(dict.fromkeys(TEST_URLS), start=10)}
+
+    @fixture
+    def xml_traverser(self) -> ElementTraverser:
+        return _load_xml_file("MedMij_Zorgaanbiederslijst_example.9.3.xml")
+
+    def _create_mocks(self, mocker: MockerFixture, batch_size: int) -> OrganisationListMocks:
+        mocks = _create_organisation_list_mocks(mocker, ZalImportConfig(bulk_insert=True, batch_size=batch_size))
+        mocks.endpoint_repository.find_ids_by_url.return_value = dict(self.ENDPOINT_IDS)
+        mocks.organisation_repository.create_many.side_effect = lambda rows: [123, 456][: len(rows)]
+        mocks.data_service_repository.create_many.side_effect = lambda rows: [123, 456, 789][: len(rows)]
+        return mocks
+
+    def test_process_xml_inserts_rows_per_table_with_generated_ids(
+        self,
+        mocker: MockerFixture,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        mocks = self._create_mocks(mocker, batch_size=1000)
+        endpoint_ids = self.ENDPOINT_IDS
+
+        mocks.importer.process_xml(xml_traverser)
+
+        mocks.organisation_repository.create_many.assert_called_once_with(
+            [
+                {"import_ref": IMPORT_REF, "name": ORGANISATION_NAMES[0], "type": OrganisationType.ZA},
+                {"import_ref": IMPORT_REF, "name": ORGANISATION_NAMES[1], "type": OrganisationType.ZA},
+            ]
+        )
+        mocks.data_service_repository.create_many.assert_called_once_with(
+            [
+                {
+                    "organisation_id": 123,
+                    "external_id": "4",
+                    "auth_endpoint_id": endpoint_ids[TEST_URLS[0]],
+                    "token_endpoint_id": endpoint_ids[TEST_URLS[1]],
+                },
+                {
+                    "organisation_id": 123,
+                    "external_id": "6",
+                    "auth_endpoint_id": endpoint_ids[TEST_URLS[3]],
+                    "token_endpoint_id": endpoint_ids[TEST_URLS[4]],
+                },
+                {
+                    "organisation_id": 456,
+                    "external_id": "1",
+                    "auth_endpoint_id": endpoint_ids[TEST_URLS[7]],
+                    "token_endpoint_id": endpoint_ids[TEST_URLS[8]],
+                },
+            ]
+        )
+        mocks.system_role_repository.create_many.assert_called_once_with(
+            [
+                {
+                    "data_service_id": 123,
+                    "code": "LAB-1.1-LRB-FHIR",
+                    "resource_endpoint_id": endpoint_ids[TEST_URLS[2]],
+                },
+                {"data_service_id": 456, "code": "MM-1.2-PLB-FHIR", "resource_endpoint_id": endpoint_ids[TEST_URLS[5]]},
+                {"data_service_id": 456, "code": "MM-1.2-PDB-FHIR", "resource_endpoint_id": endpoint_ids[TEST_URLS[6]]},
+                {"data_service_id": 789, "code": "MM-2.1-BZB-FHIR", "resource_endpoint_id": endpoint_ids[TEST_URLS[9]]},
+            ]
+        )
+        mocks.organisation_repository.create.assert_not_called()
+        mocks.data_service_repository.create.assert_not_called()
+        mocks.system_role_repository.create.assert_not_called()
+        mocks.current_import_repository.advance.assert_called_once_with(IMPORT_REF)
+
+    def test_process_xml_creates_new_endpoints_with_one_insert(
+        self,
+        mocker: MockerFixture,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        mocks = self._create_mocks(mocker, batch_size=1000)
+        mocks.endpoint_repository.find_ids_by_url.return_value = {TEST_URLS[0]: 10}
+        mocks.endpoint_repository.create_many.side_effect = lambda urls: {url: self.ENDPOINT_IDS[url] for url in urls}
+
+        mocks.importer.process_xml(xml_traverser)
+
+        mocks.endpoint_repository.create_many.assert_called_once()
+        created_urls = mocks.endpoint_repository.create_many.call_args.args[0]
+        assert sorted(created_urls) == sorted(set(TEST_URLS[1:]))
+        mocks.endpoint_repository.create.assert_not_called()
+
+    def test_process_xml_writes_one_insert_per_table_per_batch(
+        self,
+        mocker: MockerFixture,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        mocks = self._create_mocks(mocker, batch_size=1)
+
+        mocks.importer.process_xml(xml_traverser)
+
+        assert mocks.organisation_repository.create_many.call_count == 2
+        assert mocks.data_service_repository.create_many.call_count == 2
+        assert mocks.system_role_repository.create_many.call_count == 2
+
+    def test_process_xml_extracts_raw_chunks_in_worker_processes(
+        self,
+        mocker: MockerFixture,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        inline_mocks = self._create_mocks(mocker, batch_size=1)
+        inline_mocks.importer.process_xml(xml_traverser)
+
+        mocks = _create_organisation_list_mocks(
+            mocker, ZalImportConfig(bulk_insert=True, batch_size=1, parse_workers=2)
+        )
+        mocks.endpoint_repository.find_ids_by_url.return_value = dict(self.ENDPOINT_IDS)
+        mocks.organisation_repository.create_many.side_effect = lambda rows: [123, 456][: len(rows)]
+        mocks.data_service_repository.create_many.side_effect = lambda rows: [123, 456, 789][: len(rows)]
+
+        with _stream_xml_file("MedMij_Zorgaanbiederslijst_example.9.3.xml") as traverser:
+            mocks.importer.process_xml(traverser)
+
+        for repository in ("organisation_repository", "data_service_repository", "system_role_repository"):
+            assert (
+                getattr(mocks, repository).create_many.call_args_list
+                == getattr(inline_mocks, repository).create_many.call_args_list
+            )
+        mocks.current_import_repository.advance.assert_called_once_with(IMPORT_REF)
+
+    def test_process_xml_extracts_inline_when_the_zal_is_not_streamed(
+        self,
+        mocker: MockerFixture,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        executor = mocker.patch("app.zal_importer.importers.ProcessPoolExecutor")
+        mocks = _create_organisation_list_mocks(
+            mocker, ZalImportConfig(bulk_insert=True, batch_size=1, parse_workers=2)
+        )
+        mocks.endpoint_repository.find_ids_by_url.return_value = dict(self.ENDPOINT_IDS)
+        mocks.organisation_repository.create_many.side_effect = lambda rows: [123, 456][: len(rows)]
+        mocks.data_service_repository.create_many.side_effect = lambda rows: [123, 456, 789][: len(rows)]
+
+        mocks.importer.process_xml(xml_traverser)
+
+        executor.assert_not_called()
+        assert mocks.organisation_repository.create_many.call_count == 2
+
+
 class TestOrganisationJoinListImporter:
     @fixture
     def mocks(self, mocker: MockerFixture) -> OrganisationJoinListMocks:
@@ -247,6 +475,7 @@ class TestOrganisationJoinListImporter:
             data_service_repository=data_repo,
             identifying_feature_repository=mock_identifying_feature_repo,
             logger=mock_logger,
+            config=ZalImportConfig(bulk_insert=False),
         )
 
         return OrganisationJoinListMocks(
@@ -422,3 +651,92 @@ class TestOrganisationJoinListImporter:
             mocks.data_service_repository.find_one_by_organisation_and_external_id.assert_not_called()
         else:
             spy.assert_not_called()
+
+
+class TestOrganisationJoinListImporterBulkInsert:
+    @fixture
+    def mocks(self, mocker: MockerFixture) -> OrganisationJoinListMocks:
+        org_repo, data_repo, _, _ = _create_mock_repositories(mocker)
+        mock_identifying_feature_repo = mocker.Mock()
+        mock_identifying_feature_repo.has_one_by_import_ref.return_value = False
+
+        org_repo.find_ids_by_name.return_value = {ORGANISATION_NAMES[0]: 123, ORGANISATION_NAMES[1]: 456}
+        data_repo.find_ids_by_organisation_and_external_id.return_value = {
+            (123, "5"): 12,
+            (123, "6"): 13,
+            (456, "1"): 14,
+        }
+
+        importer = OrganisationJoinListImporter(
+            organisation_repository=org_repo,
+            data_service_repository=data_repo,
+            identifying_feature_repository=mock_identifying_feature_repo,
+            session=mocker.Mock(),
+            logger=mocker.Mock(),
+            config=ZalImportConfig(bulk_insert=True),
+        )
+
+        return OrganisationJoinListMocks(
+            importer=importer,
+            organisation_repository=org_repo,
+            data_service_repository=data_repo,
+            identifying_feature_repository=mock_identifying_feature_repo,
+        )
+
+    @fixture
+    def xml_traverser(self) -> ElementTraverser:
+        return _load_xml_file("MedMij_Zorgaanbiederskoppellijst_example.5.1.xml")
+
+    def test_process_xml_inserts_features_and_updates_data_services_in_batches(
+        self,
+        mocks: OrganisationJoinListMocks,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        mocks.importer.process_xml(xml_traverser)
+
+        mocks.organisation_repository.find_ids_by_name.assert_called_once_with()
+        mocks.organisation_repository.find_one_by_name.assert_not_called()
+        mocks.identifying_feature_repository.create_many.assert_called_once_with(
+            [
+                {
+                    "organisation_id": 123,
+                    "import_ref": JOIN_IMPORT_REF,
+                    "type": IdentifyingFeatureType.AGB,
+                    "value": "90012345",
+                },
+                {
+                    "organisation_id": 456,
+                    "import_ref": JOIN_IMPORT_REF,
+                    "type": IdentifyingFeatureType.OIN,
+                    "value": "23885731954438865098",
+                },
+                {
+                    "organisation_id": 456,
+                    "import_ref": JOIN_IMPORT_REF,
+                    "type": IdentifyingFeatureType.URA,
+                    "value": "12345678",
+                },
+            ]
+        )
+        mocks.data_service_repository.find_ids_by_organisation_and_external_id.assert_called_once_with({123, 456})
+        mocks.data_service_repository.update_many.assert_called_once_with(
+            [
+                {"id": 12, "name": "Meetwaarden vitale functies", "interface_versions": '["1.4.0"]'},
+                {"id": 13, "name": "Verzamelen Documenten 1.0", "interface_versions": '["1.4.0"]'},
+                {"id": 14, "name": "Basisgegevens zorg", "interface_versions": '["1.3.0", "1.4.0"]'},
+            ]
+        )
+
+    def test_process_xml_skips_unknown_organisations_and_data_services(
+        self,
+        mocks: OrganisationJoinListMocks,
+        xml_traverser: ElementTraverser,
+    ) -> None:
+        mocks.organisation_repository.find_ids_by_name.return_value = {ORGANISATION_NAMES[1]: 456}
+        mocks.data_service_repository.find_ids_by_organisation_and_external_id.return_value = {}
+
+        mocks.importer.process_xml(xml_traverser)
+
+        identifying_feature_rows = mocks.identifying_feature_repository.create_many.call_args.args[0]
+        assert [row["organisation_id"] for row in identifying_feature_rows] == [456, 456]
+        mocks.data_service_repository.update_many.assert_called_once_with([])
@@ -6,7 +6,7 @@ from pytest_mock import MockerFixture, MockType
 
 from app.zal_importer.services import ExpiredImportsCleaner
 
-MocksTypeAlias: TypeAlias = tuple[ExpiredImportsCleaner, MockType]
+MocksTypeAlias: TypeAlias = tuple[ExpiredImportsCleaner, MockType, MockType]
 
 
 class TestExpiredImportsCleaner:
@@ -14,13 +14,17 @@ class TestExpiredImportsCleaner:
     def mocks(self, mocker: MockerFixture) -> MocksTypeAlias:
         mock_logger = mocker.Mock()
         mock_organisation_repository = mocker.Mock()
+        mock_partition_repository = mocker.Mock()
+        mock_partition_repository.is_partitioned.return_value = False
 
         return (
             ExpiredImportsCleaner(
                 organisation_repository=mock_organisation_repository,
+                partition_repository=mock_partition_repository,
                 logger=mock_logger,
             ),
             mock_organisation_repository,
+            mock_partition_repository,
         )
 
     @pytest.mark.parametrize(
@@ -34,7 +38,7 @@ class TestExpiredImportsCleaner:
     def test_clean_expired_imports(
         self, test_client: TestClient, mocks: MocksTypeAlias, expiry_threshold: int, expected_deleted_refs: list[str]
     ) -> None:
-        expired_imports_cleaner, mock_organisation_repository = mocks
+        expired_imports_cleaner, mock_organisation_repository, _ = mocks
 
         mock_organisation_repository.get_import_refs.return_value = [
             "import_ref_1",
@@ -50,7 +54,7 @@ class TestExpiredImportsCleaner:
     def test_clean_expired_imports_counts_organisations_correctly(
         self, test_client: TestClient, mocks: MocksTypeAlias
     ) -> None:
-        expired_imports_cleaner, mock_organisation_repository = mocks
+        expired_imports_cleaner, mock_organisation_repository, _ = mocks
 
         mock_organisation_repository.get_import_refs.return_value = [
             "import_ref_1",
@@ -63,3 +67,21 @@ class TestExpiredImportsCleaner:
 
         mock_organisation_repository.count_by_import_ref.assert_any_call("import_ref_3")
         mock_organisation_repository.count_by_import_ref.assert_any_call("import_ref_4")
+
+    def test_clean_expired_imports_drops_partitions_in_partitioned_database(
+        self, test_client: TestClient, mocks: MocksTypeAlias
+    ) -> None:
+        expired_imports_cleaner, mock_organisation_repository, mock_partition_repository = mocks
+        mock_partition_repository.is_partitioned.return_value = True
+
+        mock_organisation_repository.get_import_refs.return_value = [
+            "import_ref_1",
+            "import_ref_2",
+            "import_ref_3",
+        ]
+
+        expired_imports_cleaner.clean_expired_imports(expiry_threshold=1)
+
+        mock_partition_repository.drop_partitions.assert_called_once_with(["import_ref_2", "import_ref_3"])
+        mock_organisation_repository.count_by_import_ref.assert_not_called()
+        mock_organisation_repository.delete_by_import_refs.assert_not_called()
@@ -2,6 +2,7 @@ from fhir.resources.STU3.bundle import Bundle
 from pytest_mock import MockerFixture
 
 from app.addressing.models import IdentificationType
+from app.healthcarefinder.zorgab.cache import PartOfOrganizationCache
 from app.zorgab_scraper.config import IdentifierSource
 from app.zorgab_scraper.models import Identifier, ScrapeResult
 from app.zorgab_scraper.scraper import ZorgabScraper
@@ -18,6 +19,7 @@ class TestZorgabScraper:
             identifier_provider=identifier_provider,
             executor=executor,
             bundle_factory=bundle_factory,
+            partof_cache=PartOfOrganizationCache(max_entries=10, ttl_seconds=60),
         )
         identifier_provider.get_identifiers.return_value = [Identifier(IdentificationType.ura, "123")]
         executor.execute.return_value = ScrapeResult(bundles=[], not_found=["URA:123"], errors=["boom"])
@@ -43,6 +45,9 @@ class TestZorgabScraper:
         )
         logger.debug.assert_any_call("Summary of not found organizations: %s", "URA:123")
         logger.warning.assert_called_once_with("Summary of errors: %s", "boom")
+        logger.info.assert_any_call(
+            "PartOf organization cache: %d hits, %d misses, %d coalesced fetches (%d cached)", 0, 0, 0, 0
+        )
 
     def test_run_logs_success_without_not_found_or_errors(self, mocker: MockerFixture) -> None:
         identifier_provider = mocker.Mock()
@@ -55,6 +60,7 @@ class TestZorgabScraper:
             identifier_provider=identifier_provider,
             executor=executor,
             bundle_factory=bundle_factory,
+            partof_cache=PartOfOrganizationCache(max_entries=10, ttl_seconds=60),
         )
         identifier_provider.get_identifiers.return_value = [Identifier(IdentificationType.ura, "123")]
         executor.execute.return_value = ScrapeResult(bundles=[], not_found=[], errors=[])
@@ -94,6 +100,7 @@ class TestZorgabScraper:
             identifier_provider=identifier_provider,
             executor=executor,
             bundle_factory=bundle_factory,
+            partof_cache=PartOfOrganizationCache(max_entries=10, ttl_seconds=60),
         )
         actual_bundle = scraper.run(scrape_limit=None, workers=1, identifier_sources=list(IdentifierSource))
         assert actual_bundle is bundle
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from app.config.models import Config
 from app.db.db import Database
 from app.db.repositories import (
+    CurrentImportRepository,
     DataServiceRepository,
     DbEndpointRepository,
     IdentifyingFeatureRepository,
@@ -90,3 +91,9 @@ def system_role_repository(db_session: Session) -> SystemRoleRepository:
 def endpoint_repository(db_session: Session) -> DbEndpointRepository:
     repository: DbEndpointRepository = DbEndpointRepository(db_session)
     return repository
+
+
+@pytest.fixture(scope="function")
+def current_import_repository(db_session: Session) -> CurrentImportRepository:
+    repository: CurrentImportRepository = CurrentImportRepository(db_session)
+    return repository